@@ -1,120 +1,74 @@
 
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-import streamlit as st
-import networkx as nx
 import plotly.graph_objects as go
-
-
-def plot_network_graph(G, theme_color):
-
-    pos = nx.spring_layout(G, k=0.3, iterations=50)
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y, mode='lines',
-        line=dict(width=1, color="#888"),
-        hoverinfo='none'
-    )
-    node_x, node_y = zip(*pos.values())
-    node_text = list(pos.keys())
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        marker=dict(size=12, color=theme_color),
-        text=node_text,
-        textposition="top center",
-        hoverinfo='text'
-    )
-    fig = go.Figure([edge_trace, node_trace])
-    fig.update_layout(
-        title="Route Network",
-        showlegend=False,
-        height=600,
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-    return fig
-
-
-@st.cache_resource
-def build_network_graph(df):
-
-    G = nx.from_pandas_edgelist(
-        df,
-        source="city1",
-        target="city2",
-        edge_attr="total_passengers",
-        create_using=nx.Graph()
-    )
-    return G
-
-@st.cache_data
-def get_route_summary(df):
-    df["route"] = df["city1"] + " → " + df["city2"]
-    table = df.groupby("route")["total_passengers"].sum().reset_index()
-    return table.sort_values("total_passengers", ascending=False)
-
-def compute_route_stats(df, route):
+from geo import coordinates_version, load_city_coordinates, load_route_distances, add_distance_metrics, unmatched_cities
+from route_map import aggregate_edges, node_table, route_map_figure
+from rollup import build_fact_table, rollup
+from schema import DATASETS, load_dataset, measure_label, dataset_version, stage_version
+from aggregates import aggregates_version, load_aggregates
+from cache_store import shared_cache
+from directional import balance
+from growth import MIN_VOLUME, MIN_T, SORT_COLUMNS, growth_table, leaderboard
+from kpi_snapshot import delta, load_snapshot, snapshot_version
+from forecast import load_or_fit
+from anomalies import THRESHOLD, load_or_update
+from seasonality import SEASON_ORDER, build_seasonality_table, season_index, route_profile, describe, filter_routes
+from network import build_route_graph, plot_network_graph
+from dtypes import memory_report
+from paginated_table import SearchIndex, paginated_table, search_select
+import modeling
+import instrumentation
+import manifest
+
+instrumentation.start_run("dashboard")
+
+# airport coordinate tables behind the distance and map tabs
+COORD_SOURCES = ("airports_india.csv", "data_out/airports_world.csv")
+
+
+@instrumentation.timed("build_network_graph", cache=st.cache_resource)
+@shared_cache("network_graph", version=lambda choice, version: version)
+def build_network_graph(choice, version):
+    return build_route_graph(load_data(choice, dataset_version(choice)))
+
+@instrumentation.timed("get_route_distances", cache=st.cache_data)
+def get_route_distances(choice, version, coords_version):
+    df = load_data(choice, dataset_version(choice))
+    coords = load_city_coordinates(COORD_SOURCES[0], world_path=COORD_SOURCES[1])
+    table = load_route_distances(df, coords, version=coords_version)
+    return table, unmatched_cities(df, coords)
+
+@instrumentation.timed("get_route_edges", cache=st.cache_data)
+def get_route_edges(choice, version, coords_version):
+    df = load_data(choice, dataset_version(choice))
+    coords = load_city_coordinates(COORD_SOURCES[0], world_path=COORD_SOURCES[1])
+    edges = aggregate_edges(df[["city1", "city2", "total_passengers"]], coords)
+    return edges, node_table(edges)
+
+@instrumentation.timed("compute_route_stats")
+def compute_route_stats(df, route, seasonality, period_col="month"):
     city1, city2 = route.split(" → ")
     route_data = df[(df["city1"] == city1) & (df["city2"] == city2)]
 
     avg_pax = route_data["total_passengers"].mean()
-    mode_month_num = route_data["month"].mode()[0]
-
-    month_map = {
-        1:"January",2:"February",3:"March",4:"April",
-        5:"May",6:"June",7:"July",8:"August",
-        9:"September",10:"October",11:"November",12:"December"
-    }
+    mode_period = route_data["period_name"].mode()[0]
 
     monthly = (
-        route_data.groupby("month")["total_passengers"]
+        route_data.groupby([period_col, "period_name"])["total_passengers"]
         .mean()
         .reset_index()
     )
-    monthly["month_name"] = monthly["month"].map(month_map)
-
-    season_map = {
-        12: "Winter", 1: "Winter",
-        2: "Spring", 3: "Spring",
-        4: "Summer", 5: "Summer", 6: "Summer",
-        7: "Monsoon", 8: "Monsoon",
-        9: "Festive", 10: "Festive", 11: "Festive"
-    }
-
-    route_data["season"] = route_data["month"].map(season_map)
-
-    seasonal_avg = (
-        route_data.groupby("season")["total_passengers"]
-        .mean()
-        .reset_index()
-        .sort_values("total_passengers", ascending=False)
-    )
 
+    # seasonal shape comes from the precomputed route table, not a per-route recompute
+    seasonal_avg = season_index(seasonality, route)
     top_season = seasonal_avg.iloc[0]["season"]
+    season_explanation = describe(seasonality.loc[route])
 
-    explanation = {
-        "Winter": "High winter travel demand due to holidays and tourism.",
-        "Spring": "Moderate festive/holiday travel.",
-        "Summer": "Vacation-heavy route with high tourism.",
-        "Monsoon": "Generally low travel due to weather.",
-        "Festive": "High travel during festival + business period."
-    }
-
-    season_explanation = explanation.get(top_season, "Seasonal pattern detected.")
-
-    return avg_pax,month_map[mode_month_num],monthly,seasonal_avg,top_season,season_explanation
+    return avg_pax,mode_period,monthly,seasonal_avg,top_season,season_explanation
 
 
 
@@ -212,926 +166,1208 @@ h1, h2, h3 {
 
 st.markdown("<h1>✈️ Flight Analysis Dashboard</h1>", unsafe_allow_html=True)
 
+# developer timing panel: FLIGHTS_DEV_PANEL=1 or ?dev=1
+show_dev_panel = os.environ.get("FLIGHTS_DEV_PANEL") == "1" or st.query_params.get("dev") == "1"
+
+def show_timing_panel():
+    run = instrumentation.finish_run()
+    if not show_dev_panel or run is None:
+        return
+    with st.sidebar.expander("⏱ Rerun timing", expanded=True):
+        st.metric("Last rerun", f"{run.seconds:.2f} s")
+        table = instrumentation.breakdown(run)
+        st.caption("Phases (tab bodies, including chart building)")
+        st.dataframe(table[table["kind"] == "phase"].drop(columns=["kind", "phase", "cache"]), hide_index=True)
+        st.caption("Instrumented calls")
+        st.dataframe(table[table["kind"] == "span"].drop(columns="kind"), hide_index=True)
+
 dataset_choice = st.selectbox(
     "Select Dataset:",
-    ["Domestic"],
+    ["Domestic", "International", "Combined"],
     help="Choose dataset to analyze."
 )
 
-@st.cache_data
-def load_data(choice):
-    if choice == "Domestic":
-        paths = ["domestic_city_processed.csv"]
-    else:
-        paths = ["city_internatinal.csv"]
-
-    for path in paths:
-        try:
-            df = pd.read_csv(path)
-            df.columns = df.columns.str.lower().str.strip()
-            return df
-        except FileNotFoundError:
-            continue
-
-    st.error(f"Data file for {choice} not found. Please ensure it's in the correct folder.")
-    return pd.DataFrame()
-
-df = load_data(dataset_choice)
-if df.empty:
+# Streamlit caches below take a `version` argument that is only there to be part of
+# the cache key: a content fingerprint (manifest.fingerprint) of the data and
+# code behind the result, so an entry is recomputed exactly when those change.
+FACT_SOURCES = ["domestic_city_processed.csv", "city_internatinal.csv"]
+
+@instrumentation.timed("get_fact_table", cache=st.cache_resource)
+def get_fact_table(version):
+    domestic = pd.read_csv("domestic_city_processed.csv")
+    international = pd.read_csv("city_internatinal.csv")
+    return build_fact_table(domestic, international)
+
+@instrumentation.timed("get_rollup", cache=st.cache_data)
+def get_rollup(version, grain, measures, by=(), traffic_types=None):
+    return rollup(get_fact_table(version), grain, measures=list(measures), by=list(by), traffic_types=traffic_types)
+
+if dataset_choice == "Combined":
+    instrumentation.phase("Combined")
+    traffic_types = ("domestic", "international")
+    fact_version = manifest.fingerprint(FACT_SOURCES, ["rollup.py"])
+    st.markdown(f"<div class='section'><h2>{dataset_choice} Traffic Rollup</h2>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        grain = st.selectbox("Period grain", ["quarter", "year"],
+                             help="International data is quarterly, so monthly grain is domestic-only.")
+    with col2:
+        measure = st.selectbox("Measure", ["total_passengers", "total_freight", "total_mail"])
+
+    trend = get_rollup(fact_version, grain, (measure,), by=("traffic_type",), traffic_types=traffic_types)
+    fig = px.line(trend, x="period_start", y=measure, color="traffic_type", markers=True,
+                  hover_data=["period"], title=f"{measure} by {grain}")
+    st.plotly_chart(fig, use_container_width=True)
+
+    split = trend.groupby("traffic_type", observed=True)[measure].sum().reset_index()
+    st.plotly_chart(px.pie(split, names="traffic_type", values=measure,
+                           title=f"{measure} share by traffic type"), use_container_width=True)
+
+    periods = trend["period"].unique().tolist()
+    selected_period = st.selectbox("Top routes for period", periods[::-1])
+    routes = get_rollup(fact_version, grain, (measure,), by=("city1", "city2"), traffic_types=traffic_types)
+    st.dataframe(routes[routes["period"] == selected_period].nlargest(10, measure))
+    st.markdown("</div>", unsafe_allow_html=True)
+    show_timing_panel()
     st.stop()
 
-theme_color = "#a78bfa" 
+@instrumentation.timed("load_data", cache=st.cache_data)
+def load_data(choice, version):
+    df = load_dataset(choice)
+    if df.empty:
+        st.error(f"Data file for {choice} not found. Please ensure it's in the correct folder.")
+    return df
+
+@instrumentation.timed("get_aggregates", cache=st.cache_data)
+def get_aggregates(choice, version):
+    return load_aggregates(choice)
+
+@instrumentation.timed("get_forecaster", cache=st.cache_resource)
+def get_forecaster(choice, version):
+    # the persisted model is refitted when the version it was fitted under differs
+    grain = DATASETS[choice]["grain"]
+    return load_or_fit(load_data(choice, dataset_version(choice)), grain, f".cache/forecast_{choice.lower()}.npz",
+                       version=version)
+
+@instrumentation.timed("get_growth", cache=st.cache_data)
+def get_growth(choice, version, level="route", end_year=None, min_volume=MIN_VOLUME, min_t=MIN_T):
+    aggs = get_aggregates(choice, aggregates_version(choice))
+    per_year = 12 if aggs["period_col"] == "month" else 4
+    return growth_table(aggs["route_year"], per_year, level=level, end_year=end_year,
+                        min_volume=min_volume, min_t=min_t)
+
+@instrumentation.timed("get_memory_report", cache=st.cache_data)
+def get_memory_report(choice, version):
+    return memory_report(load_data(choice, version))
+
+@instrumentation.timed("get_route_index", cache=st.cache_resource)
+def get_route_index(choice, version):
+    # route_totals is ordered busiest first, so an empty search lists the top routes
+    return SearchIndex(get_aggregates(choice, version)["route_totals"]["route"])
+
+@instrumentation.timed("get_kpi_snapshot", cache=st.cache_data)
+def get_kpi_snapshot(choice, version):
+    return load_snapshot(choice)
+
+@instrumentation.timed("get_od_tensor", cache=st.cache_resource)
+def get_od_tensor(choice, version, measure="passengers"):
+    from od_tensor import ODTensor  # scipy.sparse, only needed by the Directional Flow tab
+
+    return ODTensor.from_frame(load_data(choice, dataset_version(choice)), DATASETS[choice]["grain"], measure)
+
+@instrumentation.timed("get_seasonality", cache=st.cache_data)
+def get_seasonality(choice, version):
+    return build_seasonality_table(load_data(choice, dataset_version(choice)), DATASETS[choice]["grain"])
+
+@instrumentation.timed("get_anomalies", cache=st.cache_resource)
+def get_anomalies(choice, version):
+    # keyed on the data so new periods are picked up; the stored baselines are
+    # thrown away when the detector's code (or the matrix and period helpers it
+    # uses) or any already-scored row changes
+    grain = DATASETS[choice]["grain"]
+    return load_or_update(load_data(choice, version), grain, f".cache/anomalies_{choice.lower()}.npz",
+                          version=manifest.code_hash("anomalies.py", "forecast.py", "rollup.py"))
+
+instrumentation.phase("load")
+data_version = dataset_version(dataset_choice)
+df = load_data(dataset_choice, data_version)
+if df.empty:
+    show_timing_panel()
+    st.stop()
 
-month_names = {
-    1: "January", 2: "February", 3: "March",
-    4: "April",   5: "May",      6: "June",
-    7: "July",    8: "August",   9: "September",
-    10: "October",11: "November",12: "December"
-}
+for path in DATASETS[dataset_choice]["paths"]:
+    if manifest.check(path) == "stale":
+        spec = manifest.ARTIFACTS[path]
+        refresh = "run `python manifest.py build`" if spec["build"] else f"rerun {', '.join(spec['code'])}"
+        st.warning(f"{path} is not recorded in {manifest.MANIFEST} as built from its current inputs and code. "
+                   f"To refresh it, {refresh}.")
+
+if show_dev_panel:
+    with st.sidebar.expander("🧠 Memory (typed schema)"):
+        report = get_memory_report(dataset_choice, data_version)
+        typed_mb, untyped_mb = report["mb"].sum(), report["untyped_mb"].sum()
+        st.metric("Loaded frame", f"{typed_mb:.1f} MB", f"-{untyped_mb - typed_mb:.1f} MB vs untyped", delta_color="inverse")
+        st.dataframe(report, hide_index=True)
+
+aggs = get_aggregates(dataset_choice, aggregates_version(dataset_choice))
+period_col = aggs["period_col"]
+period_title = period_col.capitalize()
+measures = aggs["measures"]
 
-df["month_name"] = df["month"].map(month_names)
+theme_color = "#a78bfa" 
 
-if dataset_choice == "Domestic":
-    main_tab1, main_tab2, main_tab3 = st.tabs(["Statistics", "Correlation", "Modeling"])
+if dataset_choice in DATASETS:
+    # on_change="rerun" makes tabs lazy: only the open tab's code runs, so
+    # sklearn and friends are only imported once the Modeling tab is opened
+    main_tab1, main_tab2, main_tab3 = st.tabs(["Statistics", "Correlation", "Modeling"], key="main_tab", on_change="rerun")
 
     with main_tab1:
-        st.subheader("Statistics")
-        stats_tabs = st.tabs([
-            "Overview", "Top Routes", "Top Cities",
-            "Yearly Trend", "Monthly trend",
-            "Traffic Composition", "Route Composition","Route analysis"
-        ])
+        if main_tab1.open:
+            st.subheader("Statistics")
+            stats_tabs = st.tabs([
+                "Overview", "Top Routes", "Top Cities",
+                "Yearly Trend", f"{period_title}ly trend",
+                "Traffic Composition", "Route Composition","Route analysis",
+                "Passenger-km", "Route Map", "Anomalies", "Growth", "Directional Flow"
+            ], key="stats_tab", on_change="rerun")
         
-        with stats_tabs[0]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Overview Summary</h2>", unsafe_allow_html=True)
-
-            latest_year = df['year'].max()
-            df_latest = df[df['year'] == latest_year]
-            total_passengers = df_latest['total_passengers'].sum()
-            total_freight = df_latest['total_freight'].sum()
-            total_mail = df_latest['total_mail'].sum()
-            month_order = [
-                "January","February","March","April","May","June",
-                "July","August","September","October","November","December"
-            ]
-            month_avg = df.groupby('month_name')['total_passengers'].mean().reindex(month_order) 
-            busiest_month = month_avg.idxmax()
-            df['route'] = df['city1'] + " → " + df['city2']
-            busiest_route = (
-                df.groupby("route")["total_passengers"]
-                .sum()
-                .idxmax()
-            )
-            top_cities = (
-                df.groupby("city1")["paxfromcity2"].sum() +
-                df.groupby("city2")["paxtocity2"].sum()
-            ).nlargest(3)
-
-            total_cities = len(set(df['city1']).union(set(df['city2'])))
-            total_routes = df['route'].nunique()
-            avg_passengers_per_route = (
-                df.groupby("route")["total_passengers"].sum().mean()
-            )
-            route_year = (
-                df.groupby(["route", "year"])["total_passengers"]
-                .sum()
-                .reset_index()
-            )
-            route_year["growth"] = route_year.groupby("route")["total_passengers"].pct_change()
-            if route_year["growth"].notna().any():
-                fastest_growth_row = route_year.loc[route_year["growth"].idxmax()]
-                fastest_growing_route = fastest_growth_row["route"]
-                fastest_growing_growth = fastest_growth_row["growth"]*100
-            else:
-                fastest_growing_route = "N/A"
-                fastest_growing_growth = 0
-
-
-            st.markdown(f"<h3 style='color:{theme_color}; text-align:center;'>✨ Key Performance Indicators (for {latest_year})</h3>", 
-                        unsafe_allow_html=True)
-
-            kpi_style = """
-            background: linear-gradient(135deg, #1e293b, #0f172a);
-            padding: 18px;
-            border-radius: 14px;
-            text-align: center;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.25);
-            border: 1px solid #1e293b;
-            transition: all 0.3s ease;
-            """
-
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Total Passengers</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {total_passengers:,.0f}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Year {latest_year}</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-
-            with col2:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Total Freight</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {total_freight:,.0f} kg
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Year {latest_year}</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-
-            with col3:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Total Mail</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {total_mail:,.0f} kg
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Year {latest_year}</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-            st.markdown("<div style='height:30px;'></div>", unsafe_allow_html=True)
-
-            col4, col5, col6 = st.columns(3)
-
-            with col4:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Busiest Month</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {busiest_month}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Based on Avg. Monthly Traffic</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-
-            with col5:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Top Route</h4>
-                        <p style="font-size:20px; font-weight:600; color:#e2e8f0;">
-                            {busiest_route}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Highest Passenger Volume</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-
-            with col6:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Total Cities / Airports</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {total_cities}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Across the Dataset</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-            st.markdown("<div style='height:30px;'></div>", unsafe_allow_html=True)
-            col7, col8, col9 = st.columns(3)
-            with col7:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Total Routes</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {total_routes}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Unique City Pairs</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-
-            with col8:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Avg Passengers per Route</h4>
-                        <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
-                            {avg_passengers_per_route:,.0f}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Across All Routes</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
-
-            with col9:
-                st.markdown(
-                    f"""
-                    <div style="{kpi_style}">
-                        <h4 style="color:#63e6be;">Fastest Growing Route</h4>
-                        <p style="font-size:20px; font-weight:600; color:#e2e8f0;">
-                            {fastest_growing_route}
-                        </p>
-                        <p style="color:#94a3b8; font-size:12px;">Highest Route Growth</p>
-                    </div>
-                    """, unsafe_allow_html=True
-                )
+            with stats_tabs[0]:
+                if stats_tabs[0].open:
+                    instrumentation.phase("Statistics/Overview")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Overview Summary</h2>", unsafe_allow_html=True)
+
+                    # every card comes from the precomputed snapshot, not the frame
+                    snapshot = get_kpi_snapshot(dataset_choice, snapshot_version(dataset_choice))
+                    latest_year = st.selectbox("KPIs for year", sorted(snapshot["years"], reverse=True), key="kpi_year")
+                    kpi_entry = snapshot["years"][latest_year]
+                    kpis = kpi_entry["current"]
+                    total_passengers = kpis["totals"]["total_passengers"]
+                    total_freight = kpis["totals"]["total_freight"]
+                    total_mail = kpis["totals"].get("total_mail")
+                    month_avg = aggs["seasonal"].set_index("period_name")["total_passengers"]
+                    busiest_month = kpis["busiest_period"]
+                    busiest_route = kpis["top_route"]
+                    top_cities = dict(kpis["top_cities"])
+
+                    total_cities = kpis["total_cities"]
+                    total_routes = kpis["total_routes"]
+                    avg_passengers_per_route = kpis["avg_passengers_per_route"]
+                    if kpis["fastest"] is not None:
+                        fastest_growing_route = kpis["fastest"]["route"]
+                        fastest_growing_growth = kpis["fastest"]["yoy"]*100
+                    else:
+                        fastest_growing_route = "N/A"
+                        fastest_growing_growth = 0
+
+                    # partial years are compared with the same periods of the year before
+                    compare_label = f"vs {latest_year - 1}" + (
+                        "" if kpi_entry["full_year"] else f" (same {len(kpi_entry['periods'])} {period_col}s)")
+
+                    def delta_html(key, measure=None):
+                        change = delta(kpi_entry, key, measure)
+                        if change is None:
+                            return ""
+                        color = "#63e6be" if change >= 0 else "#f87171"
+                        arrow = "▲" if change >= 0 else "▼"
+                        return f'<p style="color:{color}; font-size:13px; margin:0;">{arrow} {change:+.1%} {compare_label}</p>'
+
+
+                    st.markdown(f"<h3 style='color:{theme_color}; text-align:center;'>✨ Key Performance Indicators (for {latest_year})</h3>", 
+                                unsafe_allow_html=True)
+
+                    kpi_style = """
+                    background: linear-gradient(135deg, #1e293b, #0f172a);
+                    padding: 18px;
+                    border-radius: 14px;
+                    text-align: center;
+                    box-shadow: 0 4px 12px rgba(0,0,0,0.25);
+                    border: 1px solid #1e293b;
+                    transition: all 0.3s ease;
+                    """
+
+                    col1, col2, col3 = st.columns(3)
+
+                    with col1:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Total Passengers</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {total_passengers:,.0f}
+                                </p>
+                                {delta_html("totals", "total_passengers")}
+                                <p style="color:#94a3b8; font-size:12px;">Year {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+
+                    with col2:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Total Freight</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {total_freight:,.0f} kg
+                                </p>
+                                {delta_html("totals", "total_freight")}
+                                <p style="color:#94a3b8; font-size:12px;">Year {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+
+                    with col3:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Total Mail</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {"N/A" if total_mail is None else f"{total_mail:,.0f} kg"}
+                                </p>
+                                {delta_html("totals", "total_mail")}
+                                <p style="color:#94a3b8; font-size:12px;">{f"Year {latest_year}" if total_mail is not None else "Not reported for this dataset"}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+                    st.markdown("<div style='height:30px;'></div>", unsafe_allow_html=True)
+
+                    col4, col5, col6 = st.columns(3)
+
+                    with col4:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Busiest {period_title}</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {busiest_month}
+                                </p>
+                                <p style="color:#94a3b8; font-size:12px;">Most passengers in {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+
+                    with col5:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Top Route</h4>
+                                <p style="font-size:20px; font-weight:600; color:#e2e8f0;">
+                                    {busiest_route}
+                                </p>
+                                <p style="color:#94a3b8; font-size:12px;">Highest Passenger Volume in {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+
+                    with col6:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Total Cities / Airports</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {total_cities}
+                                </p>
+                                {delta_html("total_cities")}
+                                <p style="color:#94a3b8; font-size:12px;">Served in {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+                    st.markdown("<div style='height:30px;'></div>", unsafe_allow_html=True)
+                    col7, col8, col9 = st.columns(3)
+                    with col7:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Total Routes</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {total_routes}
+                                </p>
+                                {delta_html("total_routes")}
+                                <p style="color:#94a3b8; font-size:12px;">Unique City Pairs in {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+
+                    with col8:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Avg Passengers per Route</h4>
+                                <p style="font-size:22px; font-weight:600; color:#e2e8f0;">
+                                    {avg_passengers_per_route:,.0f}
+                                </p>
+                                {delta_html("avg_passengers_per_route")}
+                                <p style="color:#94a3b8; font-size:12px;">Across Routes Flown in {latest_year}</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
+
+                    with col9:
+                        st.markdown(
+                            f"""
+                            <div style="{kpi_style}">
+                                <h4 style="color:#63e6be;">Fastest Growing Route</h4>
+                                <p style="font-size:20px; font-weight:600; color:#e2e8f0;">
+                                    {fastest_growing_route}
+                                </p>
+                                <p style="color:#94a3b8; font-size:12px;">+{fastest_growing_growth:,.0f}% YoY {latest_year} (min {MIN_VOLUME:,} passengers, significant)</p>
+                            </div>
+                            """, unsafe_allow_html=True
+                        )
 
 
                 
-            st.markdown("### Top 3 Cities by Total Passenger Traffic")
-
-            for city, traffic in top_cities.items():
-                st.markdown(
-                    f"""
-                    <div style="
-                        background-color:#111a2e;
-                        padding:12px 18px;
-                        margin:8px 0;
-                        border-radius:10px;
-                        border-left:4px solid #4fd1c5;
-                        font-size:16px;
-                        color:#e2e8f0;">
-                        <strong style="color:#63e6be;">{city}</strong>  
-                        <span style="float:right; color:#94a3b8;">{traffic:,.0f} passengers</span>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-
-            st.markdown("### Passenger Share by Month")
-            fig = px.line(month_avg.reset_index(), x="month_name", y="total_passengers", markers=True, color_discrete_sequence=[theme_color])
-            st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown("</div>", unsafe_allow_html=True)
+                    st.markdown(f"### Top 3 Cities by Total Passenger Traffic in {latest_year}")
+
+                    for city, traffic in top_cities.items():
+                        st.markdown(
+                            f"""
+                            <div style="
+                                background-color:#111a2e;
+                                padding:12px 18px;
+                                margin:8px 0;
+                                border-radius:10px;
+                                border-left:4px solid #4fd1c5;
+                                font-size:16px;
+                                color:#e2e8f0;">
+                                <strong style="color:#63e6be;">{city}</strong>  
+                                <span style="float:right; color:#94a3b8;">{traffic:,.0f} passengers</span>
+                            </div>
+                            """,
+                            unsafe_allow_html=True
+                        )
+
+
+                    st.markdown(f"### Passenger Share by {period_title}")
+                    fig = px.line(month_avg.reset_index(), x="period_name", y="total_passengers", markers=True, color_discrete_sequence=[theme_color])
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    st.markdown("</div>", unsafe_allow_html=True)
 
         
-        with stats_tabs[1]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Top 10 Busiest City Pairs (by route) </h2>", unsafe_allow_html=True)
-            if {"city1", "city2"}.issubset(df.columns):
-                df["route"] = df["city1"].astype(str) + "->" + df["city2"].astype(str)
-                if "total_passengers" in df.columns:
-                    top_routes = df.groupby("route")["total_passengers"].sum().nlargest(10).reset_index()
-                    fig = px.bar(top_routes, x="route", y="total_passengers", color_discrete_sequence=[theme_color])
-                    st.plotly_chart(fig, use_container_width=True)
-                    st.dataframe(top_routes)
-            st.markdown("</div>", unsafe_allow_html=True)
+            with stats_tabs[1]:
+                if stats_tabs[1].open:
+                    instrumentation.phase("Statistics/Top Routes")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Top 10 Busiest City Pairs (by route) </h2>", unsafe_allow_html=True)
+                    if {"city1", "city2"}.issubset(df.columns):
+                        if "total_passengers" in df.columns:
+                            top_routes = aggs["route_totals"][["route", "total_passengers"]].head(10)
+                            fig = px.bar(top_routes, x="route", y="total_passengers", color_discrete_sequence=[theme_color])
+                            st.plotly_chart(fig, use_container_width=True)
+                            st.dataframe(top_routes)
+                    st.markdown("</div>", unsafe_allow_html=True)
             
-        with stats_tabs[2]:
-            st.markdown(
-                f"<div class='section'><h2 style='color:{theme_color};'>Top Origin & Destination Cities</h2>",
-                unsafe_allow_html=True
-            )
-
-            required_cols = {"city1", "city2", "paxfromcity2", "paxtocity2"}
-            if required_cols.issubset(df.columns):
-
-                top_origin = (
-                    df.groupby("city1")["paxfromcity2"]
-                    .sum()
-                    .nlargest(10)
-                    .reset_index()
-                )
-
-                top_dest = (
-                    df.groupby("city2")["paxtocity2"]
-                    .sum()
-                    .nlargest(10)
-                    .reset_index()
-                )
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.subheader("Top Origins")
-                    fig_origin = px.bar(
-                        top_origin,
-                        x="city1",
-                        y="paxfromcity2",
-                        color_discrete_sequence=[theme_color]
+            with stats_tabs[2]:
+                if stats_tabs[2].open:
+                    instrumentation.phase("Statistics/Top Cities")
+                    st.markdown(
+                        f"<div class='section'><h2 style='color:{theme_color};'>Top Origin & Destination Cities</h2>",
+                        unsafe_allow_html=True
                     )
-                    st.plotly_chart(fig_origin, use_container_width=True)
-                    st.dataframe(top_origin)
-
-                with col2:
-                    st.subheader("Top Destinations")
-                    fig_dest = px.bar(
-                        top_dest,
-                        x="city2",
-                        y="paxtocity2",
-                        color_discrete_sequence=[theme_color]
-                    )
-                    st.plotly_chart(fig_dest, use_container_width=True)
-                    st.dataframe(top_dest)
-
-            else:
-                st.warning("Required columns for Tab 2 are missing in the dataset.")
 
-            st.markdown("</div>", unsafe_allow_html=True)
+                    required_cols = {"city1", "city2", "paxfromcity2", "paxtocity2"}
+                    if required_cols.issubset(df.columns):
+
+                        top_origin = aggs["top_origin"]
+                        top_dest = aggs["top_dest"]
+                        col1, col2 = st.columns(2)
+
+                        with col1:
+                            st.subheader("Top Origins")
+                            fig_origin = px.bar(
+                                top_origin,
+                                x="city",
+                                y="outbound",
+                                color_discrete_sequence=[theme_color]
+                            )
+                            st.plotly_chart(fig_origin, use_container_width=True)
+                            st.dataframe(top_origin)
+
+                        with col2:
+                            st.subheader("Top Destinations")
+                            fig_dest = px.bar(
+                                top_dest,
+                                x="city",
+                                y="inbound",
+                                color_discrete_sequence=[theme_color]
+                            )
+                            st.plotly_chart(fig_dest, use_container_width=True)
+                            st.dataframe(top_dest)
+
+                    else:
+                        st.warning("Required columns for Tab 2 are missing in the dataset.")
+
+                    st.markdown("</div>", unsafe_allow_html=True)
             
-        with stats_tabs[3]:
-            st.markdown(
-                f"<div class='section'><h2 style='color:{theme_color};'>Yearly Passenger Traffic Trend</h2>",
-                unsafe_allow_html=True
-            )
-            if {"year", "total_passengers"}.issubset(df.columns):
-                yearly_trend = (
-                    df.groupby("year")["total_passengers"]
-                    .sum()
-                    .sort_index()
-                    .reset_index()
-                )
-                fig = px.line(
-                    yearly_trend,
-                    x="year",
-                    y="total_passengers",
-                    markers=True,
-                    color_discrete_sequence=[theme_color]
-                )
-                fig.update_layout(
-                    xaxis_title="Year",
-                    yaxis_title="Total Passengers",
-                    hovermode="x unified"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-                st.dataframe(yearly_trend)
-            else:
-                st.warning("Required columns 'year' or 'total_passengers' are missing.")
-            st.markdown("</div>", unsafe_allow_html=True)
+            with stats_tabs[3]:
+                if stats_tabs[3].open:
+                    instrumentation.phase("Statistics/Yearly Trend")
+                    st.markdown(
+                        f"<div class='section'><h2 style='color:{theme_color};'>Yearly Passenger Traffic Trend</h2>",
+                        unsafe_allow_html=True
+                    )
+                    if {"year", "total_passengers"}.issubset(df.columns):
+                        yearly_trend = aggs["yearly"][["year", "total_passengers"]]
+                        fig = px.line(
+                            yearly_trend,
+                            x="year",
+                            y="total_passengers",
+                            markers=True,
+                            color_discrete_sequence=[theme_color]
+                        )
+                        fig.update_layout(
+                            xaxis_title="Year",
+                            yaxis_title="Total Passengers",
+                            hovermode="x unified"
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                        st.dataframe(yearly_trend)
+                    else:
+                        st.warning("Required columns 'year' or 'total_passengers' are missing.")
+                    st.markdown("</div>", unsafe_allow_html=True)
             
-        with stats_tabs[4]:
-            st.markdown(
-                f"<div class='section'><h2 style='color:{theme_color};'>Monthly Passenger Seasonality</h2>",
-                unsafe_allow_html=True
-            )
-            if {"month", "total_passengers"}.issubset(df.columns):
-                month_map = {
-                    1: "Jan",  2: "Feb",  3: "Mar",  4: "Apr",
-                    5: "May",  6: "Jun",  7: "Jul",  8: "Aug",
-                    9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"
-                }
-                monthly_seasonality = (
-                    df.groupby("month")["total_passengers"]
-                    .mean()
-                    .reindex(range(1, 12 + 1))
-                    .reset_index()
-                )
-                monthly_seasonality["month_name"] = monthly_seasonality["month"].map(month_map)
-                fig = px.line(
-                    monthly_seasonality,
-                    x="month_name",
-                    y="total_passengers",
-                    markers=True,
-                    color_discrete_sequence=[theme_color]
-                )
-                fig.update_layout(
-                    xaxis_title="Month",
-                    yaxis_title="Average Passengers",
-                    hovermode="x unified"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-                st.dataframe(monthly_seasonality)
-            else:
-                st.warning("Required columns 'month' or 'total_passengers' are missing.")
-
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        with stats_tabs[5]:
+            with stats_tabs[4]:
+                if stats_tabs[4].open:
+                    instrumentation.phase(f"Statistics/{period_title}ly trend")
+                    st.markdown(
+                        f"<div class='section'><h2 style='color:{theme_color};'>{period_title}ly Passenger Seasonality</h2>",
+                        unsafe_allow_html=True
+                    )
+                    if {period_col, "total_passengers"}.issubset(df.columns):
+                        monthly_seasonality = aggs["seasonal"]
+                        fig = px.line(
+                            monthly_seasonality,
+                            x="period_name",
+                            y="total_passengers",
+                            markers=True,
+                            color_discrete_sequence=[theme_color]
+                        )
+                        fig.update_layout(
+                            xaxis_title=period_title,
+                            yaxis_title="Average Passengers",
+                            hovermode="x unified"
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+                        st.dataframe(monthly_seasonality)
+                    else:
+                        st.warning(f"Required columns '{period_col}' or 'total_passengers' are missing.")
+
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+            with stats_tabs[5]:
+                if stats_tabs[5].open:
+                    instrumentation.phase("Statistics/Traffic Composition")
             
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Traffic Volume Distribution</h2>", unsafe_allow_html=True)
-            st.markdown("### Histogram Distribution (Passengers, Freight, Mail)")
-            cols = st.columns(3)
-            with cols[0]:
-                fig = px.histogram(
-                    df,
-                    x="total_passengers",
-                    nbins=40,
-                    title="Total Passengers",
-                    color_discrete_sequence=[theme_color]
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            with cols[1]:
-                fig = px.histogram(
-                    df,
-                    x="total_freight",
-                    nbins=40,
-                    title="Total Freight",
-                    color_discrete_sequence=[theme_color]
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            with cols[2]:
-                fig = px.histogram(
-                    df,
-                    x="total_mail",
-                    nbins=40,
-                    title="Total Mail",
-                    color_discrete_sequence=[theme_color]
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            st.markdown("### Log-Scale Distribution (Handles Skewness)")
-
-            cols2 = st.columns(3)
-            with cols2[0]:
-                fig = px.histogram(
-                    df,
-                    x=np.log1p(df["total_passengers"]),
-                    nbins=40,
-                    title="Passengers (Log Scale)",
-                    color_discrete_sequence=[theme_color]
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-            with cols2[1]:
-                fig = px.histogram(
-                    df,
-                    x=np.log1p(df["total_freight"]),
-                    nbins=40,
-                    title="Freight (Log Scale)",
-                    color_discrete_sequence=[theme_color]
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-            with cols2[2]:
-                fig = px.histogram(
-                    df,
-                    x=np.log1p(df["total_mail"]),
-                    nbins=40,
-                    title="Mail (Log Scale)",
-                    color_discrete_sequence=[theme_color]
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Traffic Volume Distribution</h2>", unsafe_allow_html=True)
+                    st.markdown(f"### Histogram Distribution ({', '.join(measure_label(m) for m in measures)})")
+                    cols = st.columns(len(measures))
+                    for col, measure in zip(cols, measures):
+                        with col:
+                            fig = px.histogram(
+                                df,
+                                x=measure,
+                                nbins=40,
+                                title=measure.replace("_", " ").title(),
+                                color_discrete_sequence=[theme_color]
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
+                    st.markdown("### Log-Scale Distribution (Handles Skewness)")
+
+                    cols2 = st.columns(len(measures))
+                    for col, measure in zip(cols2, measures):
+                        with col:
+                            fig = px.histogram(
+                                df,
+                                x=np.log1p(df[measure]),
+                                nbins=40,
+                                title=f"{measure_label(measure)} (Log Scale)",
+                                color_discrete_sequence=[theme_color]
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
                 
-            st.markdown("### Violin Plots (Spread & Density)")
-            cols3 = st.columns(3)
-
-            with cols3[0]:
-                fig = px.violin(df, y="total_passengers", box=True, points="all",
-                                title="Passengers Violin Plot",
-                                color_discrete_sequence=[theme_color])
-                st.plotly_chart(fig, use_container_width=True)
-
-            with cols3[1]:
-                fig = px.violin(df, y="total_freight", box=True, points="all",
-                                title="Freight Violin Plot",
-                                color_discrete_sequence=[theme_color])
-                st.plotly_chart(fig, use_container_width=True)
-
-            with cols3[2]:
-                fig = px.violin(df, y="total_mail", box=True, points="all",
-                                title="Mail Violin Plot",
-                                color_discrete_sequence=[theme_color])
-                st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown("</div>", unsafe_allow_html=True)
+                    st.markdown("### Violin Plots (Spread & Density)")
+                    cols3 = st.columns(len(measures))
+
+                    for col, measure in zip(cols3, measures):
+                        with col:
+                            fig = px.violin(df, y=measure, box=True, points="all",
+                                            title=f"{measure_label(measure)} Violin Plot",
+                                            color_discrete_sequence=[theme_color])
+                            st.plotly_chart(fig, use_container_width=True)
+
+                    st.markdown("</div>", unsafe_allow_html=True)
             
-        with stats_tabs[6]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>🛫 Route Traffic Composition</h2>", unsafe_allow_html=True)
-
-            df["route"] = df["city1"] + " → " + df["city2"]
-
-            comp = (
-                df.groupby("route")[["total_passengers", "total_freight", "total_mail"]]
-                .sum()
-                .reset_index()
-            )
-            comp["total_traffic"] = (
-                comp["total_passengers"] +
-                comp["total_freight"] +
-                comp["total_mail"]
-            )
-
-            top_n = st.slider("Select number of top routes", 5, 50, 10)
-            comp_top = comp.nlargest(top_n, "total_traffic")
-            comp_melted = comp_top.melt(
-                id_vars="route",
-                value_vars=["total_passengers", "total_freight", "total_mail"],
-                var_name="Traffic Type",
-                value_name="Volume"
-            )
-
-            comp_melted["Traffic Type"] = comp_melted["Traffic Type"].replace({
-                "total_passengers": "Passengers",
-                "total_freight": "Freight",
-                "total_mail": "Mail"
-            })
-            fig = px.bar(
-                comp_melted,
-                x="route",
-                y="Volume",
-                color="Traffic Type",
-                title="Passenger vs Freight vs Mail (Route-wise)",
-                color_discrete_map={
-                    "Passengers": "#4fd1c5",
-                    "Freight": "#60a5fa",
-                    "Mail": "#a78bfa"
-                }
-            )
-
-            fig.update_layout(xaxis=dict(title="Route", tickangle=45))
-            st.plotly_chart(fig, use_container_width=True)
-            st.markdown("### Data Table")
-            st.dataframe(comp_top[["route", "total_passengers", "total_freight", "total_mail"]])
-            st.markdown("</div>", unsafe_allow_html=True)
+            with stats_tabs[6]:
+                if stats_tabs[6].open:
+                    instrumentation.phase("Statistics/Route Composition")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>🛫 Route Traffic Composition</h2>", unsafe_allow_html=True)
+
+                    comp = aggs["route_totals"][["route"] + measures].copy()
+                    comp["total_traffic"] = comp[measures].sum(axis=1)
+
+                    top_n = st.slider("Select number of top routes", 5, 50, 10)
+                    comp_top = comp.nlargest(top_n, "total_traffic")
+                    comp_melted = comp_top.melt(
+                        id_vars="route",
+                        value_vars=measures,
+                        var_name="Traffic Type",
+                        value_name="Volume"
+                    )
+
+                    comp_melted["Traffic Type"] = comp_melted["Traffic Type"].replace({
+                        "total_passengers": "Passengers",
+                        "total_freight": "Freight",
+                        "total_mail": "Mail"
+                    })
+                    fig = px.bar(
+                        comp_melted,
+                        x="route",
+                        y="Volume",
+                        color="Traffic Type",
+                        title="Passenger vs Freight vs Mail (Route-wise)",
+                        color_discrete_map={
+                            "Passengers": "#4fd1c5",
+                            "Freight": "#60a5fa",
+                            "Mail": "#a78bfa"
+                        }
+                    )
+
+                    fig.update_layout(xaxis=dict(title="Route", tickangle=45))
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.markdown("### Data Table")
+                    st.dataframe(comp_top[["route"] + measures])
+                    st.markdown("</div>", unsafe_allow_html=True)
             
-        with stats_tabs[7]:
-
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>🕸 Route Network</h2>", unsafe_allow_html=True)
-
-            G = build_network_graph(df)
-
-            if st.checkbox("Show Route Network Graph"):
-                fig = plot_network_graph(G, theme_color) 
-                st.plotly_chart(fig, use_container_width=True)
-
-            routes_df = get_route_summary(df)
-            st.subheader("All Routes")
-            st.write(f"Total Routes: **{len(routes_df)}**")
-            st.dataframe(routes_df)
-
-            selected_route = st.selectbox("Select a Route:", routes_df["route"])
-            (
-                avg_pax,
-                mode_month,
-                monthly,
-                seasonal_avg,
-                top_season,
-                season_explanation
-            ) = compute_route_stats(df, selected_route)
-
-            st.metric("Average Monthly Passengers", f"{avg_pax:,.0f}")
-            st.metric("Most Frequent Month", mode_month)
-            st.subheader("Seasonal Trend Classification")
-            st.metric("Top Season", top_season)
-            st.info(season_explanation)
-            st.write("### Seasonal Passenger Averages")
-            st.dataframe(seasonal_avg)
-
-            fig_season = px.bar(
-                seasonal_avg,
-                x="season",
-                y="total_passengers",
-                color="season",
-                color_discrete_sequence=px.colors.qualitative.Set2,
-                title=f"Seasonal Trend for {selected_route}"
-            )
-            st.plotly_chart(fig_season, use_container_width=True)
-            st.subheader("Monthly Passenger Trend")
-
-            st.plotly_chart(
-                px.line(
-                    monthly,
-                    x="month_name",
-                    y="total_passengers",
-                    markers=True,
-                    title=f"Monthly Trend for {selected_route}",
-                    color_discrete_sequence=[theme_color]
-                ),
-                use_container_width=True
+            with stats_tabs[7]:
+                if stats_tabs[7].open:
+                    instrumentation.phase("Statistics/Route analysis")
+
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>🕸 Route Network</h2>", unsafe_allow_html=True)
+
+                    G = build_network_graph(dataset_choice, stage_version(dataset_choice, "network.py"))
+
+                    if st.checkbox("Show Route Network Graph"):
+                        fig = plot_network_graph(G, theme_color) 
+                        st.plotly_chart(fig, use_container_width=True)
+
+                    routes_df = aggs["route_totals"][["route", "total_passengers"]]
+                    st.subheader("All Routes")
+                    st.write(f"Total Routes: **{len(routes_df)}**")
+                    paginated_table(routes_df, key="routes", sort_by="total_passengers",
+                                    formats={"total_passengers": "{:,.0f}"}, placeholder="City or route, e.g. DELHI MUMBAI")
+
+                    route_index = get_route_index(dataset_choice, aggregates_version(dataset_choice))
+                    selected_route = search_select(route_index, "Select a Route:", key="route_pick",
+                                                   placeholder="City or route, e.g. DELHI MUMBAI")
+                    seasonality = get_seasonality(dataset_choice, stage_version(dataset_choice, "seasonality.py"))
+                    (
+                        avg_pax,
+                        mode_month,
+                        monthly,
+                        seasonal_avg,
+                        top_season,
+                        season_explanation
+                    ) = compute_route_stats(df, selected_route, seasonality, period_col)
+
+                    st.metric(f"Average {period_title}ly Passengers", f"{avg_pax:,.0f}")
+                    st.metric(f"Most Frequent {period_title}", mode_month)
+                    st.subheader("Seasonal Trend Classification")
+                    st.metric("Top Season", top_season)
+                    st.info(season_explanation)
+                    st.write("### Seasonal Demand Index (1.0 = route average)")
+                    st.dataframe(seasonal_avg)
+
+                    fig_season = px.bar(
+                        seasonal_avg,
+                        x="season",
+                        y="demand_index",
+                        color="season",
+                        color_discrete_sequence=px.colors.qualitative.Set2,
+                        title=f"Seasonal Trend for {selected_route}"
+                    )
+                    st.plotly_chart(fig_season, use_container_width=True)
+                    st.plotly_chart(
+                        px.bar(route_profile(seasonality, selected_route, period_col), x="period_name", y="demand_index",
+                               title=f"Typical {period_col} profile for {selected_route}",
+                               color_discrete_sequence=[theme_color]),
+                        use_container_width=True
+                    )
+
+                    st.subheader("Find Routes by Seasonal Pattern")
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        pattern_season = st.selectbox("Season", [s for s in SEASON_ORDER if f"index_{s.lower()}" in seasonality.columns],
+                                                      index=3 if period_col == "month" else 2)
+                    with col2:
+                        pattern_direction = st.radio("Demand", ["dip", "peak"], horizontal=True)
+                    with col3:
+                        pattern_strength = st.slider("Minimum seasonality strength", 0.0, 1.0, 0.6, 0.05)
+                    matches = filter_routes(seasonality, pattern_season, pattern_direction, min_strength=pattern_strength)
+                    st.write(f"**{len(matches)}** routes with a strong {pattern_season.lower()} {pattern_direction}")
+                    st.dataframe(matches[["pattern", "peak_name", "trough_name", f"index_{pattern_season.lower()}",
+                                          "amplitude", "strength", "observed_periods"]])
+                    st.subheader(f"{period_title}ly Passenger Trend")
+
+                    st.plotly_chart(
+                        px.line(
+                            monthly,
+                            x="period_name",
+                            y="total_passengers",
+                            markers=True,
+                            title=f"{period_title}ly Trend for {selected_route}",
+                            color_discrete_sequence=[theme_color]
+                        ),
+                        use_container_width=True
     
-            )
+                    )
+
+                    st.subheader(f"Forecast: next 12 {period_col}s")
+                    route_forecast = get_forecaster(dataset_choice, stage_version(dataset_choice, "forecast.py")).forecast(selected_route, horizon=12)
+                    fig_fc = go.Figure()
+                    fig_fc.add_trace(go.Scatter(
+                        x=pd.concat([route_forecast["period"], route_forecast["period"][::-1]]),
+                        y=pd.concat([route_forecast["upper_95"], route_forecast["lower_95"][::-1]]),
+                        fill="toself", fillcolor="rgba(167,139,250,0.15)", line=dict(width=0), name="95% interval",
+                    ))
+                    fig_fc.add_trace(go.Scatter(
+                        x=pd.concat([route_forecast["period"], route_forecast["period"][::-1]]),
+                        y=pd.concat([route_forecast["upper_80"], route_forecast["lower_80"][::-1]]),
+                        fill="toself", fillcolor="rgba(167,139,250,0.3)", line=dict(width=0), name="80% interval",
+                    ))
+                    fig_fc.add_trace(go.Scatter(x=route_forecast["period"], y=route_forecast["forecast"],
+                                                mode="lines+markers", line=dict(color=theme_color), name="Forecast"))
+                    fig_fc.update_layout(title=f"Passenger forecast for {selected_route} ({route_forecast['method'].iloc[0].replace('_', ' ')})")
+                    st.plotly_chart(fig_fc, use_container_width=True)
+                    st.dataframe(route_forecast)
+
+
+            with stats_tabs[8]:
+                if stats_tabs[8].open:
+                    instrumentation.phase("Statistics/Passenger-km")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Passenger-km & Freight Tonne-km</h2>", unsafe_allow_html=True)
+
+                    distance_table, missing_cities = get_route_distances(dataset_choice, stage_version(dataset_choice, "geo.py"),
+                                                                          coordinates_version(*COORD_SOURCES))
+                    dist_df = add_distance_metrics(df[["year", "city1", "city2", "total_passengers", "total_freight"]], distance_table)
+                    covered = dist_df["distance_km"].notna()
+
+                    latest_year = dist_df["year"].max()
+                    latest = dist_df[dist_df["year"] == latest_year]
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric(f"Passenger-km ({latest_year})", f"{latest['passenger_km'].sum():,.0f}")
+                    col2.metric(f"Freight tonne-km ({latest_year})", f"{latest['freight_tonne_km'].sum():,.0f}")
+                    col3.metric("Traffic with known distance", f"{dist_df.loc[covered, 'total_passengers'].sum() / dist_df['total_passengers'].sum():.1%}")
+
+                    yearly_km = dist_df.groupby("year")[["passenger_km", "freight_tonne_km"]].sum().reset_index()
+                    fig = px.line(yearly_km, x="year", y="passenger_km", markers=True,
+                                  title="Passenger-km by Year", color_discrete_sequence=[theme_color])
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    route_km = (
+                        dist_df[covered]
+                        .groupby(["city1", "city2"])
+                        .agg(distance_km=("distance_km", "first"),
+                             total_passengers=("total_passengers", "sum"),
+                             passenger_km=("passenger_km", "sum"),
+                             freight_tonne_km=("freight_tonne_km", "sum"))
+                        .nlargest(10, "passenger_km")
+                        .reset_index()
+                    )
+                    st.markdown("### Top 10 Routes by Passenger-km")
+                    st.dataframe(route_km)
+
+                    if missing_cities:
+                        with st.expander(f"Cities without airport coordinates ({len(missing_cities)})"):
+                            st.write(", ".join(missing_cities))
+
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+
+            with stats_tabs[9]:
+                if stats_tabs[9].open:
+                    instrumentation.phase("Statistics/Route Map")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Route Map</h2>", unsafe_allow_html=True)
+
+                    edges, nodes = get_route_edges(dataset_choice, stage_version(dataset_choice, "route_map.py", "geo.py"),
+                                                   coordinates_version(*COORD_SOURCES))
+
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        zoom = st.slider("Zoom / level of detail", 1, 5, 1,
+                                         help="Higher zoom shows more of the long-tail routes around the focus city.")
+                    with col2:
+                        focus = st.selectbox("Focus city", ["All India"] + nodes["city"].tolist())
+                    with col3:
+                        bundle = st.checkbox("Bundle edges", value=False)
+                        all_routes = st.checkbox("Draw every route", value=False)
+
+                    center = None
+                    if focus != "All India":
+                        row = nodes[nodes["city"] == focus].iloc[0]
+                        center = {"lat": float(row["lat"]), "lon": float(row["lon"])}
+
+                    fig = route_map_figure(edges, nodes, zoom=zoom, center=center, bundle=bundle,
+                                           all_routes=all_routes, theme_color=theme_color)
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(f"{len(nodes)} cities with coordinates. Routes to cities without coordinates are not drawn.")
+
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+
+            with stats_tabs[10]:
+                if stats_tabs[10].open:
+                    instrumentation.phase("Statistics/Anomalies")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Anomalous Route {period_title}s</h2>", unsafe_allow_html=True)
+                    st.caption(f"Each {period_col} is compared with the median and MAD of the same route's previous "
+                               f"{get_anomalies(dataset_choice, data_version).window} {period_col}s.")
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        threshold = st.slider("Robust z-score threshold", 2.0, 10.0, THRESHOLD, 0.5)
+                    with col2:
+                        min_baseline = st.number_input("Minimum baseline passengers", min_value=0, value=1000, step=500,
+                                                       help="Hide tiny routes where a handful of passengers is a big swing.")
+
+                    detector = get_anomalies(dataset_choice, data_version)
+                    flagged = detector.frame(threshold)
+                    flagged = flagged[flagged["baseline"] >= min_baseline]
+
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Anomalous route-periods", f"{len(flagged):,}")
+                    col2.metric("Spikes", f"{(flagged['direction'] == 'spike').sum():,}")
+                    col3.metric("Drops", f"{(flagged['direction'] == 'drop').sum():,}")
+
+                    by_period = flagged.groupby(["period", "direction"]).size().reset_index(name="routes")
+                    st.plotly_chart(px.bar(by_period, x="period", y="routes", color="direction",
+                                           title=f"Anomalous routes per {period_col}",
+                                           color_discrete_map={"spike": theme_color, "drop": "#f87171"}),
+                                    use_container_width=True)
+                    st.dataframe(flagged.head(500))
+
+                    if not flagged.empty:
+                        anomaly_route = st.selectbox("Inspect route", flagged["route"].unique())
+                        series = detector.route_series(anomaly_route, threshold)
+                        fig = go.Figure()
+                        fig.add_trace(go.Scatter(x=series["period"], y=series["band_high"], line=dict(width=0), showlegend=False))
+                        fig.add_trace(go.Scatter(x=series["period"], y=series["band_low"], line=dict(width=0),
+                                                 fill="tonexty", fillcolor="rgba(167,139,250,0.2)", name="Expected range"))
+                        fig.add_trace(go.Scatter(x=series["period"], y=series["baseline"], line=dict(dash="dot", color="#94a3b8"),
+                                                 name="Rolling median"))
+                        fig.add_trace(go.Scatter(x=series["period"], y=series["total_passengers"], mode="lines+markers",
+                                                 line=dict(color=theme_color), name="Passengers"))
+                        hits = series[series["robust_z"].abs() >= threshold]
+                        fig.add_trace(go.Scatter(x=hits["period"], y=hits["total_passengers"], mode="markers",
+                                                 marker=dict(size=11, color="#f87171"), name="Anomaly"))
+                        fig.update_layout(title=f"{anomaly_route}")
+                        st.plotly_chart(fig, use_container_width=True)
+
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+
+            with stats_tabs[11]:
+                if stats_tabs[11].open:
+                    instrumentation.phase("Statistics/Growth")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Growth Leaderboard</h2>", unsafe_allow_html=True)
+
+                    years = sorted(aggs["route_year"]["year"].unique())[1:]
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        growth_level = st.radio("Rank", ["route", "city"], horizontal=True)
+                    with col2:
+                        default_end = get_growth(dataset_choice, stage_version(dataset_choice, "aggregates.py", "growth.py")).attrs["end_year"]
+                        growth_end = st.selectbox("Year", years, index=years.index(default_end))
+                    with col3:
+                        growth_min_volume = st.number_input("Minimum yearly passengers", min_value=0, value=MIN_VOLUME, step=5000)
+                    with col4:
+                        growth_sort = st.selectbox("Sort by", SORT_COLUMNS)
+
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        growth_ascending = st.checkbox("Ascending (biggest decliners first)", value=False)
+                    with col2:
+                        growth_significant = st.checkbox(f"Only significant changes (|t| ≥ {MIN_T})", value=True)
+                    with col3:
+                        growth_page_size = st.selectbox("Rows per page", [25, 50, 100])
+
+                    table = get_growth(dataset_choice, stage_version(dataset_choice, "aggregates.py", "growth.py"), growth_level, growth_end, growth_min_volume)
+                    st.caption(f"YoY compares {table.attrs['end_year']} with {table.attrs['prev_year']} per {period_col} of coverage; "
+                               f"CAGR runs from {table.attrs['start_year']}.")
+                    _, n_pages, n_rows = leaderboard(table, growth_sort, growth_ascending, 1, growth_page_size, growth_significant)
+                    growth_page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1)
+                    page_rows, _, _ = leaderboard(table, growth_sort, growth_ascending, growth_page, growth_page_size, growth_significant)
+                    st.write(f"**{n_rows:,}** {growth_level}s ranked")
+                    st.dataframe(
+                        page_rows.drop(columns=["eligible", "significant"]).style.format(
+                            {"yoy": "{:+.1%}", "cagr": "{:+.1%}", "volume": "{:,.0f}", "volume_prev": "{:,.0f}",
+                             "abs_change": "{:+,.0f}", "t_stat": "{:.1f}"}, na_rep="–"),
+                        hide_index=True,
+                    )
+
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+
+            with stats_tabs[12]:
+                if stats_tabs[12].open:
+                    instrumentation.phase("Statistics/Directional Flow")
+                    st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Directional Flow & Imbalance</h2>", unsafe_allow_html=True)
+
+                    flow_measures = list(aggs["city_flows"])
+                    col1, col2 = st.columns([1, 3])
+                    with col1:
+                        flow_measure = st.selectbox("Measure", flow_measures)
+                        flow_level = st.radio("Level", ["city", "route"], horizontal=True)
+                    city_flow = aggs["city_flows"][flow_measure]
+                    period_index = city_flow[["period_key", "period"]].drop_duplicates().sort_values("period_key")
+                    with col2:
+                        flow_start, flow_end = st.select_slider(
+                            "Period range", options=period_index["period"].tolist(),
+                            value=(period_index["period"].iloc[0], period_index["period"].iloc[-1]),
+                        )
+                    keys = period_index.set_index("period")["period_key"]
+
+                    if flow_level == "city":
+                        flow_table = balance(city_flow, keys[flow_start], keys[flow_end])
+                        label = "city"
+                    else:
+                        flow_table = balance(aggs["route_flows"][flow_measure], keys[flow_start], keys[flow_end], by=("city_a", "city_b"))
+                        flow_table.insert(0, "route", flow_table["city_a"] + " ⇄ " + flow_table["city_b"])
+                        label = "route"
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.subheader("Largest net outflow")
+                        st.plotly_chart(px.bar(flow_table.nlargest(10, "net"), x=label, y="net",
+                                               color_discrete_sequence=[theme_color]), use_container_width=True)
+                    with col2:
+                        st.subheader("Largest net inflow")
+                        st.plotly_chart(px.bar(flow_table.nsmallest(10, "net"), x=label, y="net",
+                                               color_discrete_sequence=["#f87171"]), use_container_width=True)
+                    st.caption("Net = outbound − inbound for cities, and A→B − B→A for routes; "
+                               "imbalance is net as a share of two-way traffic.")
+                    st.dataframe(flow_table.head(500))
+
+                    if flow_level == "city":
+                        flow_city = st.selectbox("City over time", flow_table["city"].head(100))
+                        city_series = city_flow[city_flow["city"] == flow_city].sort_values("period_key")
+                        st.plotly_chart(px.line(city_series, x="period", y=["outbound", "inbound"],
+                                                title=f"{flow_city}: outbound vs inbound {flow_measure}"),
+                                        use_container_width=True)
+
+                        od = get_od_tensor(dataset_choice, stage_version(dataset_choice, "od_tensor.py"), flow_measure)
+                        top_dest = od.top_k(10, keys[flow_start], keys[flow_end], cities=[flow_city])
+                        top_orig = od.top_k(10, keys[flow_start], keys[flow_end], cities=[flow_city], by="destination")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.markdown(f"**Where {flow_city} traffic goes**")
+                            st.dataframe(top_dest[["destination", "traffic"]], hide_index=True)
+                        with col2:
+                            st.markdown(f"**Where {flow_city} traffic comes from**")
+                            st.dataframe(top_orig[["origin", "traffic"]], hide_index=True)
+
+                    st.markdown("</div>", unsafe_allow_html=True)
 
 
     with main_tab2:
-        corr_tabs = st.tabs([
-            "Correlation Heatmap", "EDA",
-            "Mail vs Freight","Association rules"
-        ])
-
-        with corr_tabs[0]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Correlation Heatmap</h2>", unsafe_allow_html=True)
-
-            num = df.select_dtypes(include=[np.number])
-
-            if num.shape[1] < 2:
-                st.warning("Not enough numeric columns to compute correlation.")
-            else:
-                corr = num.corr().round(2)
-
-                fig = px.imshow(
-                    corr,
-                    text_auto=True,
-                    color_continuous_scale=[
-                        "#991b1b",  
-                        "#f87171",   
-                        "#1e293b",   
-                        "#4fd1c5",  
-                        "#0d9488"    
-                    ],
-                    aspect="auto",
-                    title="Correlation Matrix (Numeric Variables)"
-                )
-                fig.update_layout(
-                    width=900,
-                    height=600,
-                    margin=dict(l=50, r=50, t=50, b=50),
-                    coloraxis_colorbar=dict(
-                        title="Correlation",
-                        tickvals=[-1, -0.5, 0, 0.5, 1],
-                        ticks="outside"
+        if main_tab2.open:
+            instrumentation.phase("Correlation")
+            corr_tabs = st.tabs([
+                "Correlation Heatmap", "EDA",
+                "Mail vs Freight","Association rules"
+            ])
+
+            with corr_tabs[0]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Correlation Heatmap</h2>", unsafe_allow_html=True)
+
+                num = df.select_dtypes(include=[np.number])
+
+                if num.shape[1] < 2:
+                    st.warning("Not enough numeric columns to compute correlation.")
+                else:
+                    corr = num.corr().round(2)
+
+                    fig = px.imshow(
+                        corr,
+                        text_auto=True,
+                        color_continuous_scale=[
+                            "#991b1b",  
+                            "#f87171",   
+                            "#1e293b",   
+                            "#4fd1c5",  
+                            "#0d9488"    
+                        ],
+                        aspect="auto",
+                        title="Correlation Matrix (Numeric Variables)"
+                    )
+                    fig.update_layout(
+                        width=900,
+                        height=600,
+                        margin=dict(l=50, r=50, t=50, b=50),
+                        coloraxis_colorbar=dict(
+                            title="Correlation",
+                            tickvals=[-1, -0.5, 0, 0.5, 1],
+                            ticks="outside"
+                        )
                     )
-                )
-                fig.update_xaxes(tickangle=45)
+                    fig.update_xaxes(tickangle=45)
                 
-                st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        with corr_tabs[1]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Bivariate Analysis</h2>", unsafe_allow_html=True)
-
-            cols = df.columns.tolist()
-            feature1 = st.selectbox("Select Feature 1", cols)
-            feature2 = st.selectbox("Select Feature 2", cols, index=1)
-            f1_type = "numeric" if pd.api.types.is_numeric_dtype(df[feature1]) else "categorical"
-            f2_type = "numeric" if pd.api.types.is_numeric_dtype(df[feature2]) else "categorical"
-
-            st.write(f"### Visualization for **{feature1}** vs **{feature2}**")
-
-            if f1_type == "numeric" and f2_type == "numeric":
-                fig = px.scatter(
-                    df, x=feature1, y=feature2, trendline="ols",
-                    color_discrete_sequence=[theme_color],
-                    title=f"{feature1} vs {feature2}"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-
-            elif f1_type == "numeric" and f2_type == "categorical":
-                fig = px.box(
-                    df, x=feature2, y=feature1,
-                    color_discrete_sequence=[theme_color],
-                    title=f"{feature1} distribution across {feature2}"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-            elif f1_type == "categorical" and f2_type == "numeric":
-                fig = px.box(
-                    df, x=feature1, y=feature2,
-                    color_discrete_sequence=[theme_color],
-                    title=f"{feature2} distribution across {feature1}"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-            else:
-                crosstab = pd.crosstab(df[feature1], df[feature2])
-                fig = px.imshow(
-                    crosstab,
-                    text_auto=True,
-                    title=f"Relationship between {feature1} and {feature2}",
-                    color_continuous_scale="Blues"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True)
+
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            with corr_tabs[1]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Bivariate Analysis</h2>", unsafe_allow_html=True)
+
+                cols = df.columns.tolist()
+                feature1 = st.selectbox("Select Feature 1", cols)
+                feature2 = st.selectbox("Select Feature 2", cols, index=1)
+                f1_type = "numeric" if pd.api.types.is_numeric_dtype(df[feature1]) else "categorical"
+                f2_type = "numeric" if pd.api.types.is_numeric_dtype(df[feature2]) else "categorical"
+
+                st.write(f"### Visualization for **{feature1}** vs **{feature2}**")
+
+                if f1_type == "numeric" and f2_type == "numeric":
+                    fig = px.scatter(
+                        df, x=feature1, y=feature2, trendline="ols",
+                        color_discrete_sequence=[theme_color],
+                        title=f"{feature1} vs {feature2}"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+
+                elif f1_type == "numeric" and f2_type == "categorical":
+                    fig = px.box(
+                        df, x=feature2, y=feature1,
+                        color_discrete_sequence=[theme_color],
+                        title=f"{feature1} distribution across {feature2}"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                elif f1_type == "categorical" and f2_type == "numeric":
+                    fig = px.box(
+                        df, x=feature1, y=feature2,
+                        color_discrete_sequence=[theme_color],
+                        title=f"{feature2} distribution across {feature1}"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                else:
+                    crosstab = pd.crosstab(df[feature1], df[feature2])
+                    fig = px.imshow(
+                        crosstab,
+                        text_auto=True,
+                        title=f"Relationship between {feature1} and {feature2}",
+                        color_continuous_scale="Blues"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
                 
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Univariate Analysis</h2>", unsafe_allow_html=True)
-            cols = df.columns.tolist()
-            selected_col = st.selectbox("Select a Column to Analyze", cols)
-            st.write(f"## Univariate Analysis of **{selected_col}**")
-            col_type = "numeric" if pd.api.types.is_numeric_dtype(df[selected_col]) else "categorical"
-
-
-            if col_type == "numeric":
-                fig = px.histogram(
-                    df, x=selected_col, nbins=30, 
-                    marginal="box",
-                    color_discrete_sequence=[theme_color],
-                    title=f"Distribution of {selected_col}"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-                st.write("###  Summary Statistics")
-                st.write(df[selected_col].describe())
-
-            else:
-                counts = df[selected_col].value_counts()
-                fig = px.bar(
-                    counts,
-                    x=counts.index, 
-                    y=counts.values,
-                    color_discrete_sequence=[theme_color],
-                    title=f"Value Counts for {selected_col}"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-                st.write("### Percentage Distribution")
-                st.write(round((counts / counts.sum()) * 100, 2))
-
-            st.markdown(""" 
-                        Numeric vs Numeric → Scatter Plot + Trendline 
-                        Numeric vs Categorical → Box Plot
-                        Categorical vs Categorical → Heatmap
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Univariate Analysis</h2>", unsafe_allow_html=True)
+                cols = df.columns.tolist()
+                selected_col = st.selectbox("Select a Column to Analyze", cols)
+                st.write(f"## Univariate Analysis of **{selected_col}**")
+                col_type = "numeric" if pd.api.types.is_numeric_dtype(df[selected_col]) else "categorical"
+
+
+                if col_type == "numeric":
+                    fig = px.histogram(
+                        df, x=selected_col, nbins=30, 
+                        marginal="box",
+                        color_discrete_sequence=[theme_color],
+                        title=f"Distribution of {selected_col}"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    st.write("###  Summary Statistics")
+                    st.write(df[selected_col].describe())
+
+                else:
+                    counts = df[selected_col].value_counts()
+                    fig = px.bar(
+                        counts,
+                        x=counts.index, 
+                        y=counts.values,
+                        color_discrete_sequence=[theme_color],
+                        title=f"Value Counts for {selected_col}"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    st.write("### Percentage Distribution")
+                    st.write(round((counts / counts.sum()) * 100, 2))
+
+                st.markdown(""" 
+                            Numeric vs Numeric → Scatter Plot + Trendline 
+                            Numeric vs Categorical → Box Plot
+                            Categorical vs Categorical → Heatmap
                         
-                        Numeric Column → Histogram + Box Plot
-                        Categorical Column → Bar Chart
-                        """)
+                            Numeric Column → Histogram + Box Plot
+                            Categorical Column → Bar Chart
+                            """)
 
-            st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
 
 
-        with corr_tabs[2]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Mail vs Freight</h2>", unsafe_allow_html=True)
-            if {"year", "total_mail", "total_freight"}.issubset(df.columns):
-                yearly_mail = df.groupby("year")["total_mail"].sum()
-                yearly_freight = df.groupby("year")["total_freight"].sum()
-                combo = pd.DataFrame({"year": yearly_mail.index, "mail": yearly_mail.values, "freight": yearly_freight.values})
-                st.plotly_chart(px.line(combo, x="year", y=["mail", "freight"], markers=True))
-            st.markdown("</div>", unsafe_allow_html=True)
+            with corr_tabs[2]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Mail vs Freight</h2>", unsafe_allow_html=True)
+                if {"year", "total_mail", "total_freight"}.issubset(df.columns):
+                    yearly_mail = df.groupby("year")["total_mail"].sum()
+                    yearly_freight = df.groupby("year")["total_freight"].sum()
+                    combo = pd.DataFrame({"year": yearly_mail.index, "mail": yearly_mail.values, "freight": yearly_freight.values})
+                    st.plotly_chart(px.line(combo, x="year", y=["mail", "freight"], markers=True))
+                else:
+                    st.info("Mail volumes are not reported for this dataset.")
+                st.markdown("</div>", unsafe_allow_html=True)
 
-        with corr_tabs[3]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Accociation rules and dbscan</h2>", unsafe_allow_html=True)
-            if st.button("Next ➜"):
-                st.switch_page("pages/asso.py")
+            with corr_tabs[3]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Accociation rules and dbscan</h2>", unsafe_allow_html=True)
+                if st.button("Next ➜"):
+                    st.switch_page("pages/asso.py")
 
-            st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
 
     with main_tab3:
-        model_tabs = st.tabs([
-            "Standardization", "PCA (2D)", "PCA Loadings",
-            "Clustering", "Cluster Summary"
-        ])
-        with model_tabs[0]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Data Standardization Preview</h2>", unsafe_allow_html=True)
-            num = df.select_dtypes(include=[np.number]).dropna()
-            if num.empty:
-                st.warning("No numeric columns available for standardization.")
-            else:
-                scaler = StandardScaler()
-                scaled_data = scaler.fit_transform(num)
-                df_scaled = pd.DataFrame(scaled_data, columns=num.columns)
-                st.dataframe(df_scaled.head())
-            st.markdown("</div>", unsafe_allow_html=True)
+        if main_tab3.open:
+            instrumentation.phase("Modeling")
+            model_tabs = st.tabs([
+                "Standardization", "PCA (2D)", "PCA Loadings",
+                "Clustering", "Cluster Summary"
+            ])
+            with model_tabs[0]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>Data Standardization Preview</h2>", unsafe_allow_html=True)
+                num = df.select_dtypes(include=[np.number]).dropna()
+                if num.empty:
+                    st.warning("No numeric columns available for standardization.")
+                else:
+                    scaled_data = modeling.standardize(num)
+                    df_scaled = pd.DataFrame(scaled_data, columns=num.columns)
+                    st.dataframe(df_scaled.head())
+                st.markdown("</div>", unsafe_allow_html=True)
         
-        with model_tabs[1]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>PCA (2D Projection)</h2>", unsafe_allow_html=True)
-            num = df.select_dtypes(include=[np.number]).dropna()
-            if num.shape[1] >= 2:
-                X = StandardScaler().fit_transform(num)
-                pca = PCA(n_components=2)
-                coords = pca.fit_transform(X)
-                fig = px.scatter(x=coords[:,0], y=coords[:,1], color_discrete_sequence=[theme_color])
-                st.plotly_chart(fig, use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            with model_tabs[1]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>PCA (2D Projection)</h2>", unsafe_allow_html=True)
+                num = df.select_dtypes(include=[np.number]).dropna()
+                if num.shape[1] >= 2:
+                    coords, _ = modeling.pca_2d(modeling.standardize(num))
+                    fig = px.scatter(x=coords[:,0], y=coords[:,1], color_discrete_sequence=[theme_color])
+                    st.plotly_chart(fig, use_container_width=True)
+                st.markdown("</div>", unsafe_allow_html=True)
             
-        with model_tabs[2]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>PCA Loadings</h2>", unsafe_allow_html=True)
-            num = df.select_dtypes(include=[np.number]).dropna()
-            if num.shape[1] >= 2:
-                X = StandardScaler().fit_transform(num)
-                pca = PCA(n_components=2)
-                pca.fit(X)
-                loadings = pd.DataFrame(pca.components_.T, index=num.columns, columns=["PC1", "PC2"])
-                st.dataframe(loadings)
-            st.markdown("</div>", unsafe_allow_html=True)
+            with model_tabs[2]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>PCA Loadings</h2>", unsafe_allow_html=True)
+                num = df.select_dtypes(include=[np.number]).dropna()
+                if num.shape[1] >= 2:
+                    loadings = modeling.pca_loadings(num)
+                    st.dataframe(loadings)
+                st.markdown("</div>", unsafe_allow_html=True)
         
         
-        with model_tabs[3]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>K-Means Clustering</h2>", unsafe_allow_html=True)
+            with model_tabs[3]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>K-Means Clustering</h2>", unsafe_allow_html=True)
+
+                features_to_use = measures
+                num = df[features_to_use]
 
-            features_to_use = ["total_passengers", "total_freight", "total_mail"]
-            num = df[features_to_use]
+                if num.shape[1] >= 2:
+                    X = modeling.standardize(num)
 
-            if num.shape[1] >= 2:
-                X = StandardScaler().fit_transform(num)
+                    method = st.selectbox("Choose Clustering Method", ["K-Means"])
 
-                method = st.selectbox("Choose Clustering Method", ["K-Means"])
+                    @st.cache_resource
+                    def compute_clusters(method, X, k=None, eps=None, min_samples=None):
+                        if method == "K-Means":
+                            labels, _ = modeling.kmeans(X, k)
+                        return labels
 
-                @st.cache_resource
-                def compute_clusters(method, X, k=None, eps=None, min_samples=None):
                     if method == "K-Means":
-                        model = KMeans(n_clusters=k, random_state=42)
-                        labels = model.fit_predict(X)
-                    return labels
-
-                if method == "K-Means":
-                    k = st.slider("Number of Clusters (K)", 2, 10, 4)
-                    labels = compute_clusters("K-Means", X, k=k)
-
-                pca = PCA(n_components=2)
-                coords = pca.fit_transform(X)
-                dfp = pd.DataFrame(coords, columns=["PC1", "PC2"])
-                dfp["Cluster"] = labels.astype(str)
-
-                fig = px.scatter(
-                    dfp,
-                    x="PC1", y="PC2",
-                    color="Cluster",
-                    color_discrete_sequence=px.colors.qualitative.Vivid,
-                    title=f"{method} Clustering Visualization"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                        k = st.slider("Number of Clusters (K)", 2, 10, 4)
+                        labels = compute_clusters("K-Means", X, k=k)
+
+                    coords, _ = modeling.pca_2d(X)
+                    dfp = pd.DataFrame(coords, columns=["PC1", "PC2"])
+                    dfp["Cluster"] = labels.astype(str)
+
+                    fig = px.scatter(
+                        dfp,
+                        x="PC1", y="PC2",
+                        color="Cluster",
+                        color_discrete_sequence=px.colors.qualitative.Vivid,
+                        title=f"{method} Clustering Visualization"
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
                 
             
 
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        with model_tabs[4]:
-            st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>K-Means Cluster Summary (K-Means)</h2>", unsafe_allow_html=True)
-
-            features_to_use = ["total_passengers", "total_freight", "total_mail"]
-            num = df[features_to_use].dropna()
-
-            if num.shape[1] < 2:
-                st.warning("Not enough numeric columns for clustering.")
-            else:
-                scaler = StandardScaler()
-                X = scaler.fit_transform(num)
-
-                st.subheader("Elbow Method (Inertia)")
-                inertias = []
-                K_range = range(1, 11)
-
-                for k in K_range:
-                    km = KMeans(n_clusters=k, random_state=42)
-                    km.fit(X)
-                    inertias.append(km.inertia_)
-
-                fig_elbow = px.line(
-                    x=list(K_range),
-                    y=inertias,
-                    title="Elbow Curve: Inertia vs K",
-                    markers=True,
-                    labels={"x": "Number of Clusters (k)", "y": "Inertia"}
-                )
-                st.plotly_chart(fig_elbow, use_container_width=True)
-
-
-                # st.subheader("Silhouette Score")
-                # from sklearn.metrics import silhouette_score
-
-                # sil_scores = []
-                # K_sil = range(2, 6)
-
-                # for k in K_sil:
-                #     km = KMeans(n_clusters=k, random_state=42)
-                #     labels = km.fit_predict(X)
-                #     sil = silhouette_score(X, labels)
-                #     sil_scores.append(sil)
-
-                # fig_sil = px.line(
-                #     x=list(K_sil),
-                #     y=sil_scores,
-                #     title="Silhouette Score vs K",
-                #     markers=True,
-                #     labels={"x": "Number of Clusters (k)", "y": "Silhouette Score"}
-                # )
-                # st.plotly_chart(fig_sil, use_container_width=True)
-
-                # Optimal k = highest silhouette
-
-                # if st.button("DBSCAN ➜"):
-                #     st.switch_page("pages/dbscan.py")
-
-                optimal_k = 3
-                st.success(f"Optimal K found by elbow method = **{optimal_k}**")
-                km_final = KMeans(n_clusters=optimal_k, random_state=42)
-                labels_final = km_final.fit_predict(X)
-
-                df_cluster = pd.DataFrame(X, columns=num.columns)
-                df_cluster["Cluster"] = labels_final
-
-                st.subheader("Cluster Summary (Scaled Feature Means)")
-                summary = df_cluster.groupby("Cluster").mean().round(2)
-                st.dataframe(summary)
-
-                st.subheader("PCA Visualization of Clusters")
-                pca = PCA(n_components=2)
-                X_pca = pca.fit_transform(X)
-
-                df_plot = pd.DataFrame({
-                    "PCA1": X_pca[:, 0],
-                    "PCA2": X_pca[:, 1],
-                    "Cluster": labels_final.astype(str)
-                })
-
-                centers_pca = pca.transform(km_final.cluster_centers_)
-
-                fig_pca = px.scatter(
-                    df_plot,
-                    x="PCA1",
-                    y="PCA2",
-                    color="Cluster",
-                    color_discrete_sequence=px.colors.qualitative.Set2,
-                    title=f"K-Means Clusters (k = {optimal_k})"
-                )
-
-                fig_pca.add_scatter(
-                    x=centers_pca[:, 0],
-                    y=centers_pca[:, 1],
-                    mode="markers",
-                    marker=dict(size=15, color="black", symbol="x"),
-                    name="Centers"
-                )
-                st.plotly_chart(fig_pca, use_container_width=True)
-
-            st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            with model_tabs[4]:
+                st.markdown(f"<div class='section'><h2 style='color:{theme_color};'>K-Means Cluster Summary (K-Means)</h2>", unsafe_allow_html=True)
+
+                features_to_use = measures
+                num = df[features_to_use].dropna()
+
+                if num.shape[1] < 2:
+                    st.warning("Not enough numeric columns for clustering.")
+                else:
+                    X = modeling.standardize(num)
+
+                    st.subheader("Elbow Method (Inertia)")
+                    K_range = range(1, 11)
+                    inertias = modeling.elbow_inertias(X, K_range)
+
+                    fig_elbow = px.line(
+                        x=list(K_range),
+                        y=inertias,
+                        title="Elbow Curve: Inertia vs K",
+                        markers=True,
+                        labels={"x": "Number of Clusters (k)", "y": "Inertia"}
+                    )
+                    st.plotly_chart(fig_elbow, use_container_width=True)
+
+
+                    optimal_k = 3
+                    st.success(f"Optimal K found by elbow method = **{optimal_k}**")
+                    labels_final, km_final = modeling.kmeans(X, optimal_k)
+
+                    df_cluster = pd.DataFrame(X, columns=num.columns)
+                    df_cluster["Cluster"] = labels_final
+
+                    st.subheader("Cluster Summary (Scaled Feature Means)")
+                    summary = df_cluster.groupby("Cluster").mean().round(2)
+                    st.dataframe(summary)
+
+                    st.subheader("PCA Visualization of Clusters")
+                    X_pca, pca = modeling.pca_2d(X)
+
+                    df_plot = pd.DataFrame({
+                        "PCA1": X_pca[:, 0],
+                        "PCA2": X_pca[:, 1],
+                        "Cluster": labels_final.astype(str)
+                    })
+
+                    centers_pca = pca.transform(km_final.cluster_centers_)
+
+                    fig_pca = px.scatter(
+                        df_plot,
+                        x="PCA1",
+                        y="PCA2",
+                        color="Cluster",
+                        color_discrete_sequence=px.colors.qualitative.Set2,
+                        title=f"K-Means Clusters (k = {optimal_k})"
+                    )
+
+                    fig_pca.add_scatter(
+                        x=centers_pca[:, 0],
+                        y=centers_pca[:, 1],
+                        mode="markers",
+                        marker=dict(size=15, color="black", symbol="x"),
+                        name="Centers"
+                    )
+                    st.plotly_chart(fig_pca, use_container_width=True)
+
+                st.markdown("</div>", unsafe_allow_html=True)
 
 
    
 
 
-    
\ No newline at end of file
+    
+
+show_timing_panel()
@@ -0,0 +1,59 @@
+from directional import balance, city_flows, present_flows, route_flows
+from cache_store import shared_cache
+from instrumentation import timed
+from schema import DATASETS, load_dataset, present_measures, stage_version
+
+
+@timed("aggregates.build_aggregates")
+def build_aggregates(df, period_col):
+    # Everything the Statistics tabs show, computed once per dataset load.
+    measures = present_measures(df)
+    aggs = {"period_col": period_col, "measures": measures}
+
+    route_totals = (
+        df.groupby(["route", "city1", "city2"], sort=False)[measures]
+        .sum()
+        .reset_index()
+        .sort_values("total_passengers", ascending=False, ignore_index=True)
+    )
+    aggs["route_totals"] = route_totals
+
+    # period count and spread per route-year let growth metrics test significance
+    aggs["route_year"] = (
+        df.groupby(["route", "city1", "city2", "year"], sort=False)["total_passengers"]
+        .agg(total_passengers="sum", periods="count", period_std="std")
+        .reset_index()
+        .sort_values(["route", "year"], ignore_index=True)
+    )
+
+    aggs["yearly"] = df.groupby("year")[measures].sum().sort_index().reset_index()
+
+    n_periods = df[period_col].max()
+    seasonal = (
+        df.groupby(period_col)["total_passengers"]
+        .mean()
+        .reindex(range(1, n_periods + 1))
+        .reset_index()
+    )
+    seasonal["period_name"] = seasonal[period_col].map(
+        df.drop_duplicates(period_col).set_index(period_col)["period_name"]
+    )
+    aggs["seasonal"] = seasonal
+
+    aggs["city_flows"] = {m: city_flows(df, period_col, m) for m in present_flows(df)}
+    aggs["route_flows"] = {m: route_flows(df, period_col, m) for m in present_flows(df)}
+
+    city_balance = balance(aggs["city_flows"]["passengers"])
+    aggs["top_origin"] = city_balance.nlargest(10, "outbound")[["city", "outbound"]].reset_index(drop=True)
+    aggs["top_dest"] = city_balance.nlargest(10, "inbound")[["city", "inbound"]].reset_index(drop=True)
+    # the Overview KPIs live in kpi_snapshot.py
+    return aggs
+
+
+def aggregates_version(choice):
+    return stage_version(choice, "aggregates.py", "directional.py")
+
+
+@shared_cache("aggregates", version=aggregates_version)
+def load_aggregates(choice):
+    return build_aggregates(load_dataset(choice), DATASETS[choice]["grain"])
@@ -0,0 +1,203 @@
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cache_store import shared_cache
+from delay_model import CATEGORY_LABELS, load_delays, parse_used_date
+from dtypes import enforce_types
+from instrumentation import timed
+from manifest import fingerprint
+
+
+# OpenFlights airlines.dat has no header; \N marks a missing value and "-",
+# "N/A" or "" stand for "no code"
+AIRLINE_COLUMNS = ["airline_id", "name", "alias", "iata", "icao", "callsign", "country", "active"]
+NULLS = ["\\N", "", "-", "N/A"]
+
+# words that say nothing about which airline it is
+STOPWORDS = {"AIRLINES", "AIRLINE", "AIRWAYS", "AIRWAY", "LIMITED", "LTD", "INC", "CO", "COMPANY", "THE"}
+MIN_SCORE = 0.5
+# a candidate from the preferred country wins ties, never a clearly better match
+COUNTRY_BONUS = 0.05
+
+DELAY_SOURCES = ["flight_delay_cleaned.csv", "flight_delay.csv"]
+PERCENTILES = [0.5, 0.75, 0.9, 0.95]
+ON_TIME_MINUTES = 15
+# Status 0 marks a cancelled flight; its delays hold a 1440-minute sentinel
+CANCELLED = 0
+
+
+def load_airlines(path="airlines.dat"):
+    df = pd.read_csv(path, header=None, names=AIRLINE_COLUMNS, na_values=NULLS, keep_default_na=False,
+                     encoding="utf-8")
+    df = df[df["airline_id"] > 0]
+    df["active"] = df["active"].eq("Y")
+    return enforce_types(df.reset_index(drop=True), cities=())
+
+
+def _tokens(name):
+    words = re.sub(r"[^A-Z0-9]+", " ", str(name).upper()).split()
+    return [w for w in words if w not in STOPWORDS] or words
+
+
+class AirlineResolver:
+    # Name -> airline_id over the airline dimension. The normalized keys
+    # (names and aliases with spacing, punctuation and filler words removed,
+    # plus IATA/ICAO codes) and a token -> airline index are built once;
+    # resolve() scores each distinct query name against them and broadcasts
+    # the answer back to every row.
+
+    def __init__(self, airlines, country=None):
+        self.airlines = airlines.reset_index(drop=True)
+        self.country = country
+        keys, owners, token_owner, token_key = [], [], [], []
+        for i, row in enumerate(self.airlines.itertuples(index=False)):
+            for name in (row.name, row.alias):
+                if isinstance(name, str):
+                    tokens = _tokens(name)
+                    keys.append("".join(tokens))
+                    owners.append(i)
+                    token_owner += [i] * len(tokens)
+                    token_key += tokens
+            for code in (row.iata, row.icao):
+                if isinstance(code, str):
+                    keys.append(code.upper())
+                    owners.append(i)
+        self._keys = np.array(keys, dtype=str)
+        self._owners = np.array(owners, dtype=np.int64)
+        # token -> airlines carrying it, and each airline's token set size
+        tokens = pd.DataFrame({"token": token_key, "owner": token_owner}).drop_duplicates()
+        self._token_owners = {t: g.to_numpy() for t, g in tokens.groupby("token")["owner"]}
+        self._n_tokens = tokens.groupby("owner").size().reindex(range(len(self.airlines)), fill_value=0).to_numpy()
+        self._active = self.airlines["active"].to_numpy(dtype=bool)
+        self._home = (self.airlines["country"].astype(str).eq(country).to_numpy() if country
+                      else np.zeros(len(self.airlines), dtype=bool))
+
+    def _score(self, name):
+        tokens = _tokens(name)
+        compact = "".join(tokens)
+        if not compact:
+            return -1, 0.0
+        score = np.zeros(len(self.airlines))
+        # exact key, then one name containing the other ("VISTARA" in "AIRVISTARA")
+        if len(compact) >= 4:
+            contained = np.char.find(self._keys, compact) >= 0
+            np.maximum.at(score, self._owners[contained], 0.9)
+        score[self._owners[self._keys == compact]] = 1.0
+        # token overlap (Jaccard) for the rest
+        shared = np.zeros(len(self.airlines))
+        for token in set(tokens):
+            owners = self._token_owners.get(token)
+            if owners is not None:
+                shared[owners] += 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            jaccard = shared / (len(set(tokens)) + self._n_tokens - shared)
+        score = np.maximum(score, np.nan_to_num(jaccard))
+        ranked = score + COUNTRY_BONUS * self._home + 0.01 * self._active
+        best = int(np.argmax(ranked))
+        return (best, float(score[best])) if score[best] >= MIN_SCORE else (-1, float(score[best]))
+
+    def resolve(self, names):
+        # one row per input name: airline_id (missing when nothing scores
+        # MIN_SCORE), the matched airline and the match score
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=True)
+        scored = [self._score(u) for u in uniques]
+        pos = np.array([p for p, _ in scored] + [-1], dtype=np.int64)[codes]
+        score = np.array([s for _, s in scored] + [0.0])[codes]
+        hit = pos >= 0
+        safe = np.where(hit, pos, 0)
+
+        def take(col):
+            return pd.Series(self.airlines[col].astype(object).to_numpy()[safe]).where(hit)
+
+        return pd.DataFrame({"airline_id": take("airline_id").astype("Int32"), "airline": take("name"),
+                             "iata": take("iata"), "score": score})
+
+    def matches(self, names):
+        # distinct name -> airline table, for checking what the resolver decided
+        names = pd.Series(names, dtype=object)
+        counts = names.value_counts(dropna=True)
+        resolved = self.resolve(counts.index)
+        return resolved.assign(name=counts.index.to_numpy(), rows=counts.to_numpy())[
+            ["name", "rows", "airline", "iata", "airline_id", "score"]]
+
+
+def delay_source():
+    return next((path for path in DELAY_SOURCES if os.path.exists(path)), None)
+
+
+def rollups_version(path, airlines_path="airlines.dat"):
+    return fingerprint([path, airlines_path], ["airlines.py", "delay_model.py", "dtypes.py"])
+
+
+@timed("airlines.build_rollups")
+def build_rollups(delays, resolver):
+    # Airline-level OTP, delay percentiles and monthly market share from the
+    # delay feed. Free-text airline names are resolved once per distinct name.
+    # Cancelled flights count towards flights and the cancellation rate only;
+    # their sentinel delays stay out of every delay statistic.
+    resolved = resolver.resolve(delays["Airline"].astype(object))
+    cancelled = (pd.to_numeric(delays["Status"], errors="coerce") == CANCELLED).to_numpy()
+    flights = pd.DataFrame({
+        "airline": resolved["airline"].fillna(delays["Airline"].astype(str).str.strip()).to_numpy(),
+        "iata": resolved["iata"].to_numpy(),
+        "month": parse_used_date(delays["Used Date"]).dt.to_period("M").dt.to_timestamp(),
+        "dep_delay": pd.to_numeric(delays["Departure Delay"], errors="coerce"),
+        "arr_delay": pd.to_numeric(delays["Arrival Delay"], errors="coerce"),
+        "category": pd.to_numeric(delays["Category"], errors="coerce"),
+        "cancelled": cancelled,
+    })
+    flights.loc[cancelled, ["dep_delay", "arr_delay", "category"]] = np.nan
+    # on-time shares are over operated flights with a recorded delay
+    flights["dep_on_time"] = (flights["dep_delay"] <= ON_TIME_MINUTES).astype(float).where(flights["dep_delay"].notna())
+    flights["arr_on_time"] = (flights["arr_delay"] <= ON_TIME_MINUTES).astype(float).where(flights["arr_delay"].notna())
+
+    by_airline = flights.groupby(["airline", "iata"], dropna=False, sort=False)
+    summary = by_airline.agg(
+        flights=("dep_delay", "size"),
+        cancellation_rate=("cancelled", "mean"),
+        dep_otp=("dep_on_time", "mean"),
+        arr_otp=("arr_on_time", "mean"),
+        mean_dep_delay=("dep_delay", "mean"),
+    )
+    pct = by_airline["dep_delay"].quantile(PERCENTILES).unstack()
+    pct.columns = [f"dep_p{int(q * 100)}" for q in PERCENTILES]
+    arr_pct = by_airline["arr_delay"].quantile(PERCENTILES).unstack()
+    arr_pct.columns = [f"arr_p{int(q * 100)}" for q in PERCENTILES]
+    summary = summary.join(pct).join(arr_pct).reset_index()
+    summary["share"] = summary["flights"] / summary["flights"].sum()
+    summary = summary.sort_values("flights", ascending=False, ignore_index=True)
+
+    monthly = flights.dropna(subset=["month"]).groupby(["month", "airline"], sort=True).agg(
+        flights=("dep_delay", "size"), dep_otp=("dep_on_time", "mean")).reset_index()
+    monthly["share"] = monthly["flights"] / monthly.groupby("month")["flights"].transform("sum")
+
+    buckets = (flights.dropna(subset=["category"])
+               .groupby(["airline", "category"]).size().rename("flights").reset_index())
+    buckets["delay_bucket"] = buckets["category"].astype(int).map(CATEGORY_LABELS)
+    buckets["share"] = buckets["flights"] / buckets.groupby("airline")["flights"].transform("sum")
+
+    return {"summary": summary, "monthly": monthly, "buckets": buckets,
+            "matches": resolver.matches(delays["Airline"].astype(object))}
+
+
+@shared_cache("airline_rollups", version=rollups_version)
+def load_rollups(path, airlines_path="airlines.dat"):
+    resolver = AirlineResolver(load_airlines(airlines_path), country="India")
+    return build_rollups(load_delays(path), resolver)
+
+
+def main(argv=None):
+    path = (argv if argv is not None else sys.argv[1:]) or [delay_source()]
+    rollups = load_rollups(path[0])
+    print(rollups["matches"].to_string(index=False))
+    print()
+    print(rollups["summary"].to_string(index=False, float_format="{:.3f}".format))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
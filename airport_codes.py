@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+
+# Lookup order when a code exists in several namespaces; earlier wins. The
+# merge passes build_flight_datasets_offline used to chain were OurAirports
+# IATA -> OurAirports ident -> OpenFlights airport id -> OurAirports
+# local_code. OpenFlights IATA and ICAO are new namespaces, deliberately
+# placed ahead of the numeric OpenFlights id, so a code only OpenFlights
+# lists now resolves; the old chain reached OpenFlights through the id alone.
+CODE_NAMESPACES = ["oa_iata", "oa_ident", "of_iata", "of_icao"]
+ID_NAMESPACE = "of_id"
+LOCAL_NAMESPACE = "oa_local"
+PRECEDENCE = CODE_NAMESPACES + [ID_NAMESPACE, LOCAL_NAMESPACE]
+
+
+def _clean_codes(s):
+    # nulls are found before the cast to str: NAN (Nadi) is a real IATA code.
+    # \N is OpenFlights' null marker in its raw files.
+    s = pd.Series(s, dtype="object")
+    return s.astype(str).str.strip().str.upper().mask(s.isna()).replace({"": np.nan, "\\N": np.nan})
+
+
+def strip_k(codes):
+    # FAA style: KJFK -> JFK, vectorized
+    s = pd.Series(codes, dtype="object")
+    mask = (s.str.len() == 4) & s.str.startswith("K", na=False)
+    return s.where(~mask, s.str[1:])
+
+
+def _namespace_frame(codes, lat, lon, namespace):
+    out = pd.DataFrame({
+        "key": _clean_codes(codes).to_numpy(),
+        "lat": pd.to_numeric(pd.Series(lat), errors="coerce").to_numpy(),
+        "lon": pd.to_numeric(pd.Series(lon), errors="coerce").to_numpy(),
+    })
+    out["rank"] = PRECEDENCE.index(namespace)
+    return out.dropna(subset=["key", "lat", "lon"])
+
+
+class AirportCodeIndex:
+    # One lookup table per key type, each holding the best-ranked coordinate
+    # for every distinct key. Resolving is a get_indexer over the *unique*
+    # query codes followed by a take, so millions of route endpoints cost
+    # roughly one hash probe per distinct code.
+
+    def __init__(self, code_table, id_table, local_table):
+        self.codes = self._build(code_table)
+        self.ids = self._build(id_table)
+        self.local = self._build(local_table)
+
+    @staticmethod
+    def _build(table):
+        table = table.sort_values("rank", kind="stable").drop_duplicates("key")
+        return {
+            "index": pd.Index(table["key"].to_numpy()),
+            "lat": table["lat"].to_numpy(dtype=np.float64),
+            "lon": table["lon"].to_numpy(dtype=np.float64),
+            "rank": table["rank"].to_numpy(dtype=np.int8),
+        }
+
+    @classmethod
+    def from_sources(cls, ap_oa=None, ap_of=None):
+        code_parts, id_parts, local_parts = [], [], []
+        if ap_oa is not None:
+            code_parts.append(_namespace_frame(ap_oa["iata_code"], ap_oa["lat"], ap_oa["lon"], "oa_iata"))
+            code_parts.append(_namespace_frame(ap_oa["ident"], ap_oa["lat"], ap_oa["lon"], "oa_ident"))
+            if "local_code" in ap_oa.columns:
+                local_parts.append(_namespace_frame(ap_oa["local_code"], ap_oa["lat"], ap_oa["lon"], "oa_local"))
+        if ap_of is not None:
+            code_parts.append(_namespace_frame(ap_of["iata"], ap_of["lat"], ap_of["lon"], "of_iata"))
+            code_parts.append(_namespace_frame(ap_of["icao"], ap_of["lat"], ap_of["lon"], "of_icao"))
+            ids = pd.to_numeric(ap_of["airport_id"], errors="coerce").astype("Int64").astype("string")
+            id_parts.append(_namespace_frame(ids, ap_of["lat"], ap_of["lon"], "of_id"))
+
+        empty = pd.DataFrame({"key": [], "lat": [], "lon": [], "rank": []})
+        return cls(
+            pd.concat(code_parts or [empty], ignore_index=True),
+            pd.concat(id_parts or [empty], ignore_index=True),
+            pd.concat(local_parts or [empty], ignore_index=True),
+        )
+
+    @staticmethod
+    def _lookup(table, keys):
+        if not len(table["index"]) or not len(keys):
+            return np.full(len(keys), -1, dtype=np.intp)
+        return table["index"].get_indexer(keys)
+
+    def resolve(self, codes, ids=None):
+        # dictionary-encode the query once; cleaning and probing then only
+        # touch the distinct codes, and results are broadcast back by code
+        code_idx, uniq_codes = pd.factorize(pd.Series(codes, dtype="object"), use_na_sentinel=True)
+        keys = _clean_codes(uniq_codes).to_numpy()
+        code_pos = self._lookup(self.codes, keys)
+        local_pos = self._lookup(self.local, strip_k(keys).to_numpy())
+
+        n = len(code_idx)
+        has_code = code_idx >= 0
+        row_code = np.full(n, -1, dtype=np.intp)
+        row_local = np.full(n, -1, dtype=np.intp)
+        row_code[has_code] = code_pos[code_idx[has_code]]
+        row_local[has_code] = local_pos[code_idx[has_code]]
+
+        row_id = np.full(n, -1, dtype=np.intp)
+        if ids is not None:
+            id_idx, uniq_ids = pd.factorize(pd.to_numeric(pd.Series(ids), errors="coerce"))
+            id_keys = pd.Series(uniq_ids).astype("Int64").astype(str).to_numpy()
+            id_pos = self._lookup(self.ids, id_keys)
+            has_id = id_idx >= 0
+            row_id[has_id] = id_pos[id_idx[has_id]]
+
+        lat = np.full(n, np.nan)
+        lon = np.full(n, np.nan)
+        source = np.full(n, None, dtype=object)
+        todo = np.ones(n, dtype=bool)
+        # code namespaces outrank OpenFlights ids, which outrank local codes
+        for table, pos in [(self.codes, row_code), (self.ids, row_id), (self.local, row_local)]:
+            hit = todo & (pos >= 0)
+            lat[hit] = table["lat"][pos[hit]]
+            lon[hit] = table["lon"][pos[hit]]
+            source[hit] = np.array(PRECEDENCE, dtype=object)[table["rank"][pos[hit]]]
+            todo &= ~hit
+        return pd.DataFrame({"lat": lat, "lon": lon, "source": source})
+
+    def unmatched(self, codes, ids=None):
+        res = self.resolve(codes, ids)
+        miss = res["lat"].isna().to_numpy()
+        report = pd.DataFrame({"code": _clean_codes(pd.Series(codes, dtype="object").to_numpy()[miss]).to_numpy()})
+        return (
+            report.value_counts("code", dropna=False)
+            .rename("rows")
+            .reset_index()
+            .sort_values("rows", ascending=False, ignore_index=True)
+        )
+
+
+def merge_routes_with_coords(routes, ap_oa, ap_of, index=None):
+    index = index or AirportCodeIndex.from_sources(ap_oa, ap_of)
+    r = routes.copy()
+    for side in ["src", "dst"]:
+        ids = r[f"{side}_id"] if f"{side}_id" in r.columns else None
+        res = index.resolve(r[f"{side}_code"], ids)
+        r[f"lat_{side}"] = res["lat"].to_numpy()
+        r[f"lon_{side}"] = res["lon"].to_numpy()
+        r[f"{side}_match"] = res["source"].to_numpy()
+    return r
+
+
+def unmatched_report(routes, index):
+    src = index.unmatched(routes["src_code"], routes.get("src_id")).assign(side="src")
+    dst = index.unmatched(routes["dst_code"], routes.get("dst_id")).assign(side="dst")
+    return pd.concat([src, dst], ignore_index=True)
@@ -0,0 +1,199 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from forecast import SEASON_LENGTH, route_period_matrix
+from rollup import period_label
+
+
+WINDOW = 12
+MIN_PERIODS = 6
+THRESHOLD = 3.5
+
+# 0.6745 * (x - median) / MAD is ~N(0, 1) for normal data (Iglewicz & Hoaglin)
+MAD_SCALE = 0.6745
+
+
+def _robust_z(values, median, mad):
+    # routes with a flat history have MAD 0; floor it so one small change isn't infinite
+    floor = 0.01 * np.abs(median) + 1.0
+    return MAD_SCALE * (values - median) / np.maximum(mad, floor)
+
+
+def _period_keys(df, period_col):
+    return df["year"].to_numpy(dtype=np.int64) * SEASON_LENGTH[period_col] + df[period_col].to_numpy(dtype=np.int64) - 1
+
+
+def prefix_fingerprint(df, period_col, last_key):
+    # Order-independent hash of the rows up to last_key: the sum of the row
+    # hashes, so a corrected value, a removed route or a duplicated row all
+    # change it, while re-sorting the file does not.
+    rows = df.loc[_period_keys(df, period_col) <= last_key, ["route", "year", period_col, "total_passengers"]]
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    return f"{int(hashes.sum(dtype=np.uint64)):016x}-{len(rows)}"
+
+
+def _window_stats(windows):
+    # windows: (..., W) with NaN for months the route wasn't flown
+    with warnings.catch_warnings():
+        # all-NaN windows (route not flown yet) are expected
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(windows, axis=-1)
+        mad = np.nanmedian(np.abs(windows - median[..., None]), axis=-1)
+    enough = np.count_nonzero(~np.isnan(windows), axis=-1) >= MIN_PERIODS
+    return np.where(enough, median, np.nan), np.where(enough, mad, np.nan)
+
+
+class RouteAnomalies:
+    # Route x period matrices of observed traffic and the trailing median/MAD
+    # baseline each observation was scored against. The stored values double as
+    # the rolling window, so new periods are scored from the last WINDOW columns.
+
+    def __init__(self, routes, first_key, values, median, mad, period_col, window=WINDOW):
+        self.routes = np.asarray(routes, dtype=object)
+        self.first_key = first_key
+        self.values = values
+        self.median = median
+        self.mad = mad
+        self.period_col = period_col
+        self.window = window
+        # fingerprint of the code the baselines were computed with, and of the
+        # data up to last_key they were computed from
+        self.version = None
+        self.data_version = None
+        self._index = pd.Index(self.routes)
+
+    @property
+    def last_key(self):
+        return self.first_key + self.values.shape[1] - 1
+
+    @classmethod
+    def fit(cls, df, period_col="month", window=WINDOW):
+        Y, routes, first_key = route_period_matrix(df, period_col, fill_value=np.nan)
+        R, T = Y.shape
+        median = np.full((R, T), np.nan)
+        mad = np.full((R, T), np.nan)
+        if T > window:
+            # window ending at t-1 for every t >= window, all routes at once
+            windows = sliding_window_view(Y, window, axis=1)[:, :-1]
+            median[:, window:], mad[:, window:] = _window_stats(windows)
+        return cls(routes, first_key, Y, median, mad, period_col, window)
+
+    def update(self, new_rows):
+        # Score rows for periods after last_key. Medians and MADs are only
+        # computed for the new rows' windows; periods are processed in order so
+        # earlier new months feed later ones. Growing the arrays copies them
+        # and save() rewrites the whole file, so an update still moves
+        # O(history) bytes, just without recomputing any of it.
+        per_year = SEASON_LENGTH[self.period_col]
+        new_rows = new_rows.groupby(["route", "year", self.period_col], sort=False)["total_passengers"].sum().reset_index()
+        key = new_rows["year"].to_numpy(dtype=np.int64) * per_year + new_rows[self.period_col].to_numpy(dtype=np.int64) - 1
+        new_rows = new_rows[key > self.last_key]
+        key = key[key > self.last_key]
+        if new_rows.empty:
+            return self
+
+        new_routes = pd.Index(new_rows["route"].unique()).difference(self._index)
+        if len(new_routes):
+            pad = np.full((len(new_routes), self.values.shape[1]), np.nan)
+            self.values, self.median, self.mad = (np.vstack([a, pad]) for a in (self.values, self.median, self.mad))
+            self.routes = np.concatenate([self.routes, np.asarray(new_routes, dtype=object)])
+            self._index = pd.Index(self.routes)
+
+        extra = key.max() - self.last_key
+        pad = np.full((len(self.routes), extra), np.nan)
+        self.values, self.median, self.mad = (np.hstack([a, pad]) for a in (self.values, self.median, self.mad))
+
+        rows = self._index.get_indexer(new_rows["route"])
+        cols = key - self.first_key
+        vals = new_rows["total_passengers"].to_numpy(dtype=np.float64)
+        for t in np.unique(cols):
+            at = cols == t
+            r = rows[at]
+            self.values[r, t] = vals[at]
+            if t >= self.window:
+                self.median[r, t], self.mad[r, t] = _window_stats(self.values[r, t - self.window:t])
+        return self
+
+    def robust_z(self):
+        return _robust_z(self.values, self.median, self.mad)
+
+    def frame(self, threshold=None):
+        z = self.robust_z()
+        r, t = np.nonzero(~np.isnan(z) if threshold is None else np.abs(np.nan_to_num(z)) >= threshold)
+        keys = self.first_key + t
+        per_year = SEASON_LENGTH[self.period_col]
+        out = pd.DataFrame({
+            "route": self.routes[r],
+            "year": keys // per_year,
+            self.period_col: keys % per_year + 1,
+            "period": period_label(keys, self.period_col),
+            "total_passengers": self.values[r, t],
+            "baseline": self.median[r, t],
+            "mad": self.mad[r, t],
+            "robust_z": z[r, t],
+        })
+        out["direction"] = np.where(out["robust_z"] > 0, "spike", "drop")
+        return out.sort_values("robust_z", key=np.abs, ascending=False, ignore_index=True)
+
+    def route_series(self, route, threshold=THRESHOLD):
+        # band_low/band_high: the range within `threshold` robust z of the baseline
+        i = self._index.get_loc(route)
+        keys = self.first_key + np.arange(self.values.shape[1])
+        mad = np.maximum(self.mad[i], 0.01 * np.abs(self.median[i]) + 1.0)
+        return pd.DataFrame({
+            "period": period_label(keys, self.period_col),
+            "total_passengers": self.values[i],
+            "baseline": self.median[i],
+            "band_low": self.median[i] - threshold * mad / MAD_SCALE,
+            "band_high": self.median[i] + threshold * mad / MAD_SCALE,
+            "robust_z": _robust_z(self.values[i], self.median[i], self.mad[i]),
+        })
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            routes=self.routes.astype(str),
+            meta=np.array([self.first_key, self.window]),
+            period_col=np.array(self.period_col),
+            version=np.array(self.version or ""),
+            data_version=np.array(self.data_version or ""),
+            values=self.values, median=self.median, mad=self.mad,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            first_key, window = (int(v) for v in z["meta"])
+            model = cls(z["routes"].astype(object), first_key, z["values"], z["median"], z["mad"],
+                        str(z["period_col"]), window)
+            model.version = (str(z["version"]) or None) if "version" in z.files else None
+            model.data_version = (str(z["data_version"]) or None) if "data_version" in z.files else None
+            return model
+
+
+def load_or_update(df, period_col, path, window=WINDOW, version=None):
+    # Persisted baselines are extended with any periods newer than the stored
+    # ones, but only while the data they were computed from is unchanged: the
+    # rows up to last_key must hash to the stored data_version. A corrected
+    # historical row, a vanished route or changed code (`version`) refits.
+    if os.path.exists(path):
+        model = RouteAnomalies.load(path)
+        key = _period_keys(df, period_col)
+        if (model.period_col == period_col and model.window == window and model.first_key == key.min()
+                and (version is None or model.version == version)
+                and model.data_version == prefix_fingerprint(df, period_col, model.last_key)):
+            if key.max() > model.last_key:
+                model.update(df[key > model.last_key])
+                model.data_version = prefix_fingerprint(df, period_col, model.last_key)
+                model.save(path)
+            return model
+    model = RouteAnomalies.fit(df, period_col, window)
+    model.version = version
+    model.data_version = prefix_fingerprint(df, period_col, model.last_key)
+    model.save(path)
+    return model
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+MONTHS = {1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun",
+          7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"}
+
+# column -> (item prefix, [(upper bound, inclusive, label) ...], label above the last bound)
+# mirrors the fixed thresholds the Apriori page has always used
+LEVELS = {
+    "total_passengers": ("Pax", [(2000, False, "Low"), (10000, True, "Medium")], "High"),
+    "total_freight": ("Freight", [(0, "zero", "zero"), (2, False, "Low"), (50, True, "Medium")], "High"),
+    "total_mail": ("Mail", [(0, "zero", "zero"), (2, True, "Low"), (11, True, "Medium")], "High"),
+    "paxtocity2": ("PaxTo", [(1200, False, "Low"), (6000, True, "Medium")], "High"),
+    "paxfromcity2": ("PaxFrom", [(1200, False, "Low"), (6000, True, "Medium")], "High"),
+    "freighttocity2": ("FreightTo", [(0, "zero", "zero"), (0.75, False, "Low"), (15, True, "Medium")], "High"),
+    "freightfromcity2": ("FreightFrom", [(0, "zero", "zero"), (0.75, False, "Low"), (20, True, "Medium")], "High"),
+    "mailtocity2": ("MailTo", [(0, "zero", "zero"), (1.5, True, "Low"), (7, True, "Medium")], "High"),
+    "mailfromcity2": ("MailFrom", [(0, "zero", "zero"), (1.5, True, "Low"), (7, True, "Medium")], "High"),
+}
+
+RULE_COLUMNS = ["Antecedent", "Consequent", "Support", "SupportCount", "Confidence", "Lift"]
+
+
+def level_items(values, prefix, bounds, top):
+    x = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    conditions, labels = [], []
+    for bound, inclusive, label in bounds:
+        if inclusive == "zero":
+            conditions.append(x == 0)
+        elif inclusive:
+            conditions.append(x <= bound)
+        else:
+            conditions.append(x < bound)
+        labels.append(f"{prefix}_{label}")
+    # NaN fails every comparison and lands in the top bucket, as the row-wise version did
+    return np.select(conditions, labels, default=f"{prefix}_{top}")
+
+
+def basket_columns(df):
+    # one categorical column of items per basket slot
+    cols = {
+        "origin": "Origin=" + df["city1"].astype(str),
+        "dest": "Dest=" + df["city2"].astype(str),
+    }
+    if "month" in df.columns:
+        cols["month"] = "Month=" + df["month"].astype(int).map(MONTHS)
+    for col, (prefix, bounds, top) in LEVELS.items():
+        if col in df.columns:
+            cols[col] = level_items(df[col], prefix, bounds, top)
+    return pd.DataFrame(cols, index=df.index)
+
+
+def transaction_matrix(df):
+    # sparse transactions x items indicator matrix
+    baskets = basket_columns(df)
+    codes, items = pd.factorize(baskets.to_numpy().ravel())
+    rows = np.repeat(np.arange(len(baskets)), baskets.shape[1])
+    X = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (rows, codes)),
+        shape=(len(baskets), len(items)),
+    )
+    # each slot has its own prefix, so an item appears at most once per basket
+    return X, np.asarray(items, dtype=object)
+
+
+def mine_rules(df, min_support=0.01, min_confidence=0.4):
+    # Frequent single items and pairs (Apriori to depth 2) with every pair count
+    # from one sparse X.T @ X instead of a Python loop over baskets.
+    X, items = transaction_matrix(df)
+    n = X.shape[0]
+    min_count = max(1, math.ceil(min_support * n))
+
+    item_counts = np.asarray(X.sum(axis=0)).ravel()
+    frequent = np.flatnonzero(item_counts >= min_count)
+    Xf = X[:, frequent]
+    pair_counts = (Xf.T @ Xf).toarray()
+    counts = item_counts[frequent]
+    names = items[frequent]
+
+    i, j = np.triu_indices(len(frequent), k=1)
+    cnt = pair_counts[i, j]
+    keep = cnt >= min_count
+    i, j, cnt = i[keep], j[keep], cnt[keep]
+
+    support = cnt / n
+    conf_ij = cnt / counts[i]
+    conf_ji = cnt / counts[j]
+    lift_ij = conf_ij / (counts[j] / n)
+    lift_ji = conf_ji / (counts[i] / n)
+
+    forward = pd.DataFrame({"Antecedent": names[i], "Consequent": names[j], "Support": support,
+                            "SupportCount": cnt, "Confidence": conf_ij, "Lift": lift_ij})
+    backward = pd.DataFrame({"Antecedent": names[j], "Consequent": names[i], "Support": support,
+                             "SupportCount": cnt, "Confidence": conf_ji, "Lift": lift_ji})
+    rules = pd.concat([forward[conf_ij >= min_confidence], backward[conf_ji >= min_confidence]], ignore_index=True)
+    return rules.sort_values(["Lift", "Confidence", "Support"], ascending=False, ignore_index=True)[RULE_COLUMNS]
+
+
+def rule_groups(rules):
+    antecedent = rules["Antecedent"]
+    consequent = rules["Consequent"]
+    return {
+        "all": rules,
+        "seasonality": rules[antecedent.str.startswith("Month=")],
+        "traffic_correlation": rules[
+            antecedent.str.contains("Pax")
+            & (consequent.str.contains("Freight") | consequent.str.contains("Mail"))
+        ].head(50),
+        "imbalance": rules[
+            (antecedent.str.startswith("Origin=") | antecedent.str.startswith("Dest="))
+            & (consequent.str.contains("PaxTo") | consequent.str.contains("PaxFrom"))
+        ].head(50),
+    }
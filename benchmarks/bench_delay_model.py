@@ -0,0 +1,35 @@
+# Training time and batch-scoring throughput for delay_model.
+# Run from the repo root:  python benchmarks/bench_delay_model.py [scale ...]
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delay_model import score_schedule, train_delay_model  # noqa: E402
+
+
+def replicate(df, scale):
+    return pd.concat([df] * scale, ignore_index=True) if scale > 1 else df
+
+
+def main(scales):
+    base = pd.read_csv("flight_delay.csv", encoding="utf-8-sig")
+    bundle = train_delay_model(base)
+    print(f"train rows={bundle['metrics']['train_rows']:,}  "
+          f"seconds={bundle['metrics']['train_seconds']:.2f}  "
+          f"accuracy={bundle['metrics'].get('accuracy', float('nan')):.3f}")
+
+    for scale in scales:
+        schedule = replicate(base, scale)
+        start = time.perf_counter()
+        score_schedule(bundle, schedule)
+        elapsed = time.perf_counter() - start
+        print(f"score rows={len(schedule):>10,}  seconds={elapsed:.3f}  "
+              f"rows/s={len(schedule) / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [1, 10, 50])
@@ -0,0 +1,35 @@
+# Fit time for the route forecaster as the number of routes grows.
+# Run from the repo root:  python benchmarks/bench_forecast.py [scale ...]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast import SEASON_LENGTH, fit_routes, route_period_matrix  # noqa: E402
+from schema import adapt_schema  # noqa: E402
+
+
+def main(scales):
+    df = adapt_schema(pd.read_csv("domestic_city_processed.csv"), "month")
+    base, _, _ = route_period_matrix(df, "month")
+    m = SEASON_LENGTH["month"]
+    rng = np.random.default_rng(0)
+    n_jobs = os.cpu_count() or 1
+
+    for scale in scales:
+        # replicated routes with multiplicative noise so every copy is a distinct series
+        Y = np.tile(base, (scale, 1)) * rng.lognormal(0, 0.1, size=(len(base) * scale, base.shape[1]))
+        for jobs in sorted({1, n_jobs}):
+            start = time.perf_counter()
+            fit_routes(Y, m, n_jobs=jobs)
+            elapsed = time.perf_counter() - start
+            print(f"routes={len(Y):>9,}  periods={Y.shape[1]}  jobs={jobs:>2}  "
+                  f"seconds={elapsed:.2f}  routes/s={len(Y) / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [1, 10, 50])
@@ -0,0 +1,48 @@
+# Scenario evaluation time as the number of scenarios grows.
+# Run from the repo root:  python benchmarks/bench_scenarios.py [n_scenarios ...]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scenarios import DemandProfile, evaluate_all  # noqa: E402
+from schema import load_dataset  # noqa: E402
+
+
+def random_specs(profile, n, rng):
+    # growth, capacity on the top-N routes in a random block of periods, and a shift
+    m = profile.demand.shape[1]
+    specs = []
+    for i in range(n):
+        start = int(rng.integers(1, m + 1))
+        periods = [(start + k - 1) % m + 1 for k in range(3)]
+        specs.append({"name": f"s{i}", "transforms": [
+            {"kind": "growth", "pct": float(rng.uniform(-0.1, 0.3))},
+            {"kind": "capacity", "pct": float(rng.uniform(0, 0.4)), "routes": {"top": int(rng.integers(5, 200))},
+             "periods": periods},
+            {"kind": "shift", "share": float(rng.uniform(0, 0.2)), "periods": periods,
+             "to": [p for p in range(1, m + 1) if p not in periods]},
+        ]})
+    return specs
+
+
+def main(sizes):
+    profile = DemandProfile.from_frame(load_dataset("Domestic"), "month")
+    rng = np.random.default_rng(0)
+    n_jobs = os.cpu_count() or 1
+
+    for n in sizes:
+        specs = random_specs(profile, n, rng)
+        for jobs in sorted({1, n_jobs}):
+            start = time.perf_counter()
+            evaluate_all(profile, specs, n_jobs=jobs)
+            elapsed = time.perf_counter() - start
+            print(f"scenarios={n:>6,}  routes={len(profile.routes):,}  jobs={jobs:>2}  "
+                  f"seconds={elapsed:.2f}  scenarios/s={n / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or [100, 1000, 5000])
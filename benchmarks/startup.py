@@ -0,0 +1,61 @@
+# Import cost of the dashboard's module-level imports, measured the way a cold
+# Streamlit script run pays it. Exits non-zero when the total is over budget.
+# Run from the repo root:  python benchmarks/startup.py [budget_ms]
+#   (or set STARTUP_BUDGET_MS; default 2500)
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "1.py")
+
+# heavy libraries that must only load when the tab that needs them is opened
+DEFERRED = ["sklearn", "networkx", "scipy.sparse", "statsmodels"]
+
+
+def top_level_imports(path):
+    tree = ast.parse(open(path, encoding="utf-8").read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_profile(statements):
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr
+    code = "\n".join(statements)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # nesting is shown by indentation after the single separator space
+        rows.append((name.rstrip()[1:], int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(budget_ms):
+    statements = top_level_imports(SCRIPT)
+    rows = import_profile(statements)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    loaded = {name.strip() for name, _, _ in rows}
+
+    print(f"{len(statements)} import statements in 1.py, {len(rows)} modules loaded, {total_ms:.0f} ms total")
+    print("slowest top-level packages (cumulative ms):")
+    top = sorted((r for r in rows if not r[0].startswith(" ")), key=lambda r: -r[2])[:15]
+    for name, _, cumulative_us in top:
+        print(f"  {cumulative_us / 1000:8.1f}  {name}")
+
+    eager = [mod for mod in DEFERRED if mod in loaded]
+    if eager:
+        print(f"FAIL: loaded at startup but should be deferred: {', '.join(eager)}")
+    if total_ms > budget_ms:
+        print(f"FAIL: {total_ms:.0f} ms is over the {budget_ms:.0f} ms budget")
+    return 1 if eager or total_ms > budget_ms else 0
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.environ.get("STARTUP_BUDGET_MS", 2500))
+    sys.exit(main(budget))
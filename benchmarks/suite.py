@@ -0,0 +1,335 @@
+# Time and peak memory for every expensive stage of the dashboard, on synthetic
+# data (synthetic.py) at several multiples of the city.csv row count. Stages
+# are either the extracted functions the app calls (load, aggregates,
+# forecasting, ...) or a headless AppTest run of one dashboard tab with the
+# dataset already loaded, so a tab's number is what a user pays when
+# switching to it.
+#
+# Run from the repo root:
+#   python benchmarks/suite.py [scale ...]            compare against the baseline
+#   python benchmarks/suite.py --save-baseline 1 10   record a new baseline
+# The default scales are the ones baseline.json covers; other scales, e.g.
+# 100, are measured and printed but not checked.
+# A stage fails when it is slower than tolerance x baseline plus a slack; the
+# run then exits non-zero. Timings are scaled by a fixed calibration workload
+# timed at the start of every scale, so a baseline recorded on another
+# machine still gates the same amount of work; it is still best re-recorded
+# on the machine that runs the gate. The calibration only ever loosens the
+# budget: one fast calibration run must not tighten every stage at once.
+# AppTest stages are mostly sub-second and run once (a second run would hit
+# st.cache), so their slack is relative to the stage's own time. Peak memory
+# is gated for the function stages only: AppTest stages share one process
+# with Streamlit's caches, so their sampled RSS deltas are mostly noise.
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# cold caches: nothing is reused from .cache/shared between runs or stages
+os.environ["FLIGHTS_CACHE_BACKEND"] = "none"
+
+from association import mine_rules, rule_groups  # noqa: E402
+from aggregates import build_aggregates  # noqa: E402
+from anomalies import load_or_update  # noqa: E402
+from forecast import load_or_fit  # noqa: E402
+from growth import growth_table  # noqa: E402
+from kpi_snapshot import build_snapshot  # noqa: E402
+from schema import load_dataset  # noqa: E402
+from seasonality import build_seasonality_table  # noqa: E402
+from synthetic import write_csv  # noqa: E402
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+SLACK_SECONDS = 0.05
+# extra allowance for AppTest stages, as a share of the expected time
+APP_SLACK = 0.5
+# sampled RSS moves by tens of MB between identical runs (allocator, GC timing)
+SLACK_MB = 50.0
+CALIBRATION = "calibration"
+
+# files the app reads besides the dataset itself
+SUPPORT_FILES = ["airports_india.csv", "city_internatinal.csv", "data_out"]
+
+STATS_TABS = [
+    "Overview", "Top Routes", "Top Cities", "Yearly Trend", "Monthly trend",
+    "Traffic Composition", "Route Composition", "Route analysis",
+    "Passenger-km", "Route Map", "Anomalies", "Growth", "Directional Flow",
+]
+MAIN_TABS = ["Correlation", "Modeling"]
+
+
+def processed(raw):
+    # the columns domestic_city_processed.csv has after the preprocessing notebook
+    df = raw.copy()
+    df.columns = df.columns.str.strip().str.lower()
+    for col in ["city1", "city2"]:
+        df[col] = df[col].astype(str).str.strip().str.upper()
+    for total, to_col, from_col in [("total_passengers", "paxtocity2", "paxfromcity2"),
+                                    ("total_freight", "freighttocity2", "freightfromcity2"),
+                                    ("total_mail", "mailtocity2", "mailfromcity2")]:
+        df[total] = df[to_col].fillna(0) + df[from_col].fillna(0)
+    df["traffic_type"] = "domestic"
+    return df
+
+
+def make_workdir(scale):
+    workdir = tempfile.mkdtemp(prefix=f"flights-bench-{scale}x-")
+    # scale x the row count of city.csv, streamed from the synthetic generator
+    with open(os.path.join(ROOT, "city.csv")) as f:
+        base_rows = sum(1 for _ in f) - 1
+    write_csv(os.path.join(workdir, "domestic_city_processed.csv"), "city", base_rows * scale,
+              transform=processed, airports_path=os.path.join(ROOT, "airports_india.csv"))
+    for name in SUPPORT_FILES:
+        src = os.path.join(ROOT, name)
+        if os.path.exists(src):
+            os.symlink(src, os.path.join(workdir, name))
+    return workdir
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class PeakRSS(threading.Thread):
+    # Samples resident memory while a stage runs. tracemalloc would see every
+    # allocation but slows pandas-heavy stages by an order of magnitude, which
+    # makes the timings useless; sampling costs nothing measurable.
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = self.peak = _rss_bytes()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, _rss_bytes())
+        return (self.peak - self.start_rss) / 1024 ** 2
+
+
+def warm_imports():
+    # Libraries the app imports on first use. Loaded once up front, so a
+    # stage's time doesn't depend on whether an earlier scale already paid
+    # for the import.
+    import networkx  # noqa: F401
+    import scipy.sparse  # noqa: F401
+    import sklearn.cluster  # noqa: F401
+    import sklearn.decomposition  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+
+
+def calibrate(repeats=5):
+    # a fixed NumPy/pandas workload; its median time is this machine's unit of speed
+    rng = np.random.default_rng(0)
+    x = rng.random(2_000_000)
+    frame = pd.DataFrame({"key": (x * 10_000).astype(np.int64), "value": x})
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        np.sort(x)
+        frame.groupby("key")["value"].agg(["sum", "median"])
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def measure(fn):
+    # seconds and peak resident memory above the level the stage started at
+    gc.collect()
+    sampler = PeakRSS()
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak_mb = sampler.stop()
+    return result, elapsed, peak_mb
+
+
+def function_stages(ctx):
+    # (name, callable) pairs; later stages read what earlier ones put in ctx
+    def load():
+        ctx["df"] = load_dataset("Domestic")
+        return len(ctx["df"])
+
+    def aggregates():
+        ctx["aggs"] = build_aggregates(ctx["df"], "month")
+
+    def seasonality():
+        build_seasonality_table(ctx["df"], "month")
+
+    def growth():
+        growth_table(ctx["aggs"]["route_year"], 12)
+
+    def kpi_snapshot():
+        build_snapshot(ctx["df"], "month", ctx["aggs"]["route_year"])
+
+    def forecast():
+        load_or_fit(ctx["df"], "month", os.path.join(".cache", "forecast_domestic.npz"))
+
+    def anomalies():
+        load_or_update(ctx["df"], "month", os.path.join(".cache", "anomalies_domestic.npz"))
+
+    def od_tensor():
+        from od_tensor import ODTensor
+
+        ODTensor.from_frame(ctx["df"], "month").top_k(5)
+
+    def network_graph():
+        from network import build_route_graph
+
+        build_route_graph(ctx["df"])
+
+    def correlation():
+        ctx["df"].select_dtypes(include=[np.number]).corr()
+
+    def clustering():
+        import modeling
+
+        X = modeling.standardize(ctx["df"].select_dtypes(include=[np.number]).dropna())
+        modeling.kmeans(X, 4)
+        modeling.pca_2d(X)
+
+    def association():
+        rule_groups(mine_rules(pd.read_csv("domestic_city_processed.csv")))
+
+    return [("load_data", load), ("aggregates", aggregates), ("seasonality", seasonality),
+            ("growth", growth), ("kpi_snapshot", kpi_snapshot), ("forecast_fit", forecast), ("anomalies_fit", anomalies),
+            ("od_tensor", od_tensor), ("network_graph", network_graph),
+            ("correlation", correlation), ("clustering", clustering), ("association_rules", association)]
+
+
+def app_stages():
+    from streamlit.testing.v1 import AppTest
+
+    def run(script, **state):
+        def go():
+            at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=3600)
+            for key, value in state.items():
+                at.session_state[key] = value
+            at.run()
+            errors = [e.value for e in at.exception]
+            if errors:
+                raise RuntimeError(f"{script} {state}: {errors[0]}")
+        return go
+
+    # the first run pays for load_data/aggregates; later tabs reuse them from st.cache
+    stages = [("app:first_load", run("1.py"))]
+    stages += [(f"app:{tab}", run("1.py", stats_tab=tab)) for tab in STATS_TABS[1:]]
+    stages += [(f"app:{tab}", run("1.py", main_tab=tab)) for tab in MAIN_TABS]
+    stages.append(("app:asso_page", run(os.path.join("pages", "asso.py"))))
+    return stages
+
+
+def run_scale(scale, with_app, only):
+    workdir = make_workdir(scale)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    results = {CALIBRATION: {"seconds": round(calibrate(), 4)}}
+    print(f"  {CALIBRATION:<28} {results[CALIBRATION]['seconds']:9.3f} s")
+    try:
+        ctx = {}
+        stages = function_stages(ctx)
+        if with_app:
+            import streamlit as st
+
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            stages += app_stages()
+        for name, fn in stages:
+            # load_data and aggregates feed later stages, so they always run
+            if only and not any(s in name for s in only) and name not in ("load_data", "aggregates"):
+                continue
+            result, seconds, peak_mb = measure(fn)
+            results[name] = {"seconds": round(seconds, 4), "peak_mb": round(peak_mb, 1)}
+            if name == "load_data":
+                results[name]["rows"] = result
+            print(f"  {name:<28} {seconds:9.3f} s  {peak_mb:9.1f} MB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    failures = []
+    for scale, stages in results.items():
+        ref_stages = baseline.get(scale)
+        if ref_stages is None:
+            print(f"no baseline for {scale}x; not checked")
+            continue
+        # > 1 when this machine is slower than the one the baseline came from
+        speed = 1.0
+        if CALIBRATION in stages and CALIBRATION in ref_stages:
+            speed = max(1.0, stages[CALIBRATION]["seconds"] / ref_stages[CALIBRATION]["seconds"])
+        for name, got in stages.items():
+            ref = ref_stages.get(name)
+            if ref is None or name == CALIBRATION:
+                continue
+            expected = ref["seconds"] * speed
+            slack = SLACK_SECONDS + (APP_SLACK * expected if name.startswith("app:") else 0.0)
+            if got["seconds"] > expected * tolerance + slack:
+                failures.append(f"{scale}x {name}: {got['seconds']:.3f} s vs baseline {expected:.3f} s "
+                                f"({ref['seconds']:.3f} s x {speed:.2f} machine speed)")
+            if not name.startswith("app:") and got["peak_mb"] > ref["peak_mb"] * tolerance + SLACK_MB:
+                failures.append(f"{scale}x {name}: {got['peak_mb']:.1f} MB vs baseline {ref['peak_mb']:.1f} MB")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scales", nargs="*", type=int, default=[1, 10])
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--no-app", action="store_true", help="skip the AppTest tab stages")
+    parser.add_argument("--only", nargs="*", default=[], help="run stages whose name contains any of these")
+    parser.add_argument("--output", help="also write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    warm_imports()
+    results = {}
+    for scale in args.scales:
+        print(f"scale {scale}x")
+        results[str(scale)] = run_scale(scale, not args.no_app, args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if args.save_baseline:
+        for scale, stages in results.items():
+            baseline.setdefault(scale, {}).update(stages)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    failures = regressions(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
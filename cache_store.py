@@ -0,0 +1,225 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from instrumentation import span
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pickle-only store
+    pa = None
+
+
+CACHE_FORMAT = 1
+# a full store is trimmed to this share of max_bytes, so the next few writes
+# don't each trigger another scan
+EVICT_TO = 0.8
+
+_MISSING = object()
+
+
+def cache_key(namespace, version, args=(), kwargs=None):
+    # Versioned, content-addressed key: the same call against the same data
+    # version maps to the same key in every process.
+    parts = repr((CACHE_FORMAT, namespace, version, args, sorted((kwargs or {}).items())))
+    return hashlib.sha256(parts.encode()).hexdigest()
+
+
+class MemoryStore:
+    # per-process LRU; the default when no shared directory is configured
+
+    def __init__(self, max_items=64):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+class DiskStore:
+    # Content-addressed files under root/<2 hex>/<key>. DataFrames are written
+    # as uncompressed Arrow IPC and read memory-mapped, which skips unpickling
+    # and decompression; to_pandas() still builds a private frame in every
+    # process (categorical and string columns are always copied), so replicas
+    # share the file's pages, not the frame. Anything else is pickled. Writes
+    # go to a temp file and are renamed into place, so readers never see
+    # partial entries and no cross-process lock is needed. Reads touch the
+    # file's mtime, which is what LRU eviction orders by.
+
+    def __init__(self, root, max_bytes=2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        # running estimate of the store's size: this process's writes on top
+        # of the last full scan. Only when it passes max_bytes is the store
+        # walked again (picking up other processes' writes) and trimmed.
+        self._total = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key, default=_MISSING):
+        for suffix, reader in ((".arrow", self._read_arrow), (".pkl", self._read_pickle)):
+            path = self._path(key) + suffix
+            try:
+                value = reader(path)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # corrupt or from an incompatible version: drop it and recompute
+                self._remove(path)
+                continue
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return value
+        return default
+
+    def put(self, key, value):
+        use_arrow = (pa is not None and isinstance(value, pd.DataFrame)
+                     and isinstance(value.index, pd.RangeIndex) and value.columns.is_unique)
+        path = self._path(key) + (".arrow" if use_arrow else ".pkl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if use_arrow:
+                    feather.write_feather(value, f, compression="uncompressed")
+                else:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            written = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        with self._lock:
+            if self._total is not None:
+                self._total += written
+            over = self._total is None or self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def _read_arrow(self, path):
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas()
+
+    def _read_pickle(self, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def entries(self):
+        out = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                out.append((stat.st_mtime, stat.st_size, path))
+        return out
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                self._remove(path)
+                total -= size
+        with self._lock:
+            self._total = total
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self._remove(path)
+        with self._lock:
+            self._total = 0
+
+
+class NullStore:
+    def get(self, key, default=_MISSING):
+        return default
+
+    def put(self, key, value):
+        pass
+
+
+_store = None
+
+
+def get_store():
+    # FLIGHTS_CACHE_BACKEND = disk | memory | none
+    global _store
+    if _store is None:
+        backend = os.environ.get("FLIGHTS_CACHE_BACKEND", "disk")
+        if backend == "disk":
+            _store = DiskStore(
+                os.environ.get("FLIGHTS_CACHE_DIR", os.path.join(".cache", "shared")),
+                max_bytes=int(float(os.environ.get("FLIGHTS_CACHE_MAX_MB", 2048)) * 1024 ** 2),
+            )
+        elif backend == "memory":
+            _store = MemoryStore()
+        elif backend == "none":
+            _store = NullStore()
+        else:
+            raise ValueError(f"Unknown FLIGHTS_CACHE_BACKEND {backend!r} (expected disk, memory or none)")
+    return _store
+
+
+def set_store(store):
+    global _store
+    _store = store
+
+
+def shared_cache(namespace, version):
+    # Cache a function's result in the shared store. `version` is called with
+    # the same arguments and must change whenever the underlying data does.
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(f"shared_cache.{namespace}") as record:
+                key = cache_key(namespace, version(*args, **kwargs), args, kwargs)
+                store = get_store()
+                value = store.get(key)
+                record["cache"] = "hit" if value is not _MISSING else "miss"
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    store.put(key, value)
+            return value
+        return wrapper
+    return decorate
@@ -0,0 +1,237 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from dtypes import enforce_types
+
+
+# Category in flight_delay.csv buckets the departure delay:
+# 0 -> on time / early, 1 -> 1-15, 2 -> 16-30, 3 -> 31-60, 4 -> over 60 minutes
+CATEGORY_LABELS = {
+    0: "On Time",
+    1: "Delay 1-15 min",
+    2: "Delay 16-30 min",
+    3: "Delay 31-60 min",
+    4: "Delay > 60 min",
+}
+
+NUMERIC_FEATURES = [
+    "Distance", "Passenger Load Factor",
+    "Airline Rating", "Airport Rating", "Market Share", "OTP Index",
+    "weather__hourly__windspeedKmph", "weather__hourly__precipMM",
+    "weather__hourly__humidity", "weather__hourly__visibility",
+    "weather__hourly__pressure", "weather__hourly__cloudcover",
+]
+
+CATEGORICAL_FEATURES = ["From", "To", "Airline", "weather__hourly__weatherDesc__value"]
+
+TARGET = "Category"
+
+
+def load_delays(path, **read_csv_kw):
+    # flight_delay(.csv/_cleaned.csv) in the typed schema: airports, airline
+    # and weather text as categoricals, whole-number columns as int32
+    df = pd.read_csv(path, encoding="utf-8-sig", **read_csv_kw)
+    df.columns = df.columns.str.strip()
+    return enforce_types(df, cities=())
+
+
+def parse_hhmm(values):
+    # 605 / "06:05" / "6:05" -> minutes since midnight, without a per-row apply
+    s = pd.Series(values).astype(str).str.strip().str.replace(":", "", regex=False)
+    hhmm = pd.to_numeric(s, errors="coerce")
+    mins = (hhmm // 100) * 60 + (hhmm % 100)
+    return mins.where((mins >= 0) & (mins < 24 * 60)).to_numpy(dtype=np.float64)
+
+
+def parse_used_date(values):
+    # typed frames hold the dates as a categorical, which to_datetime keeps
+    s = pd.Series(values).astype(object)
+    dates = pd.to_datetime(s, format="%d-%m-%Y", errors="coerce")
+    missing = dates.isna()
+    if missing.any():
+        # flight_delay_cleaned.csv already stores ISO dates
+        dates[missing] = pd.to_datetime(s[missing], errors="coerce", dayfirst=True)
+    return dates
+
+
+class DelayFeatureTransformer:
+    # Turns a schedule frame into a dense float32 matrix in one pass.
+    # All learned state is plain lists / NumPy arrays so the fitted
+    # transformer pickles cleanly and can be shipped with the model.
+
+    def __init__(self, numeric=None, categorical=None, min_category_count=5):
+        self.numeric = list(numeric or NUMERIC_FEATURES)
+        self.categorical = list(categorical or CATEGORICAL_FEATURES)
+        self.min_category_count = min_category_count
+        self.medians_ = None
+        self.means_ = None
+        self.stds_ = None
+        self.vocab_ = None
+        self.feature_names_ = None
+
+    def _numeric_block(self, df):
+        cols = [pd.to_numeric(df[c], errors="coerce") if c in df.columns
+                else pd.Series(np.nan, index=df.index) for c in self.numeric]
+        return np.column_stack([c.to_numpy(dtype=np.float64) for c in cols]) if cols \
+            else np.empty((len(df), 0))
+
+    def _time_block(self, df):
+        sched = df["SDEP"] if "SDEP" in df.columns else df.get("Scheduled Departure")
+        mins = parse_hhmm(sched) if sched is not None else np.full(len(df), np.nan)
+        mins = np.where(np.isnan(mins), 12 * 60, mins)
+        angle = 2 * np.pi * mins / (24 * 60)
+
+        if "Used Date" in df.columns:
+            dates = parse_used_date(df["Used Date"])
+            dow = dates.dt.dayofweek.to_numpy(dtype=np.float64)
+            month = dates.dt.month.to_numpy(dtype=np.float64)
+        else:
+            dow = np.full(len(df), np.nan)
+            month = np.full(len(df), np.nan)
+        dow = np.where(np.isnan(dow), 0, dow)
+        month = np.where(np.isnan(month), 1, month)
+        m_angle = 2 * np.pi * (month - 1) / 12
+
+        return np.column_stack([
+            np.sin(angle), np.cos(angle),
+            (dow >= 5).astype(np.float64),
+            np.sin(m_angle), np.cos(m_angle),
+        ])
+
+    def fit(self, df):
+        num = self._numeric_block(df)
+        self.medians_ = np.nanmedian(num, axis=0) if num.size else np.zeros(0)
+        self.medians_ = np.where(np.isnan(self.medians_), 0.0, self.medians_)
+        filled = np.where(np.isnan(num), self.medians_, num)
+        self.means_ = filled.mean(axis=0)
+        self.stds_ = filled.std(axis=0)
+        self.stds_[self.stds_ == 0] = 1.0
+
+        self.vocab_ = {}
+        for c in self.categorical:
+            if c not in df.columns:
+                self.vocab_[c] = []
+                continue
+            counts = df[c].astype(str).str.strip().value_counts()
+            self.vocab_[c] = sorted(counts[counts >= self.min_category_count].index)
+
+        self.feature_names_ = (
+            list(self.numeric)
+            + ["sdep_sin", "sdep_cos", "is_weekend", "month_sin", "month_cos"]
+            + [f"{c}={v}" for c in self.categorical for v in self.vocab_[c]]
+        )
+        return self
+
+    def transform(self, df):
+        if self.vocab_ is None:
+            raise RuntimeError("DelayFeatureTransformer must be fitted before transform")
+        n = len(df)
+        num = self._numeric_block(df)
+        num = np.where(np.isnan(num), self.medians_, num)
+        num = (num - self.means_) / self.stds_
+
+        blocks = [num, self._time_block(df)]
+        for c in self.categorical:
+            vocab = self.vocab_[c]
+            onehot = np.zeros((n, len(vocab)), dtype=np.float32)
+            if vocab and c in df.columns:
+                # unseen / rare values map to -1 and stay all-zero
+                codes = pd.Categorical(df[c].astype(str).str.strip(), categories=vocab).codes
+                hit = codes >= 0
+                onehot[np.flatnonzero(hit), codes[hit]] = 1.0
+            blocks.append(onehot)
+        return np.hstack(blocks).astype(np.float32, copy=False)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+
+def make_estimator(kind="gbm", random_state=42):
+    if kind == "gbm":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(
+            max_iter=200, learning_rate=0.1, early_stopping=True,
+            validation_fraction=0.1, n_iter_no_change=10, random_state=random_state,
+        )
+    if kind == "linear":
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000)
+    raise ValueError(f"Unknown model kind: {kind!r} (expected 'gbm' or 'linear')")
+
+
+def train_delay_model(df, kind="gbm", test_size=0.2, random_state=42):
+    df = df[pd.to_numeric(df[TARGET], errors="coerce").notna()]
+    y = pd.to_numeric(df[TARGET]).astype(int).to_numpy()
+
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(df))
+    n_test = int(len(df) * test_size)
+    test_idx, train_idx = order[:n_test], order[n_test:]
+
+    start = time.perf_counter()
+    transformer = DelayFeatureTransformer().fit(df.iloc[train_idx])
+    X_train = transformer.transform(df.iloc[train_idx])
+    model = make_estimator(kind, random_state=random_state)
+    model.fit(X_train, y[train_idx])
+    train_seconds = time.perf_counter() - start
+
+    metrics = {"train_rows": len(train_idx), "train_seconds": train_seconds}
+    if n_test:
+        X_test = transformer.transform(df.iloc[test_idx])
+        pred = model.predict(X_test)
+        metrics["test_rows"] = n_test
+        metrics["accuracy"] = float((pred == y[test_idx]).mean())
+        # share of truly delayed (>15 min) flights the model also puts above 15 min
+        delayed = y[test_idx] >= 2
+        if delayed.any():
+            metrics["delayed_recall"] = float((pred[delayed] >= 2).mean())
+
+    return {"kind": kind, "transformer": transformer, "model": model, "metrics": metrics}
+
+
+def score_schedule(bundle, schedule):
+    # Scores a whole schedule in one predict_proba call.
+    X = bundle["transformer"].transform(schedule)
+    model = bundle["model"]
+    proba = model.predict_proba(X)
+    classes = np.asarray(model.classes_)
+    pred = classes[proba.argmax(axis=1)]
+    delayed_cols = classes >= 2
+    return {
+        "category": pred,
+        "proba": proba,
+        "classes": classes,
+        "p_delay_over_15": proba[:, delayed_cols].sum(axis=1),
+    }
+
+
+def scored_frame(bundle, schedule):
+    scores = score_schedule(bundle, schedule)
+    out = schedule.copy()
+    out["pred_category"] = scores["category"]
+    out["pred_label"] = pd.Series(scores["category"]).map(CATEGORY_LABELS).to_numpy()
+    out["p_delay_over_15"] = scores["p_delay_over_15"]
+    return out
+
+
+def save_model(bundle, path):
+    import joblib
+    joblib.dump(bundle, path)
+
+
+def load_model(path):
+    import joblib
+    return joblib.load(path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    data_path = sys.argv[1] if len(sys.argv) > 1 else "flight_delay.csv"
+    out_path = sys.argv[2] if len(sys.argv) > 2 else "delay_model.joblib"
+    bundle = train_delay_model(load_delays(data_path))
+    save_model(bundle, out_path)
+    print("Saved:", out_path)
+    print(bundle["metrics"])
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from forecast import SEASON_LENGTH
+from rollup import period_label
+
+
+# measure -> (city1 -> city2 column, city2 -> city1 column)
+DIRECTIONAL = {
+    "passengers": ("paxtocity2", "paxfromcity2"),
+    "freight": ("freighttocity2", "freightfromcity2"),
+    "mail": ("mailtocity2", "mailfromcity2"),
+}
+
+
+def present_flows(df):
+    return [m for m, cols in DIRECTIONAL.items() if set(cols) <= set(df.columns)]
+
+
+def _period_keys(df, period_col):
+    return df["year"].to_numpy(dtype=np.int64) * SEASON_LENGTH[period_col] + df[period_col].to_numpy(dtype=np.int64) - 1
+
+
+def city_flows(df, period_col="month", measure="passengers"):
+    # Outbound/inbound per (period, city). Each row contributes to both of its
+    # cities: city1 sends `to` and receives `from`, city2 the reverse. Codes come
+    # from one factorize over both columns, so a city that only ever appears as
+    # city2 still lines up with its city1 rows.
+    to_col, from_col = DIRECTIONAL[measure]
+    to_val = df[to_col].fillna(0).to_numpy(dtype=np.float64)
+    from_val = df[from_col].fillna(0).to_numpy(dtype=np.float64)
+
+    n = len(df)
+    codes, cities = pd.factorize(pd.concat([df["city1"], df["city2"]], ignore_index=True))
+    c1, c2 = codes[:n], codes[n:]
+    period_codes, periods = pd.factorize(_period_keys(df, period_col), sort=True)
+
+    size = len(cities) * len(periods)
+    slot1 = period_codes * len(cities) + c1
+    slot2 = period_codes * len(cities) + c2
+    outbound = np.bincount(slot1, to_val, size) + np.bincount(slot2, from_val, size)
+    inbound = np.bincount(slot1, from_val, size) + np.bincount(slot2, to_val, size)
+
+    p, c = np.divmod(np.arange(size), len(cities))
+    out = pd.DataFrame({
+        "period_key": periods[p],
+        "city": np.asarray(cities, dtype=object)[c],
+        "outbound": outbound,
+        "inbound": inbound,
+    })
+    out = out[(out["outbound"] > 0) | (out["inbound"] > 0)].reset_index(drop=True)
+    out["period"] = period_label(out["period_key"], period_col)
+    return out
+
+
+def route_flows(df, period_col="month", measure="passengers"):
+    # One row per (period, unordered city pair) with both directions side by side.
+    to_col, from_col = DIRECTIONAL[measure]
+    a = df["city1"].to_numpy(dtype=object)
+    b = df["city2"].to_numpy(dtype=object)
+    to_val = df[to_col].fillna(0).to_numpy(dtype=np.float64)
+    from_val = df[from_col].fillna(0).to_numpy(dtype=np.float64)
+
+    swap = a > b
+    flows = pd.DataFrame({
+        "period_key": _period_keys(df, period_col),
+        "city_a": np.where(swap, b, a),
+        "city_b": np.where(swap, a, b),
+        "a_to_b": np.where(swap, from_val, to_val),
+        "b_to_a": np.where(swap, to_val, from_val),
+    })
+    out = flows.groupby(["period_key", "city_a", "city_b"], sort=False).sum().reset_index()
+    out["period"] = period_label(out["period_key"], period_col)
+    return out
+
+
+def balance(flows, start_key=None, end_key=None, by=("city",)):
+    # Sum a flows table over a period range and add net/imbalance columns.
+    rows = flows
+    if start_key is not None:
+        rows = rows[rows["period_key"] >= start_key]
+    if end_key is not None:
+        rows = rows[rows["period_key"] <= end_key]
+    value_cols = [c for c in ["outbound", "inbound", "a_to_b", "b_to_a"] if c in rows.columns]
+    out = rows.groupby(list(by), sort=False)[value_cols].sum().reset_index()
+
+    first, second = ("outbound", "inbound") if "outbound" in out.columns else ("a_to_b", "b_to_a")
+    out["total"] = out[first] + out[second]
+    out["net"] = out[first] - out[second]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["imbalance"] = np.where(out["total"] > 0, out["net"] / out["total"], 0.0)
+    return out.sort_values("total", ascending=False, ignore_index=True)
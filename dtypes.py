@@ -0,0 +1,130 @@
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+# text columns with fewer distinct values than this share of rows become
+# categoricals; the rest stay Arrow-backed strings
+CATEGORY_MAX_SHARE = 0.5
+STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+INT32 = np.iinfo(np.int32)
+
+_cities_lock = threading.Lock()
+_city_dtype = pd.CategoricalDtype([])
+
+
+def city_dtype(names=()):
+    # The city dictionary every table shares: one sorted set of names, grown as
+    # new tables bring new cities. Columns encoded with the same dtype join,
+    # compare and concatenate on their integer codes.
+    global _city_dtype
+    with _cities_lock:
+        new = pd.Index(names).difference(_city_dtype.categories)
+        if len(new):
+            _city_dtype = pd.CategoricalDtype(_city_dtype.categories.append(new).sort_values())
+        return _city_dtype
+
+
+def to_city(values):
+    # Upper-cased, stripped city names on the shared dictionary. The string
+    # work runs once per distinct name; rows are only touched as codes.
+    s = pd.Series(values)
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    names = pd.Index(np.asarray(uniques, dtype=object).astype(str)).str.strip().str.upper()
+    dtype = city_dtype(names)
+    return pd.Series(pd.Categorical.from_codes(dtype.categories.get_indexer(names)[codes], dtype=dtype),
+                     index=s.index, name=s.name)
+
+
+def route_labels(city1, city2, sep=" → "):
+    # "CITY1 → CITY2" as a categorical: the label string is built once per
+    # distinct pair instead of once per row
+    a = pd.Categorical(city1)
+    b = pd.Categorical(city2)
+    width = len(b.categories)
+    codes, pairs = pd.factorize(a.codes.astype(np.int64) * width + b.codes)
+    labels = (np.asarray(a.categories, dtype=object)[pairs // width] + sep
+              + np.asarray(b.categories, dtype=object)[pairs % width])
+    order = np.argsort(labels, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return pd.Categorical.from_codes(rank[codes], categories=labels[order])
+
+
+def downcast(s):
+    # whole-number columns without gaps fit in int32; fractional measures stay
+    # float64 so sums keep their precision
+    if pd.api.types.is_bool_dtype(s) or not pd.api.types.is_numeric_dtype(s):
+        return s
+    values = s.to_numpy()
+    if pd.api.types.is_float_dtype(s):
+        if np.isnan(values).any() or not np.array_equal(values, np.round(values)):
+            return s
+    if len(values) and (values.min() < INT32.min or values.max() > INT32.max):
+        return s
+    return s.astype(np.int32)
+
+
+def enforce_types(df, cities=("city1", "city2"), keep=()):
+    # The typed schema every loaded table goes through: shared-dictionary city
+    # columns, categoricals or Arrow strings for other text, int32 where whole
+    # numbers fit. Columns in `keep` are left alone.
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in keep or isinstance(s.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(s):
+            out[col] = s
+        elif col in cities:
+            out[col] = to_city(s)
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            out[col] = s
+        elif pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            if s.nunique(dropna=False) <= CATEGORY_MAX_SHARE * len(s):
+                out[col] = s.astype("category")
+            else:
+                out[col] = s.astype(STRING)
+        else:
+            out[col] = downcast(s)
+    # the dictionary may have grown while encoding a later column
+    dtype = city_dtype()
+    for col in cities:
+        if col in out and col not in keep and out[col].dtype != dtype:
+            out[col] = out[col].astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def _untyped_bytes(s):
+    # what the column costs the way pandas reads it by default: Python strings
+    # for text, 8-byte numbers otherwise
+    if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(s):
+        return s.astype(object).memory_usage(deep=True, index=False)
+    return len(s) * 8
+
+
+def memory_report(df):
+    # per-column memory of a typed frame next to its untyped equivalent
+    report = pd.DataFrame({
+        "column": df.columns,
+        "dtype": [str(t) for t in df.dtypes],
+        "mb": [df[c].memory_usage(deep=True, index=False) / 1024 ** 2 for c in df.columns],
+        "untyped_mb": [_untyped_bytes(df[c]) / 1024 ** 2 for c in df.columns],
+    })
+    report["saving"] = report["untyped_mb"] / report["mb"].where(report["mb"] > 0)
+    return report.sort_values("untyped_mb", ascending=False, ignore_index=True)
+
+
+def main(argv=None):
+    from schema import DATASETS, load_dataset
+
+    names = (argv if argv is not None else sys.argv[1:]) or list(DATASETS)
+    for name in names:
+        report = memory_report(load_dataset(name))
+        print(f"{name}: {report['mb'].sum():.2f} MB typed, {report['untyped_mb'].sum():.2f} MB untyped")
+        print(report.to_string(index=False, float_format="{:.3f}".format))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
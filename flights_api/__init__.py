@@ -0,0 +1,12 @@
+from flights_api.queries import association_rules, datasets, route_stats, top_cities, top_routes, trends
+from flights_api.store import AnalyticsStore
+
+__all__ = [
+    "AnalyticsStore",
+    "association_rules",
+    "datasets",
+    "route_stats",
+    "top_cities",
+    "top_routes",
+    "trends",
+]
@@ -0,0 +1,72 @@
+import json
+
+import pandas as pd
+
+from directional import balance
+from schema import DATASETS
+
+
+def records(frame):
+    # NaN -> null and numpy scalars -> plain JSON types
+    return json.loads(frame.to_json(orient="records"))
+
+
+def datasets(store):
+    return [{"name": name, "grain": spec["grain"], "version": store.version(name)} for name, spec in DATASETS.items()]
+
+
+def top_routes(store, dataset, n=10, measure="total_passengers"):
+    routes = store.aggregates(dataset)["route_totals"]
+    if measure not in routes.columns:
+        raise ValueError(f"Unknown measure {measure!r}")
+    return records(routes.nlargest(n, measure))
+
+
+def top_cities(store, dataset, n=10, by="total"):
+    cities = balance(store.aggregates(dataset)["city_flows"]["passengers"])
+    if by not in ("total", "outbound", "inbound", "net"):
+        raise ValueError(f"Unknown ranking {by!r}")
+    return records(cities.nlargest(n, by))
+
+
+def route_stats(store, dataset, city1, city2):
+    aggs = store.aggregates(dataset)
+    route = f"{city1.strip().upper()} → {city2.strip().upper()}"
+    totals = aggs["route_totals"]
+    row = totals[totals["route"] == route]
+    if row.empty:
+        raise KeyError(f"Unknown route {route!r}")
+
+    route_year = aggs["route_year"]
+    seasonality = store.seasonality(dataset)
+    growth = store.growth(dataset).set_index("route")
+    season = seasonality.loc[route]
+    return {
+        "route": route,
+        "totals": records(row)[0],
+        "yearly": records(route_year[route_year["route"] == route][["year", "total_passengers", "periods"]]),
+        "seasonality": {
+            "pattern": season["pattern"],
+            "peak": season["peak_name"],
+            "trough": season["trough_name"],
+            "amplitude": float(season["amplitude"]),
+            "strength": None if pd.isna(season["strength"]) else float(season["strength"]),
+        },
+        "growth": records(growth.loc[[route]].reset_index())[0] if route in growth.index else None,
+    }
+
+
+def trends(store, dataset, by="year"):
+    aggs = store.aggregates(dataset)
+    if by == "year":
+        return records(aggs["yearly"])
+    if by == "period":
+        return records(aggs["seasonal"])
+    raise ValueError(f"Unknown trend {by!r} (expected 'year' or 'period')")
+
+
+def association_rules(store, dataset, group="all", limit=50):
+    groups = store.rules(dataset)
+    if group not in groups:
+        raise ValueError(f"Unknown rule group {group!r} (expected one of {sorted(groups)})")
+    return records(groups[group].head(limit))
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from flights_api import queries
+from flights_api.store import AnalyticsStore
+
+
+THREADS = int(os.environ.get("FLIGHTS_API_THREADS", 8))
+PROCESSES = int(os.environ.get("FLIGHTS_API_PROCESSES", 2))
+RESPONSE_CACHE_SIZE = int(os.environ.get("FLIGHTS_API_CACHE_SIZE", 512))
+
+app = FastAPI(title="Flights Analytics API")
+
+# pandas work never runs on the event loop: queries go to threads, rule mining to processes
+_threads = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix="flights-api")
+store = AnalyticsStore(processes=ProcessPoolExecutor(max_workers=PROCESSES) if PROCESSES else None)
+
+_responses = OrderedDict()
+_inflight = {}
+
+
+def _cache_key(request, version):
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{version}|{request.url.path}|{query}"
+
+
+async def _respond(request, dataset, query, *args):
+    try:
+        version = store.version(dataset)
+    except KeyError as err:
+        raise HTTPException(status_code=404, detail=str(err))
+
+    # the body is a pure function of (dataset version, path, query), so the ETag is known up front
+    key = _cache_key(request, version)
+    etag = '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    body = _responses.get(key)
+    if body is not None:
+        _responses.move_to_end(key)
+        return Response(body, media_type="application/json", headers=headers)
+
+    # concurrent identical requests share one computation
+    task = _inflight.get(key)
+    if task is None:
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(_threads, lambda: json.dumps(query(store, dataset, *args)).encode())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    try:
+        body = await asyncio.shield(task)
+    except KeyError as err:
+        raise HTTPException(status_code=404, detail=str(err.args[0]))
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+    _responses[key] = body
+    if len(_responses) > RESPONSE_CACHE_SIZE:
+        _responses.popitem(last=False)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/datasets")
+async def list_datasets():
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_threads, queries.datasets, store)
+
+
+@app.get("/{dataset}/routes/top")
+async def top_routes(request: Request, dataset: str, n: int = Query(10, ge=1, le=1000),
+                     measure: str = "total_passengers"):
+    return await _respond(request, dataset, queries.top_routes, n, measure)
+
+
+@app.get("/{dataset}/routes/stats")
+async def route_stats(request: Request, dataset: str, city1: str, city2: str):
+    return await _respond(request, dataset, queries.route_stats, city1, city2)
+
+
+@app.get("/{dataset}/cities/top")
+async def top_cities(request: Request, dataset: str, n: int = Query(10, ge=1, le=1000), by: str = "total"):
+    return await _respond(request, dataset, queries.top_cities, n, by)
+
+
+@app.get("/{dataset}/trends")
+async def trends(request: Request, dataset: str, by: str = "year"):
+    return await _respond(request, dataset, queries.trends, by)
+
+
+@app.get("/{dataset}/rules")
+async def association_rules(request: Request, dataset: str, group: str = "all",
+                            limit: int = Query(50, ge=1, le=10000)):
+    return await _respond(request, dataset, queries.association_rules, group, limit)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the dashboard's aggregates as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import threading
+
+from aggregates import load_aggregates
+from association import mine_rules, rule_groups
+from growth import growth_table
+from schema import DATASETS, dataset_version, load_dataset
+from seasonality import build_seasonality_table
+
+
+class AnalyticsStore:
+    # The dashboard's aggregate layer without Streamlit: one loaded frame plus
+    # its aggregates per dataset (read through the shared cache store), reloaded
+    # when the source file's version stamp changes. Derived tables (seasonality,
+    # growth, rules) are memoized against the same version. Safe to share
+    # between worker threads.
+
+    def __init__(self, processes=None):
+        self.processes = processes
+        self._entries = {}
+        self._locks = {name: threading.Lock() for name in DATASETS}
+
+    def version(self, dataset):
+        if dataset not in DATASETS:
+            raise KeyError(f"Unknown dataset {dataset!r}")
+        return dataset_version(dataset)
+
+    def _entry(self, dataset):
+        version = self.version(dataset)
+        entry = self._entries.get(dataset)
+        if entry is not None and entry["version"] == version:
+            return entry
+        with self._locks[dataset]:
+            entry = self._entries.get(dataset)
+            if entry is None or entry["version"] != version:
+                entry = {"version": version, "df": load_dataset(dataset), "aggs": load_aggregates(dataset), "derived": {}}
+                self._entries[dataset] = entry
+        return entry
+
+    def frame(self, dataset):
+        return self._entry(dataset)["df"]
+
+    def aggregates(self, dataset):
+        return self._entry(dataset)["aggs"]
+
+    def derived(self, dataset, name, build):
+        entry = self._entry(dataset)
+        if name not in entry["derived"]:
+            with self._locks[dataset]:
+                if name not in entry["derived"]:
+                    entry["derived"][name] = build(entry)
+        return entry["derived"][name]
+
+    def seasonality(self, dataset):
+        return self.derived(dataset, "seasonality",
+                            lambda e: build_seasonality_table(e["df"], e["aggs"]["period_col"]))
+
+    def growth(self, dataset):
+        per_year = 12 if DATASETS[dataset]["grain"] == "month" else 4
+        return self.derived(dataset, "growth", lambda e: growth_table(e["aggs"]["route_year"], per_year))
+
+    def rules(self, dataset):
+        def build(entry):
+            # mining is the heaviest query; run it in a worker process when one is configured
+            if self.processes is not None:
+                rules = self.processes.submit(mine_rules, entry["df"]).result()
+            else:
+                rules = mine_rules(entry["df"])
+            return rule_groups(rules)
+        return self.derived(dataset, "rules", build)
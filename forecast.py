@@ -0,0 +1,212 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from rollup import period_label
+
+
+SEASON_LENGTH = {"month": 12, "quarter": 4}
+
+# smoothing grid searched for every route at once
+ALPHAS = np.array([0.1, 0.2, 0.35, 0.5, 0.7])
+BETAS = np.array([0.0, 0.05, 0.15])
+GAMMAS = np.array([0.05, 0.15, 0.3, 0.5])
+
+Z = {0.8: 1.2816, 0.95: 1.96}
+
+
+def route_period_matrix(df, period_col="month", value="total_passengers", fill_value=0.0):
+    # routes x periods, dense over the full period range (missing -> fill_value)
+    per_year = SEASON_LENGTH[period_col]
+    key = df["year"].to_numpy(dtype=np.int64) * per_year + df[period_col].to_numpy(dtype=np.int64) - 1
+    route_codes, routes = pd.factorize(df["route"])
+    first = key.min()
+    n_periods = key.max() - first + 1
+
+    Y = np.zeros((len(routes), n_periods))
+    np.add.at(Y, (route_codes, key - first), df[value].to_numpy(dtype=np.float64))
+    if fill_value != 0.0:
+        seen = np.zeros(Y.shape, dtype=bool)
+        seen[route_codes, key - first] = True
+        Y[~seen] = fill_value
+    return Y, np.asarray(routes, dtype=object), int(first)
+
+
+def _initial_state(Y, m):
+    first = Y[..., :m]
+    second = Y[..., m:2 * m]
+    level = first.mean(axis=-1)
+    trend = (second.mean(axis=-1) - level) / m
+    season = first - level[..., None]
+    return level, trend, season
+
+
+def _holt_winters_sse(Y, m, alpha, beta, gamma):
+    # Additive Holt-Winters run for every route and every parameter combination
+    # at once: Y is (R, T), alpha/beta/gamma are (G, 1), state arrays are (G, R).
+    # The only Python loop is over time.
+    R, T = Y.shape
+    level, trend, season = _initial_state(Y, m)
+    G = alpha.shape[0]
+    level = np.broadcast_to(level, (G, R)).copy()
+    trend = np.broadcast_to(trend, (G, R)).copy()
+    season = np.broadcast_to(season, (G, R, m)).copy()
+    sse = np.zeros((G, R))
+
+    for t in range(m, T):
+        s = season[:, :, t % m]
+        y = Y[:, t]
+        err = y - (level + trend + s)
+        sse += err ** 2
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % m] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+    return sse, level, trend, season
+
+
+def _seasonal_naive_sse(Y, m):
+    err = Y[:, m:] - Y[:, :-m]
+    return (err ** 2).sum(axis=1)
+
+
+def fit_chunk(Y, m):
+    R, T = Y.shape
+    grid = np.array(np.meshgrid(ALPHAS, BETAS, GAMMAS, indexing="ij")).reshape(3, -1).T
+    alpha, beta, gamma = (grid[:, i][:, None] for i in range(3))
+
+    sse, level, trend, season = _holt_winters_sse(Y, m, alpha, beta, gamma)
+    best = sse.argmin(axis=0)
+    cols = np.arange(R)
+    hw_sse = sse[best, cols]
+    n_obs = max(T - m, 1)
+
+    params = {
+        "alpha": grid[best, 0], "beta": grid[best, 1], "gamma": grid[best, 2],
+        "level": level[best, cols], "trend": trend[best, cols],
+        "season": season[best, cols, :],
+        "sigma": np.sqrt(hw_sse / n_obs),
+        "method": np.full(R, "holt_winters", dtype=object),
+    }
+
+    # seasonal naive wins where it fits the history better (very noisy routes)
+    sn_sse = _seasonal_naive_sse(Y, m)
+    naive = sn_sse < hw_sse
+    if naive.any():
+        params["method"][naive] = "seasonal_naive"
+        params["alpha"][naive] = params["beta"][naive] = params["gamma"][naive] = np.nan
+        params["level"][naive] = 0.0
+        params["trend"][naive] = 0.0
+        # seasonal slots hold the last observed season, aligned to t % m
+        last = Y[naive, T - m:]
+        params["season"][naive] = np.roll(last, (T - m) % m, axis=1)
+        params["sigma"][naive] = np.sqrt(sn_sse[naive] / n_obs)
+    return params
+
+
+def fit_routes(Y, m, n_jobs=1, chunk_size=2000):
+    if Y.shape[1] < 2 * m:
+        raise ValueError(f"Need at least {2 * m} periods of history to fit seasonal models, got {Y.shape[1]}")
+    chunks = [Y[i:i + chunk_size] for i in range(0, len(Y), chunk_size)] or [Y]
+    if n_jobs == 1 or len(chunks) == 1:
+        parts = [fit_chunk(c, m) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(fit_chunk, chunks, [m] * len(chunks)))
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+class RouteForecaster:
+    # Fitted parameters for every route; forecasting any route is a few
+    # array lookups, no refitting.
+
+    def __init__(self, routes, params, m, first_key, n_periods, period_col):
+        self.routes = np.asarray(routes, dtype=object)
+        self.params = params
+        self.m = m
+        self.first_key = first_key
+        self.n_periods = n_periods
+        self.period_col = period_col
+        # fingerprint of the data and code the parameters were fitted from
+        self.version = None
+        self._index = pd.Index(self.routes)
+
+    @classmethod
+    def fit(cls, df, period_col="month", n_jobs=1):
+        m = SEASON_LENGTH[period_col]
+        Y, routes, first_key = route_period_matrix(df, period_col)
+        params = fit_routes(Y, m, n_jobs=n_jobs)
+        return cls(routes, params, m, first_key, Y.shape[1], period_col)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            routes=self.routes.astype(str),
+            meta=np.array([self.m, self.first_key, self.n_periods]),
+            period_col=np.array(self.period_col),
+            version=np.array(self.version or ""),
+            **{k: (v.astype(str) if v.dtype == object else v) for k, v in self.params.items()},
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            m, first_key, n_periods = (int(v) for v in z["meta"])
+            params = {k: z[k] for k in ["alpha", "beta", "gamma", "level", "trend", "season", "sigma"]}
+            params["method"] = z["method"].astype(object)
+            model = cls(z["routes"].astype(object), params, m, first_key, n_periods, str(z["period_col"]))
+            model.version = (str(z["version"]) or None) if "version" in z.files else None
+            return model
+
+    def forecast(self, route, horizon=12, levels=(0.8, 0.95)):
+        i = self._index.get_loc(route)
+        p = {k: v[i] for k, v in self.params.items()}
+        h = np.arange(1, horizon + 1)
+        slot = (self.n_periods + h - 1) % self.m
+
+        if p["method"] == "holt_winters":
+            mean = p["level"] + h * p["trend"] + p["season"][slot]
+            # ETS(A,A,A) forecast variance
+            j = np.arange(1, horizon)
+            c = p["alpha"] * (1 + j * p["beta"]) + p["gamma"] * (j % self.m == 0)
+            var_mult = 1 + np.concatenate([[0.0], np.cumsum(c ** 2)])
+        else:
+            mean = p["season"][slot]
+            var_mult = (h - 1) // self.m + 1
+
+        keys = self.first_key + self.n_periods + h - 1
+        out = pd.DataFrame({
+            "year": keys // self.m,
+            self.period_col: keys % self.m + 1,
+            "period": period_label(keys, self.period_col),
+            "forecast": np.clip(mean, 0, None),
+        })
+        se = p["sigma"] * np.sqrt(var_mult)
+        for level in levels:
+            out[f"lower_{int(level * 100)}"] = np.clip(mean - Z[level] * se, 0, None)
+            out[f"upper_{int(level * 100)}"] = mean + Z[level] * se
+        out["method"] = p["method"]
+        return out
+
+
+def load_or_fit(df, period_col, path, n_jobs=1, version=None):
+    # Persisted parameters are reused when they were fitted under the same
+    # version (see schema.stage_version); without one, as long as they cover
+    # the same routes and periods.
+    if os.path.exists(path):
+        model = RouteForecaster.load(path)
+        if version is not None:
+            reusable = model.version == version
+        else:
+            key = df["year"].to_numpy(dtype=np.int64) * SEASON_LENGTH[period_col] + df[period_col].to_numpy(dtype=np.int64) - 1
+            reusable = (model.first_key == key.min() and model.n_periods == key.max() - key.min() + 1
+                        and len(model.routes) == df["route"].nunique())
+        if model.period_col == period_col and reusable:
+            return model
+    model = RouteForecaster.fit(df, period_col, n_jobs=n_jobs)
+    model.version = version
+    model.save(path)
+    return model
@@ -0,0 +1,157 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from dtypes import enforce_types
+from manifest import fingerprint
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# City-pair files spell some cities differently from airports_india.csv
+CITY_ALIASES = {
+    "CHENNAI": "MADRAS",
+    "VADODARA": "BARODA",
+    "PATNA": "PATINA",
+    "VISAKHAPATNAM": "VISHAKHAPATNAM",
+    "KOZHIKODE": "CALICUT",
+    "PRAYAGRAJ": "ALLAHABAD",
+    "PUDUCHERRY": "PONDICHERRY",
+    "TIRUCHIRAPALLY": "TIRUCHIRAPPALLI",
+    "DHARAMSALA": "KANGRA",
+    "AIZAWL": "AIZWAL",
+    "BENGALURU": "BANGALORE",
+    "COCHIN": "KOCHI",
+    "THIRUVANANTHAPURAM": "TRIVANDRUM",
+    "SIMLA": "SHIMLA",
+    "NASIK": "NASHIK",
+    "KISHANGARH": "AJMER",
+    "DABOLIM": "GOA",
+    "ZERO": "ZIRO",
+}
+
+_NAME_SUFFIXES = r"\s+(INTERNATIONAL\s+)?(CIVIL\s+)?(AIRPORT|AERODROME|AIR FORCE STATION|AIR FORCE BASE)(\s+AIRPORT)?$"
+
+
+def normalize_city(values):
+    s = pd.Series(values, dtype="object").astype(str).str.upper().str.strip()
+    s = s.str.split(",").str[0].str.strip()
+    s = s.str.replace(_NAME_SUFFIXES, "", regex=True).str.replace(r"\s+", " ", regex=True)
+    return s.replace(CITY_ALIASES)
+
+
+def load_city_coordinates(airports_path="airports_india.csv", world_path=None):
+    ap = pd.read_csv(airports_path, na_values=["\\N"])
+    # scheduled airports (with an IATA code) win over air force stations
+    ap["_rank"] = ap["IATA"].isna().astype(int) * 2 - ap["Name"].str.contains("International", na=False)
+    ap = ap.sort_values("_rank", kind="stable")
+
+    frames = [
+        pd.DataFrame({"city": normalize_city(ap["City"]), "lat": ap["Latitude"], "lon": ap["Longitude"], "iata": ap["IATA"]}),
+        pd.DataFrame({"city": normalize_city(ap["Name"]), "lat": ap["Latitude"], "lon": ap["Longitude"], "iata": ap["IATA"]}),
+    ]
+
+    # optional world table written by build_flight_datasets_offline (data_out/airports_world.csv)
+    if world_path and os.path.exists(world_path):
+        world = pd.read_csv(world_path, low_memory=False)
+        world = world[world["iata_code"].notna()]
+        frames.append(pd.DataFrame({
+            "city": normalize_city(world["municipality"]),
+            "lat": pd.to_numeric(world["latitude_deg"], errors="coerce"),
+            "lon": pd.to_numeric(world["longitude_deg"], errors="coerce"),
+            "iata": world["iata_code"],
+        }))
+
+    coords = pd.concat(frames, ignore_index=True)
+    coords = coords[(coords["city"] != "NAN") & coords["lat"].notna() & coords["lon"].notna()]
+    coords = coords.drop_duplicates("city")
+    # airport cities join the same dictionary as the city-pair tables
+    return enforce_types(coords, cities=["city"]).set_index("city")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_distances(df, coords, city1="city1", city2="city2"):
+    routes = df[[city1, city2]].drop_duplicates().rename(columns={city1: "city1", city2: "city2"})
+    # each distinct city is normalized and looked up once
+    cities, uniques = pd.factorize(pd.concat([routes["city1"], routes["city2"]], ignore_index=True))
+    pos = coords.index.get_indexer(normalize_city(uniques))
+    lat = np.where(pos >= 0, coords["lat"].to_numpy()[pos], np.nan)
+    lon = np.where(pos >= 0, coords["lon"].to_numpy()[pos], np.nan)
+
+    n = len(routes)
+    c1, c2 = cities[:n], cities[n:]
+    routes["distance_km"] = haversine_km(lat[c1], lon[c1], lat[c2], lon[c2])
+    return routes.reset_index(drop=True)
+
+
+def coordinates_version(airports_path="airports_india.csv", world_path=None):
+    # changes with the airport tables and with geo.py (aliases, name cleanup)
+    return fingerprint([p for p in (airports_path, world_path) if p], ["geo.py"])
+
+
+def load_route_distances(df, coords, cache_path="route_distances.csv", version=None):
+    # Route -> distance table on disk; only routes not seen before are computed.
+    # Rows are stamped with the coordinates version they came from and dropped
+    # when it changes. Routes without coordinates are never stored, so they are
+    # retried once the airport tables cover them. The file is only rewritten
+    # when that adds a distance or drops stale rows.
+    cached = None
+    stale = False
+    if cache_path and os.path.exists(cache_path):
+        cached = pd.read_csv(cache_path)
+        if "version" not in cached.columns:
+            cached, stale = None, True
+        else:
+            current = cached["version"].astype(str) == str(version)
+            cached, stale = cached[current].drop(columns="version"), not current.all()
+    if cached is not None and not cached.empty:
+        known = pd.MultiIndex.from_frame(cached[["city1", "city2"]])
+        wanted = pd.MultiIndex.from_frame(df[["city1", "city2"]].drop_duplicates())
+        missing = wanted.difference(known)
+        if missing.empty:
+            return cached
+        new = route_distances(missing.to_frame(index=False), coords)
+        table = pd.concat([cached, new], ignore_index=True)
+    else:
+        new = table = route_distances(df, coords)
+
+    if cache_path and (stale or new["distance_km"].notna().any()):
+        _write_csv(table[table["distance_km"].notna()].assign(version=version), cache_path)
+    return table
+
+
+def _write_csv(frame, path):
+    # written next to the target and renamed, so concurrent readers never see half a file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            frame.to_csv(f, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def add_distance_metrics(df, table):
+    out = df.merge(table, on=["city1", "city2"], how="left")
+    if "total_passengers" in out.columns:
+        out["passenger_km"] = out["total_passengers"] * out["distance_km"]
+    if "total_freight" in out.columns:
+        out["freight_tonne_km"] = out["total_freight"] * out["distance_km"]
+    return out
+
+
+def unmatched_cities(df, coords):
+    cities = pd.unique(pd.concat([df["city1"], df["city2"]], ignore_index=True))
+    keys = normalize_city(cities)
+    return sorted(pd.Series(cities)[~keys.isin(coords.index)].tolist())
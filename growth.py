@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+
+MIN_VOLUME = 10_000
+MIN_T = 2.0
+
+SORT_COLUMNS = ["yoy", "cagr", "abs_change", "volume", "t_stat"]
+
+
+def _city_year(route_year):
+    # a city's traffic is every route it appears on, either end
+    cities = pd.concat([
+        route_year[["city1", "year", "total_passengers", "periods", "period_std"]].rename(columns={"city1": "city"}),
+        route_year[["city2", "year", "total_passengers", "periods", "period_std"]].rename(columns={"city2": "city"}),
+    ], ignore_index=True)
+    cities["period_var"] = cities["period_std"].fillna(0) ** 2
+    out = cities.groupby(["city", "year"], sort=False).agg(
+        total_passengers=("total_passengers", "sum"),
+        periods=("periods", "max"),
+        # routes treated as independent: variance of the city sum is the sum of variances
+        period_var=("period_var", "sum"),
+    ).reset_index()
+    out["period_std"] = np.sqrt(out["period_var"])
+    return out.drop(columns="period_var")
+
+
+def complete_years(route_year, per_year):
+    covered = route_year.groupby("year")["periods"].max()
+    return covered.index[covered >= per_year].tolist()
+
+
+def growth_table(route_year, per_year=12, level="route", end_year=None, start_year=None,
+                 min_volume=MIN_VOLUME, min_t=MIN_T):
+    # YoY, CAGR and a Welch t-statistic on per-period traffic for every route (or
+    # city) in one pass over a key x year matrix.
+    frame = route_year if level == "route" else _city_year(route_year)
+    key_col = "route" if level == "route" else "city"
+
+    full = complete_years(route_year, per_year)
+    years = sorted(route_year["year"].unique())
+    end_year = end_year or (full[-1] if full else years[-1])
+    start_year = start_year or (full[0] if full else years[0])
+
+    codes, keys = pd.factorize(frame[key_col])
+    year_pos = pd.Index(years).get_indexer(frame["year"])
+    shape = (len(keys), len(years))
+    total = np.zeros(shape)
+    periods = np.zeros(shape)
+    std = np.zeros(shape)
+    total[codes, year_pos] = frame["total_passengers"].to_numpy(dtype=np.float64)
+    periods[codes, year_pos] = frame["periods"].to_numpy(dtype=np.float64)
+    std[codes, year_pos] = frame["period_std"].fillna(0).to_numpy(dtype=np.float64)
+
+    e = years.index(end_year)
+    if e == 0:
+        raise ValueError(f"No year before {end_year} to compare against")
+    p = e - 1
+    s = years.index(start_year)
+
+    # periods the dataset covers in each year; months a route wasn't flown count as zero
+    covered = route_year.groupby("year")["periods"].max().reindex(years).to_numpy(dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # per-period means keep a partial year comparable to a full one
+        mean_end = total[:, e] / covered[e]
+        mean_prev = total[:, p] / covered[p]
+        mean_start = total[:, s] / covered[s]
+        yoy = mean_end / mean_prev - 1
+        se = np.sqrt(std[:, e] ** 2 / np.maximum(periods[:, e], 1) + std[:, p] ** 2 / np.maximum(periods[:, p], 1))
+        t_stat = (mean_end - mean_prev) / se
+        n_years = end_year - start_year
+        cagr = (mean_end / mean_start) ** (1 / n_years) - 1 if n_years > 0 else np.full(len(keys), np.nan)
+
+    table = pd.DataFrame({
+        key_col: keys,
+        "volume_prev": total[:, p],
+        "volume": total[:, e],
+        "abs_change": total[:, e] - total[:, p],
+        "yoy": yoy,
+        "cagr": np.where(total[:, s] > 0, cagr, np.nan),
+        "t_stat": t_stat,
+    })
+    table["eligible"] = (table["volume_prev"] >= min_volume) & (table["volume"] >= min_volume)
+    table["significant"] = table["eligible"] & (table["t_stat"].abs() >= min_t)
+    # plain ints: Streamlit serialises attrs as JSON and numpy ints don't survive that
+    table.attrs.update(end_year=int(end_year), prev_year=int(years[p]), start_year=int(start_year))
+    return table.replace([np.inf, -np.inf], np.nan)
+
+
+def leaderboard(table, sort_by="yoy", ascending=False, page=1, page_size=25, significant_only=True):
+    rows = table[table["significant"]] if significant_only else table[table["eligible"]]
+    rows = rows.sort_values(sort_by, ascending=ascending, na_position="last", ignore_index=True)
+    n_pages = max(1, -(-len(rows) // page_size))
+    page = min(max(page, 1), n_pages)
+    start = (page - 1) * page_size
+    out = rows.iloc[start:start + page_size].copy()
+    out.insert(0, "rank", np.arange(start + 1, start + len(out) + 1))
+    return out, n_pages, len(rows)
+
+
+def fastest_growing(table):
+    rows = table[table["significant"] & (table["yoy"] > 0)]
+    return None if rows.empty else rows.loc[rows["yoy"].idxmax()]
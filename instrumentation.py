@@ -0,0 +1,259 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+# FLIGHTS_METRICS = on | off writes the process totals to
+# FLIGHTS_METRICS_DIR/metrics-<pid>.prom; FLIGHTS_METRICS_SPANS = on also
+# appends every run's spans to spans.jsonl, rotated at JSONL_MAX_MB
+METRICS_DIR = os.path.join(".cache", "metrics")
+JSONL_NAME = "spans.jsonl"
+JSONL_MAX_MB = 64
+PROM_NAME = "metrics-{pid}.prom"
+
+_local = threading.local()
+_totals_lock = threading.Lock()
+# (metric, labels) -> value, accumulated over the life of the process
+_totals = {}
+# metrics-<pid>.prom files this process has written
+_prom_files = set()
+
+
+def rss_mb():
+    # resident set size; None where /proc is not available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        return None
+
+
+class Run:
+    # Spans recorded during one script run. Streamlit runs each session's
+    # script in its own thread, so the current run is thread-local.
+
+    def __init__(self, label):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started = time.time()
+        self.spans = []
+        self.seconds = None
+        self._t0 = time.perf_counter()
+        self._stack = []
+        self._phase = None
+
+    def add(self, record):
+        record.update(run=self.id, label=self.label, phase=self._phase[0] if self._phase else None)
+        self.spans.append(record)
+
+
+def start_run(label="rerun"):
+    _local.run = Run(label)
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def _record(name, kind, seconds, rows=None, cache=None, mem_mb=None):
+    return {"name": name, "kind": kind, "seconds": seconds, "rows": rows, "cache": cache, "mem_mb": mem_mb,
+            "ts": time.time()}
+
+
+def phase(name):
+    # Attribute everything from here to the next phase() (or finish_run) to
+    # `name`, e.g. the tab being rendered. Chart building and st.* calls that
+    # have no span of their own show up in the phase total.
+    run = current_run()
+    if run is None:
+        return
+    _close_phase(run)
+    run._phase = (name, time.perf_counter(), rss_mb())
+
+
+def _close_phase(run):
+    if run._phase is None:
+        return
+    name, t0, mem0 = run._phase
+    mem1 = rss_mb()
+    run.add(_record(name, "phase", time.perf_counter() - t0,
+                    mem_mb=None if mem0 is None or mem1 is None else mem1 - mem0))
+    run._phase = None
+
+
+@contextmanager
+def span(name, rows=None):
+    # Times the block; the yielded dict can be updated with rows/cache.
+    run = current_run()
+    if run is None:
+        yield {}
+        return
+    record = _record(name, "span", None, rows=rows)
+    mem0 = rss_mb()
+    t0 = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - t0
+        mem1 = rss_mb()
+        if mem0 is not None and mem1 is not None:
+            record["mem_mb"] = mem1 - mem0
+        run.add(record)
+
+
+def _rows(args, result):
+    for value in args:
+        if isinstance(value, (pd.DataFrame, np.ndarray)):
+            return len(value)
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    return None
+
+
+def timed(name, cache=None):
+    # Decorator. With cache=st.cache_data / st.cache_resource it replaces that
+    # decorator and also records whether the call was a cache hit: the body
+    # only runs (and flags a miss) when Streamlit had nothing cached.
+    def decorate(func):
+        if cache is not None:
+            @functools.wraps(func)
+            def body(*args, **kwargs):
+                run = current_run()
+                if run is not None and run._stack:
+                    run._stack[-1]["cache"] = "miss"
+                return func(*args, **kwargs)
+            inner = cache(body)
+        else:
+            inner = func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = current_run()
+            if run is None:
+                return inner(*args, **kwargs)
+            with span(name) as record:
+                if cache is not None:
+                    record["cache"] = "hit"
+                run._stack.append(record)
+                try:
+                    result = inner(*args, **kwargs)
+                finally:
+                    run._stack.pop()
+                record["rows"] = _rows(args, result)
+            return result
+
+        # keep st.cache_*'s .clear() reachable
+        if hasattr(inner, "clear"):
+            wrapper.clear = inner.clear
+        return wrapper
+    return decorate
+
+
+def breakdown(run):
+    # one row per span/phase of a run, slowest first within each kind
+    if run is None or not run.spans:
+        return pd.DataFrame(columns=["kind", "phase", "name", "seconds", "rows", "cache", "mem_mb"])
+    frame = pd.DataFrame(run.spans)[["kind", "phase", "name", "seconds", "rows", "cache", "mem_mb"]]
+    frame["rows"] = frame["rows"].astype("Int64")
+    return frame.sort_values(["kind", "seconds"], ascending=[True, False], ignore_index=True)
+
+
+def finish_run():
+    run = current_run()
+    if run is None or run.seconds is not None:
+        return run
+    _close_phase(run)
+    run.seconds = time.perf_counter() - run._t0
+    _accumulate(run)
+    if os.environ.get("FLIGHTS_METRICS", "on") != "off":
+        try:
+            export(run, os.environ.get("FLIGHTS_METRICS_DIR", METRICS_DIR),
+                   spans=os.environ.get("FLIGHTS_METRICS_SPANS", "off") == "on")
+        except OSError:
+            # metrics must never take the dashboard down
+            pass
+    return run
+
+
+def _add(metric, labels, value):
+    key = (metric, tuple(sorted(labels.items())))
+    _totals[key] = _totals.get(key, 0) + value
+
+
+def _accumulate(run):
+    with _totals_lock:
+        _add("flights_rerun_seconds_total", {"label": run.label}, run.seconds)
+        _add("flights_reruns_total", {"label": run.label}, 1)
+        for s in run.spans:
+            labels = {"stage": s["name"], "kind": s["kind"]}
+            _add("flights_stage_seconds_total", labels, s["seconds"])
+            _add("flights_stage_calls_total", labels, 1)
+            if s["rows"] is not None:
+                _add("flights_stage_rows_total", labels, s["rows"])
+            if s["cache"] is not None:
+                _add("flights_cache_requests_total", {"stage": s["name"], "result": s["cache"]}, 1)
+
+
+def prometheus_text():
+    with _totals_lock:
+        items = sorted(_totals.items())
+    lines, seen = [], set()
+    for (metric, labels), value in items:
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        # the pid keeps series from replicas apart when their files are collected together
+        labels = (("pid", os.getpid()),) + labels
+        label_text = ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in labels)
+        lines.append(f"{metric}{{{label_text}}} {value:.6g}")
+    return "\n".join(lines) + "\n"
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def export_spans(run, directory=METRICS_DIR, max_mb=JSONL_MAX_MB):
+    # Appends the run's spans to spans.jsonl. Past max_mb the file is renamed
+    # to spans.jsonl.1 (replacing the previous one), so at most two files exist.
+    path = os.path.join(directory, JSONL_NAME)
+    try:
+        if os.path.getsize(path) > max_mb * 1024 ** 2:
+            os.replace(path, path + ".1")
+    except OSError:
+        pass
+    lines = [{"run": run.id, "label": run.label, "kind": "run", "name": run.label,
+              "seconds": run.seconds, "ts": run.started}] + run.spans
+    # one write per run so concurrent sessions never interleave lines
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(line) + "\n" for line in lines))
+
+
+def export(run, directory=METRICS_DIR, spans=False):
+    # Rewrites this process's metrics-<pid>.prom (its totals in Prometheus text
+    # format, for a node-exporter textfile collector or a plain scrape of the
+    # file) and, when `spans` is set, appends the run to spans.jsonl. Each
+    # replica writes its own file, removed again when the process exits.
+    os.makedirs(directory, exist_ok=True)
+    if spans:
+        export_spans(run, directory)
+    path = os.path.join(directory, PROM_NAME.format(pid=os.getpid()))
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+    if path not in _prom_files:
+        _prom_files.add(path)
+        atexit.register(_remove_quietly, path)
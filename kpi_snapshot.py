@@ -0,0 +1,103 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from aggregates import load_aggregates
+from cache_store import shared_cache
+from growth import fastest_growing, growth_table
+from instrumentation import timed
+from schema import DATASETS, PERIOD_NAMES, load_dataset, present_measures, stage_version
+
+
+def _kpis(rp, period_col, measures):
+    # the Overview cards for one slice of the route x period table
+    totals = rp[measures].sum()
+    by_period = rp.groupby(period_col)["total_passengers"].sum()
+    by_route = rp.groupby("route", sort=False)["total_passengers"].sum()
+    cities = pd.concat([
+        rp[["city1", "total_passengers"]].rename(columns={"city1": "city"}),
+        rp[["city2", "total_passengers"]].rename(columns={"city2": "city"}),
+    ], ignore_index=True).groupby("city", sort=False)["total_passengers"].sum()
+    return {
+        "totals": {m: float(totals[m]) for m in measures},
+        "busiest_period": PERIOD_NAMES[period_col][int(by_period.idxmax())],
+        "top_route": by_route.idxmax(),
+        "top_route_passengers": float(by_route.max()),
+        "total_cities": len(cities),
+        "total_routes": len(by_route),
+        "avg_passengers_per_route": float(by_route.mean()),
+        "top_cities": [(city, float(pax)) for city, pax in cities.nlargest(3).items()],
+    }
+
+
+def _fastest(route_year, per_year, end_year):
+    try:
+        row = fastest_growing(growth_table(route_year, per_year, end_year=end_year))
+    except ValueError:  # first year: nothing to grow from
+        return None
+    return None if row is None else {"route": row["route"], "yoy": float(row["yoy"])}
+
+
+@timed("kpi_snapshot.build_snapshot")
+def build_snapshot(df, period_col, route_year):
+    # KPIs for every year, each next to the same periods of the year before,
+    # so a partial latest year is compared like for like. One groupby over the
+    # full frame; everything after works on the route x period table.
+    measures = present_measures(df)
+    per_year = 12 if period_col == "month" else 4
+    rp = df.groupby(["year", period_col, "route", "city1", "city2"], sort=False, observed=True)[measures].sum().reset_index()
+
+    snapshot = {"period_col": period_col, "measures": measures, "years": {}}
+    for year in sorted(rp["year"].unique()):
+        year = int(year)
+        current = rp[rp["year"] == year]
+        periods = np.sort(current[period_col].unique())
+        previous = rp[(rp["year"] == year - 1) & rp[period_col].isin(periods)]
+        entry = {
+            "periods": [int(p) for p in periods],
+            "full_year": len(periods) == per_year,
+            "current": _kpis(current, period_col, measures),
+            "previous": _kpis(previous, period_col, measures) if len(previous) else None,
+        }
+        entry["current"]["fastest"] = _fastest(route_year, per_year, year)
+        if entry["previous"] is not None:
+            entry["previous"]["fastest"] = _fastest(route_year, per_year, year - 1)
+        snapshot["years"][year] = entry
+    return snapshot
+
+
+def snapshot_version(choice):
+    return stage_version(choice, "kpi_snapshot.py", "aggregates.py", "directional.py", "growth.py")
+
+
+@shared_cache("kpi_snapshot", version=snapshot_version)
+def load_snapshot(choice):
+    # One small dict per dataset version: built once when the data changes
+    # (or ahead of time with `python kpi_snapshot.py`) and read back whole.
+    return build_snapshot(load_dataset(choice), DATASETS[choice]["grain"], load_aggregates(choice)["route_year"])
+
+
+def delta(entry, key, measure=None):
+    # relative change against the previous year's matching periods, or None
+    if entry["previous"] is None:
+        return None
+    now, before = entry["current"][key], entry["previous"][key]
+    if measure is not None:
+        now, before = now.get(measure), before.get(measure)
+    if now is None or not before:
+        return None
+    return now / before - 1
+
+
+def main(argv=None):
+    # precompute (and store) the snapshots, e.g. right after new data lands
+    names = (argv if argv is not None else sys.argv[1:]) or list(DATASETS)
+    for name in names:
+        snapshot = load_snapshot(name)
+        print(f"{name}: KPI snapshot for {len(snapshot['years'])} years")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = "manifest.json"
+FINGERPRINT_LENGTH = 16
+
+# Derived files, the inputs they are built from and the code that builds them.
+# "build" names a preprocess.PIPELINES entry; artifacts produced by a notebook
+# have none, so the manifest can only tell that they are stale and where they
+# come from. The city files the app reads are still the notebooks' output;
+# preprocess.py follows the same steps but does not reproduce them byte for
+# byte, so it must not overwrite them. Data paths are relative to the working
+# directory, code paths to the repo.
+ARTIFACTS = {
+    "domestic_city_processed.csv": {
+        "inputs": ["city.csv"],
+        "code": ["india_domestic_city_preprocessing.ipynb"],
+        "build": None,
+    },
+    "international_city_cleaned.csv": {
+        "inputs": ["city_internatinal.csv"],
+        "code": ["india_international.ipynb"],
+        "build": None,
+    },
+    "flight_delay_cleaned.csv": {
+        "inputs": ["flight_delay.csv"],
+        "code": ["flight_delay_analysis.ipynb"],
+        "build": None,
+    },
+}
+
+_hash_lock = threading.Lock()
+# abspath -> (size, mtime_ns, sha256); a file is only re-read when its stat changes
+_hashes = {}
+
+
+def file_hash(path):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _hash_lock:
+        cached = _hashes.get(path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    with _hash_lock:
+        _hashes[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def code_hash(*files):
+    # hash of the source files that produce a result, so editing them invalidates it
+    return fingerprint(code=files)
+
+
+def fingerprint(inputs=(), code=(), parts=()):
+    # Content fingerprint of data files (None when missing), code files and
+    # any further version strings, e.g. an upstream fingerprint.
+    digest = hashlib.sha256()
+    for path in inputs:
+        digest.update(f"data:{path}:{file_hash(path) if os.path.exists(path) else None}\n".encode())
+    for name in code:
+        digest.update(f"code:{name}:{file_hash(os.path.join(ROOT, name))}\n".encode())
+    for part in parts:
+        digest.update(f"part:{part}\n".encode())
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def artifact_fingerprint(name):
+    spec = ARTIFACTS[name]
+    return fingerprint(spec["inputs"], spec["code"])
+
+
+def read_manifest(path=MANIFEST):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"artifacts": {}}
+
+
+def write_manifest(manifest, path=MANIFEST):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def status(name, manifest=None):
+    # "missing": no output file; "stale": inputs or code changed since it was
+    # built, or the output itself was edited by hand; otherwise "fresh"
+    if not os.path.exists(name):
+        return "missing"
+    entry = (manifest or read_manifest())["artifacts"].get(name)
+    if entry is None or entry["fingerprint"] != artifact_fingerprint(name) or entry["output"] != file_hash(name):
+        return "stale"
+    return "fresh"
+
+
+def check(path):
+    # status of a file the app reads, or None when it is not a managed artifact
+    return status(path) if path in ARTIFACTS else None
+
+
+def record(name, manifest):
+    spec = ARTIFACTS[name]
+    manifest["artifacts"][name] = {
+        "fingerprint": artifact_fingerprint(name),
+        "inputs": {path: file_hash(path) for path in spec["inputs"]},
+        "code": {path: file_hash(os.path.join(ROOT, path)) for path in spec["code"]},
+        "output": file_hash(name),
+    }
+
+
+def build(name):
+    spec = ARTIFACTS[name]
+    if spec["build"] is None:
+        raise RuntimeError(f"{name} is built by {', '.join(spec['code'])}; rerun it to refresh the file")
+    import preprocess
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(name))) as out_dir:
+        preprocess.run(spec["build"], spec["inputs"][0], out_dir)
+        df = preprocess.read_partitioned(out_dir)
+        # the partition column comes back last; the sources have year first
+        df = df[["year"] + [c for c in df.columns if c != "year"]]
+        # written next to the target and renamed, so readers never see half a file
+        tmp = os.path.join(out_dir, "output.csv")
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, name)
+
+
+def ensure(names=None, force=False, path=MANIFEST):
+    # rebuild whatever is missing or stale and record it; returns the names rebuilt
+    manifest = read_manifest(path)
+    rebuilt = []
+    try:
+        for name in names or ARTIFACTS:
+            if force or status(name, manifest) != "fresh":
+                build(name)
+                record(name, manifest)
+                rebuilt.append(name)
+    finally:
+        if rebuilt:
+            write_manifest(manifest, path)
+    return rebuilt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status")
+    build_parser = sub.add_parser("build", help="rebuild missing or stale artifacts")
+    build_parser.add_argument("names", nargs="*")
+    build_parser.add_argument("--force", action="store_true")
+    record_parser = sub.add_parser("record", help="accept the current files as built from the current inputs")
+    record_parser.add_argument("names", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        manifest = read_manifest()
+        states = {name: status(name, manifest) for name in ARTIFACTS}
+        for name, state in states.items():
+            print(f"{state:<8} {name}")
+        return 1 if any(state != "fresh" for state in states.values()) else 0
+    if args.command == "build":
+        try:
+            rebuilt = ensure(args.names, args.force)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        print(f"rebuilt: {', '.join(rebuilt)}" if rebuilt else "everything is fresh")
+        return 0
+    manifest = read_manifest()
+    for name in args.names:
+        record(name, manifest)
+    write_manifest(manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# sklearn costs ~0.7s to import; every function imports it on first use so the
+# dashboard only pays for it when the Modeling tab is opened.
+
+
+def standardize(num):
+    from sklearn.preprocessing import StandardScaler
+
+    return StandardScaler().fit_transform(num)
+
+
+@timed("modeling.pca_2d")
+def pca_2d(X):
+    from sklearn.decomposition import PCA
+
+    pca = PCA(n_components=2)
+    coords = pca.fit_transform(X)
+    return coords, pca
+
+
+def pca_loadings(num):
+    _, pca = pca_2d(standardize(num))
+    return pd.DataFrame(pca.components_.T, index=num.columns, columns=["PC1", "PC2"])
+
+
+@timed("modeling.kmeans")
+def kmeans(X, k, random_state=42):
+    from sklearn.cluster import KMeans
+
+    model = KMeans(n_clusters=k, random_state=random_state)
+    labels = model.fit_predict(X)
+    return labels, model
+
+
+@timed("modeling.elbow_inertias")
+def elbow_inertias(X, k_range=range(1, 11), random_state=42):
+    from sklearn.cluster import KMeans
+
+    return np.array([KMeans(n_clusters=k, random_state=random_state).fit(X).inertia_ for k in k_range])
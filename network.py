@@ -0,0 +1,54 @@
+import plotly.graph_objects as go
+
+from instrumentation import timed
+
+
+@timed("network.build_route_graph")
+def build_route_graph(df):
+    # networkx is only needed once someone opens the network view
+    import networkx as nx
+
+    return nx.from_pandas_edgelist(
+        df,
+        source="city1",
+        target="city2",
+        edge_attr="total_passengers",
+        create_using=nx.Graph()
+    )
+
+
+@timed("chart.network_graph")
+def plot_network_graph(G, theme_color):
+    import networkx as nx
+
+    pos = nx.spring_layout(G, k=0.3, iterations=50)
+    edge_x, edge_y = [], []
+    for edge in G.edges():
+        x0, y0 = pos[edge[0]]
+        x1, y1 = pos[edge[1]]
+        edge_x.extend([x0, x1, None])
+        edge_y.extend([y0, y1, None])
+
+    edge_trace = go.Scatter(
+        x=edge_x, y=edge_y, mode='lines',
+        line=dict(width=1, color="#888"),
+        hoverinfo='none'
+    )
+    node_x, node_y = zip(*pos.values())
+    node_text = list(pos.keys())
+    node_trace = go.Scatter(
+        x=node_x, y=node_y,
+        mode='markers+text',
+        marker=dict(size=12, color=theme_color),
+        text=node_text,
+        textposition="top center",
+        hoverinfo='text'
+    )
+    fig = go.Figure([edge_trace, node_trace])
+    fig.update_layout(
+        title="Route Network",
+        showlegend=False,
+        height=600,
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from directional import DIRECTIONAL
+from forecast import SEASON_LENGTH
+from rollup import period_label
+
+
+class ODTensor:
+    # Directed origin x destination x period traffic. Stored as one CSR matrix
+    # of shape (periods * cities, cities): row p * C + o holds origin o's flows
+    # in period p, so a period is a contiguous row block and an origin is a
+    # strided row selection. Cities and periods are integer codes into
+    # self.cities / self.period_keys.
+
+    def __init__(self, matrix, cities, period_keys, period_col):
+        self.matrix = matrix.tocsr()
+        self.cities = pd.Index(cities)
+        self.period_keys = np.asarray(period_keys, dtype=np.int64)
+        self.period_col = period_col
+
+    @classmethod
+    def from_frame(cls, df, period_col="month", measure="passengers"):
+        to_col, from_col = DIRECTIONAL[measure]
+        n = len(df)
+        codes, cities = pd.factorize(pd.concat([df["city1"], df["city2"]], ignore_index=True))
+        c1, c2 = codes[:n], codes[n:]
+        keys = df["year"].to_numpy(dtype=np.int64) * SEASON_LENGTH[period_col] + df[period_col].to_numpy(dtype=np.int64) - 1
+        p, period_keys = pd.factorize(keys, sort=True)
+        C = len(cities)
+
+        # each city-pair row is two directed flows: city1 -> city2 and city2 -> city1
+        rows = np.concatenate([p * C + c1, p * C + c2])
+        cols = np.concatenate([c2, c1])
+        vals = np.concatenate([
+            df[to_col].fillna(0).to_numpy(dtype=np.float64),
+            df[from_col].fillna(0).to_numpy(dtype=np.float64),
+        ])
+        # duplicate coordinates are summed on conversion
+        matrix = sparse.coo_matrix((vals, (rows, cols)), shape=(len(period_keys) * C, C)).tocsr()
+        matrix.eliminate_zeros()
+        return cls(matrix, cities, period_keys, period_col)
+
+    @property
+    def shape(self):
+        return len(self.cities), len(self.cities), len(self.period_keys)
+
+    @property
+    def periods(self):
+        return period_label(self.period_keys, self.period_col)
+
+    def _period_range(self, start_key=None, end_key=None):
+        lo = 0 if start_key is None else np.searchsorted(self.period_keys, start_key, side="left")
+        hi = len(self.period_keys) if end_key is None else np.searchsorted(self.period_keys, end_key, side="right")
+        return lo, hi
+
+    def period(self, key):
+        # C x C CSR for one period
+        p = np.searchsorted(self.period_keys, key)
+        if p >= len(self.period_keys) or self.period_keys[p] != key:
+            raise KeyError(key)
+        C = len(self.cities)
+        return self.matrix[p * C:(p + 1) * C]
+
+    def total(self, start_key=None, end_key=None):
+        # C x C flows summed over a period range
+        lo, hi = self._period_range(start_key, end_key)
+        C = len(self.cities)
+        block = self.matrix[lo * C:hi * C].tocoo()
+        return sparse.csr_matrix((block.data, (block.row % C, block.col)), shape=(C, C))
+
+    def origin(self, city):
+        # periods x destinations for one origin
+        o = self.cities.get_loc(city)
+        C = len(self.cities)
+        return self.matrix[np.arange(len(self.period_keys)) * C + o]
+
+    def destination(self, city):
+        # periods x origins for one destination
+        d = self.cities.get_loc(city)
+        C = len(self.cities)
+        col = self.matrix[:, d].tocoo()
+        return sparse.csr_matrix((col.data, (col.row // C, col.row % C)), shape=(len(self.period_keys), C))
+
+    def outbound(self):
+        # periods x cities (row sums per period)
+        return np.asarray(self.matrix.sum(axis=1)).reshape(len(self.period_keys), len(self.cities))
+
+    def inbound(self):
+        # periods x cities (column sums per period)
+        coo = self.matrix.tocoo()
+        C = len(self.cities)
+        flat = np.bincount((coo.row // C) * C + coo.col, coo.data, len(self.period_keys) * C)
+        return flat.reshape(len(self.period_keys), C)
+
+    def diff(self, key_a, key_b):
+        # flows in period b minus flows in period a, as a sparse C x C matrix
+        return self.period(key_b) - self.period(key_a)
+
+    def top_k(self, k=5, start_key=None, end_key=None, cities=None, by="origin"):
+        # the k largest partners for each origin (or destination), without densifying
+        m = self.total(start_key, end_key)
+        m = (m if by == "origin" else m.T).tocoo()
+        order = np.lexsort((-m.data, m.row))
+        row, col, val = m.row[order], m.col[order], m.data[order]
+        rank = np.arange(len(row)) - np.searchsorted(row, row, side="left")
+        keep = rank < k
+        other = "destination" if by == "origin" else "origin"
+        out = pd.DataFrame({
+            by: self.cities[row[keep]],
+            other: self.cities[col[keep]],
+            "traffic": val[keep],
+            "rank": rank[keep] + 1,
+        })
+        if cities is not None:
+            out = out[out[by].isin(cities)]
+        return out.reset_index(drop=True)
+
+    def to_frame(self, matrix=None):
+        m = (self.total() if matrix is None else matrix).tocoo()
+        return pd.DataFrame({
+            "origin": self.cities[m.row],
+            "destination": self.cities[m.col],
+            "traffic": m.data,
+        }).sort_values("traffic", ascending=False, ignore_index=True)
@@ -0,0 +1,70 @@
+import streamlit as st
+import plotly.express as px
+
+from airlines import ON_TIME_MINUTES, delay_source, load_rollups, rollups_version
+from paginated_table import paginated_table
+
+st.title("Airline Performance")
+
+
+@st.cache_data
+def get_rollups(path, version):
+    return load_rollups(path)
+
+
+path = delay_source()
+if path is None:
+    st.error("No delay data found (flight_delay_cleaned.csv or flight_delay.csv).")
+    st.stop()
+
+rollups = get_rollups(path, rollups_version(path))
+summary = rollups["summary"]
+monthly = rollups["monthly"]
+matches = rollups["matches"]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Flights", f"{int(summary['flights'].sum()):,}")
+col2.metric("Airlines", len(summary))
+total = summary["flights"].sum()
+cancelled = (summary["cancellation_rate"] * summary["flights"]).sum()
+operated = summary["flights"] * (1 - summary["cancellation_rate"])
+col3.metric(f"On-time departures (≤{ON_TIME_MINUTES} min)",
+            f"{(summary['dep_otp'] * operated).sum() / operated.sum():.1%}")
+col4.metric("Cancelled", f"{cancelled / total:.1%}")
+
+tab1, tab2, tab3, tab4 = st.tabs(["On-Time Performance", "Delay Percentiles", "Market Share", "Name Matching"])
+
+with tab1:
+    otp = summary.melt(id_vars="airline", value_vars=["dep_otp", "arr_otp"], var_name="leg", value_name="otp")
+    otp["leg"] = otp["leg"].map({"dep_otp": "Departure", "arr_otp": "Arrival"})
+    fig = px.bar(otp, x="airline", y="otp", color="leg", barmode="group",
+                 labels={"otp": "On-time share", "airline": "Airline", "leg": ""})
+    fig.update_yaxes(tickformat=".0%")
+    st.plotly_chart(fig, use_container_width=True)
+
+    buckets = rollups["buckets"]
+    fig = px.bar(buckets, x="airline", y="share", color="delay_bucket",
+                 labels={"share": "Share of flights", "airline": "Airline", "delay_bucket": "Delay"})
+    fig.update_yaxes(tickformat=".0%")
+    st.plotly_chart(fig, use_container_width=True)
+
+with tab2:
+    st.caption("Delay in minutes at each percentile over operated flights; negative values are early "
+               "departures or arrivals. Cancelled flights only count towards the cancellation rate.")
+    percentiles = [c for c in summary.columns if c[:5] in ("dep_p", "arr_p")]
+    paginated_table(summary, key="airline_delays", sort_by="flights",
+                    formats={"cancellation_rate": "{:.1%}", "dep_otp": "{:.1%}", "arr_otp": "{:.1%}", "share": "{:.1%}",
+                             "mean_dep_delay": "{:.1f}", **{c: "{:.0f}" for c in percentiles}},
+                    placeholder="Airline or IATA code")
+
+with tab3:
+    fig = px.area(monthly, x="month", y="share", color="airline",
+                  labels={"share": "Share of flights", "month": "Month", "airline": "Airline"})
+    fig.update_yaxes(tickformat=".0%")
+    st.plotly_chart(fig, use_container_width=True)
+
+with tab4:
+    st.caption("How each airline name in the delay data was matched to airlines.dat; "
+               "names without a match keep their own spelling.")
+    paginated_table(matches, key="airline_matches", sort_by="rows", formats={"score": "{:.2f}"},
+                    placeholder="Airline name")
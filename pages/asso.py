@@ -1,160 +1,22 @@
 import streamlit as st
 import pandas as pd
-import itertools
-import math
-from collections import Counter
 
-st.title(" Association Rule Mining - Apriori")
-
-df = pd.read_csv("domestic_city_processed.csv")
-
-def pax_level(x):
-    if x < 2000: return "Pax_Low"
-    elif x <= 10000: return "Pax_Medium"
-    else: return "Pax_High"
-
-def freight_level(x):
-    if x==0: return "Freight_zero"
-    elif x < 2: return "Freight_Low"
-    elif x <= 50: return "Freight_Medium"
-    else: return "Freight_High"
-
-def mail_level(x):
-    if x==0: return "Mail_zero"
-    elif x <=2: return "Mail_Low"
-    elif x <= 11: return "Mail_Medium"
-    else: return "Mail_High"
-
-def pax_to_level(x):
-    if x < 1200: return "PaxTo_Low"
-    elif x <= 6000: return "PaxTo_Medium"
-    else: return "PaxTo_High"
-
-def pax_from_level(x):
-    if x < 1200: return "PaxFrom_Low"
-    elif x <= 6000: return "PaxFrom_Medium"
-    else: return "PaxFrom_High"
-
-def freight_to_level(x):
-    if x==0: return "FreightTo_zero"
-    elif x < 0.75: return "FreightTo_Low"
-    elif x <= 15: return "FreightTo_Medium"
-    else: return "FreightTo_High"
-
-def freight_from_level(x):
-    if x==0: return "FreightFrom_zero"
-    elif x < 0.75: return "FreightFrom_Low"
-    elif x <= 20: return "FreightFrom_Medium"
-    else: return "FreightFrom_High"
-
-def mail_to_level(x):
-    if x==0: return "MailTo_zero"
-    elif x <=1.5: return "MailTo_Low"
-    elif x <= 7: return "MailTo_Medium"
-    else: return "MailTo_High"
-
-def mail_from_level(x):
-    if x==0: return "MailFrom_zero"
-    if x <=1.5: return "MailFrom_Low"
-    elif x <= 7: return "MailFrom_Medium"
-    else: return "MailFrom_High"
-
-df["Pax_Level"] = df["total_passengers"].apply(pax_level)
-df["Freight_Level"] = df["total_freight"].apply(freight_level)
-df["Mail_Level"] = df["total_mail"].apply(mail_level)
-
-df["PaxTo_Level"] = df["paxtocity2"].apply(pax_to_level)
-df["PaxFrom_Level"] = df["paxfromcity2"].apply(pax_from_level)
-df["FreightTo_Level"] = df["freighttocity2"].apply(freight_to_level)
-df["FreightFrom_Level"] = df["freightfromcity2"].apply(freight_from_level)
-df["MailTo_Level"] = df["mailtocity2"].apply(mail_to_level)
-df["MailFrom_Level"] = df["mailfromcity2"].apply(mail_from_level)
-
-df["Month"] = df["month"].astype(int).map({
-    1:"Jan",2:"Feb",3:"Mar",4:"Apr",5:"May",6:"Jun",
-    7:"Jul",8:"Aug",9:"Sep",10:"Oct",11:"Nov",12:"Dec"
-})
+from association import mine_rules, rule_groups
+from paginated_table import paginated_table
 
-#basket
-transactions = []
-for _, row in df.iterrows():
-    t = [
-        f"Origin={row['city1']}",
-        f"Dest={row['city2']}",
-        f"Month={row['Month']}",
-        row["Pax_Level"],
-        row["Freight_Level"],
-        row["Mail_Level"],
-        row["PaxTo_Level"],
-        row["PaxFrom_Level"],
-        row["FreightTo_Level"],
-        row["FreightFrom_Level"],
-        row["MailTo_Level"],
-        row["MailFrom_Level"]
-    ]
-    transactions.append(t)
-
-n = len(transactions)
-min_support = 0.01
-min_support_count = max(1, math.ceil(min_support * n))
-min_confidence = 0.4
-
-item_counts = Counter()
-for t in transactions:
-    item_counts.update(set(t))
-
-freq1 = {i for i,c in item_counts.items() if c >= min_support_count}
-
-pairs = list(itertools.combinations(sorted(freq1), 2))
-pair_count = Counter()
-
-for t in transactions:
-    s = set(t)
-    for a, b in pairs:
-        if a in s and b in s:
-            pair_count[(a,b)] += 1
-
-rules = []
-for (a,b), cnt in pair_count.items():
-    if cnt >= min_support_count:
-        support = cnt / n
-
-        conf_ab = cnt / item_counts[a]
-        conf_ba = cnt / item_counts[b]
-
-        lift_ab = conf_ab / (item_counts[b] / n)
-        lift_ba = conf_ba / (item_counts[a] / n)
-
-        if conf_ab >= min_confidence:
-            rules.append([a, b, support, cnt, conf_ab, lift_ab])
-
-        if conf_ba >= min_confidence:
-            rules.append([b, a, support, cnt, conf_ba, lift_ba])
-
-rules_df = pd.DataFrame(
-    rules,
-    columns=["Antecedent","Consequent","Support","SupportCount","Confidence","Lift"]
-).sort_values(by=["Lift","Confidence"], ascending=False)
-
-sorted_rules = rules_df.sort_values(by=["Lift", "Confidence", "Support"], ascending=False)
+st.title(" Association Rule Mining - Apriori")
 
 
-seasonal_rules = sorted_rules[
-    sorted_rules["Antecedent"].str.startswith("Month=")
-]
+@st.cache_data
+def get_rules(path="domestic_city_processed.csv", min_support=0.01, min_confidence=0.4):
+    return rule_groups(mine_rules(pd.read_csv(path), min_support, min_confidence))
 
-traffic_corr_rules = sorted_rules[
-    (sorted_rules["Antecedent"].str.contains("Pax")) &
-    (sorted_rules["Consequent"].str.contains("Freight") |
-     sorted_rules["Consequent"].str.contains("Mail"))
-].head(50)
 
-imbalance_rules = sorted_rules[
-    (sorted_rules["Antecedent"].str.startswith("Origin=") |
-     sorted_rules["Antecedent"].str.startswith("Dest=")) &
-    (sorted_rules["Consequent"].str.contains("PaxTo") |
-     sorted_rules["Consequent"].str.contains("PaxFrom"))
-].head(50)
+groups = get_rules()
+sorted_rules = groups["all"]
+seasonal_rules = groups["seasonality"]
+traffic_corr_rules = groups["traffic_correlation"]
+imbalance_rules = groups["imbalance"]
 
 
 tab1, tab2, tab3, tab4 = st.tabs([
@@ -202,10 +64,10 @@ with tab1:
 
     """)
 
-    st.dataframe(sorted_rules)
+    paginated_table(sorted_rules, key="rules_all", sort_by="Lift", placeholder="Item, e.g. Origin=DELHI")
 
 with tab2:
-    st.header("Seasonality Rules (Top 50)")
+    st.header("Seasonality Rules")
     month_list = ["All","Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
     selected_month = st.selectbox("Select Month", month_list)
 
@@ -217,7 +79,7 @@ with tab2:
         ]
 
     st.subheader(f"Seasonality Rules for: {selected_month}")
-    st.dataframe(seasonal_display.head(50))
+    paginated_table(seasonal_display, key="rules_seasonal", sort_by="Lift")
 
     st.markdown("""
     ### May
@@ -244,7 +106,7 @@ with tab2:
 
 with tab3:
     st.header("Traffic Correlation Rules (Top 50)")
-    st.dataframe(traffic_corr_rules)
+    paginated_table(traffic_corr_rules, key="rules_traffic", sort_by="Lift")
     st.markdown("""
     ### High Passenger Traffic is Strongly Linked to High Cargo Traffic
     When passenger demand is high, freight and mail volumes are also high
@@ -258,7 +120,7 @@ with tab3:
 
 with tab4:
     st.header("Traffic Imbalance Rules (Top 50)")
-    st.dataframe(imbalance_rules)
+    paginated_table(imbalance_rules, key="rules_imbalance", sort_by="Lift")
     st.markdown("""
     ### Delhi: High inbound AND outbound traffic imbalance
     If a route ends in Delhi, then:
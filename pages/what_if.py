@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from paginated_table import paginated_table
+from scenarios import load_profile, profile_version, run_scenarios, scenario_grid
+from seasonality import SEASON_ORDER
+
+st.title("What-if Scenarios")
+
+DATASET = "Domestic"
+PCT_OPTIONS = [-0.1, -0.05, 0.0, 0.05, 0.1, 0.2, 0.3, 0.5]
+TOP_OPTIONS = [10, 25, 50, 100, None]
+CPUS = os.cpu_count() or 1
+
+
+@st.cache_resource
+def get_profile(choice, version):
+    return load_profile(choice)
+
+
+def pct_label(x):
+    return f"{x:+.0%}"
+
+
+profile = get_profile(DATASET, profile_version(DATASET))
+st.caption(f"Baseline: {DATASET.lower()} passengers in {profile.year} on {len(profile.routes):,} routes. "
+           "A route's capacity is the most passengers it has carried in any month on record; "
+           "demand above it is spilled.")
+
+col1, col2 = st.columns(2)
+with col1:
+    growth = st.multiselect("Demand growth (all routes)", PCT_OPTIONS, default=[0.0, 0.1, 0.2],
+                            format_func=pct_label, key="what_if_growth")
+    capacity = st.multiselect("Extra capacity", PCT_OPTIONS, default=[0.0, 0.1, 0.2],
+                              format_func=pct_label, key="what_if_capacity")
+    top = st.multiselect("…on the busiest N routes", TOP_OPTIONS, default=[25, None],
+                         format_func=lambda n: "all routes" if n is None else f"top {n}", key="what_if_top")
+    periods = st.multiselect("…in", ["all"] + SEASON_ORDER, default=["all", "Festive"], key="what_if_periods")
+with col2:
+    shift = st.multiselect("Demand moved between seasons", [0.0, 0.05, 0.1, 0.2], default=[0.0],
+                           format_func=lambda s: f"{s:.0%}", key="what_if_shift")
+    shift_from = st.selectbox("…out of", SEASON_ORDER, index=SEASON_ORDER.index("Festive"), key="what_if_from")
+    shift_to = st.selectbox("…into", SEASON_ORDER, index=SEASON_ORDER.index("Monsoon"), key="what_if_to")
+    workers = st.number_input("Worker processes", min_value=1, max_value=CPUS, value=min(4, CPUS), step=1,
+                              key="what_if_workers")
+
+specs = scenario_grid(growth or [0.0], capacity or [0.0], top or [None], periods or ["all"], shift or [0.0],
+                      shift_from, shift_to)
+run_key = (profile_version(DATASET), repr(specs))
+st.write(f"**{len(specs):,} scenarios** (every combination, plus the baseline)")
+
+if st.button("Run scenarios", type="primary", key="what_if_run"):
+    # results stream in chunk by chunk; the table shows the best so far
+    progress = st.progress(0.0)
+    live = st.empty()
+    parts = []
+    for start, summary, served in run_scenarios(profile, specs, n_jobs=workers):
+        parts.append((start, summary, served))
+        done = sum(len(p[1]) for p in parts)
+        progress.progress(done / len(specs), text=f"{done:,} of {len(specs):,} scenarios")
+        live.dataframe(pd.concat([p[1] for p in parts]).nlargest(10, "served"), hide_index=True)
+    live.empty()
+    parts.sort(key=lambda part: part[0])
+    st.session_state["what_if_results"] = (run_key, pd.concat([p[1] for p in parts], ignore_index=True),
+                                           np.concatenate([p[2] for p in parts]))
+
+results = st.session_state.get("what_if_results")
+if results is None or results[0] != run_key:
+    st.info("Pick the scenario axes and press **Run scenarios**.")
+    st.stop()
+
+_, summary, served = results
+tab1, tab2 = st.tabs(["Comparison", "Monthly profile"])
+
+with tab1:
+    fig = px.scatter(summary, x="capacity", y="served", color="spill_share", hover_name="scenario",
+                     color_continuous_scale="Reds",
+                     labels={"capacity": "Capacity (passengers)", "served": "Passengers served",
+                             "spill_share": "Spilled share"})
+    st.plotly_chart(fig, use_container_width=True)
+    paginated_table(summary, key="what_if_table", sort_by="served",
+                    formats={"demand": "{:,.0f}", "capacity": "{:,.0f}", "served": "{:,.0f}", "spilled": "{:,.0f}",
+                             "served_change": "{:+.1%}", "spill_share": "{:.2%}", "utilisation": "{:.1%}"},
+                    placeholder="Scenario, e.g. top 25 or Festive")
+
+with tab2:
+    ranked = summary.sort_values("served", ascending=False)["scenario"].tolist()
+    chosen = st.multiselect("Scenarios", summary["scenario"].tolist(),
+                            default=list(dict.fromkeys(["Baseline"] + ranked[:2])), key="what_if_compare")
+    rows = summary.index[summary["scenario"].isin(chosen)]
+    monthly = pd.DataFrame(served[rows].T, columns=summary.loc[rows, "scenario"])
+    monthly.insert(0, "period", profile.periods)
+    monthly = monthly.melt(id_vars="period", var_name="scenario", value_name="served")
+    fig = px.line(monthly, x="period", y="served", color="scenario", markers=True,
+                  labels={"served": "Passengers served", "period": ""})
+    fig.add_scatter(x=profile.periods, y=profile.demand.sum(axis=0), mode="lines", name="Baseline demand",
+                    line={"dash": "dot"})
+    st.plotly_chart(fig, use_container_width=True)
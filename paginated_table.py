@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+PAGE_SIZES = [25, 50, 100]
+SUGGESTIONS = 50
+
+
+def _text_columns(table):
+    return [c for c in table.columns if not pd.api.types.is_numeric_dtype(table[c])]
+
+
+def _contains(s, token):
+    # categoricals are searched once per category, not once per row
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        hit = s.cat.categories.astype(str).str.contains(token, case=False, regex=False)
+        # code -1 (missing) picks the appended False
+        return pd.Series(np.append(hit, False)[s.cat.codes.to_numpy()], index=s.index)
+    return s.astype(str).str.contains(token, case=False, regex=False, na=False)
+
+
+def filter_sort(table, query="", sort_by=None, ascending=False, search_columns=None):
+    # rows where every whitespace-separated token appears in one of the text
+    # columns, sorted with missing values last
+    rows = table
+    tokens = query.split()
+    if tokens:
+        columns = search_columns or _text_columns(table)
+        mask = pd.Series(True, index=table.index)
+        for token in tokens:
+            hit = pd.Series(False, index=table.index)
+            for col in columns:
+                hit |= _contains(table[col], token)
+            mask &= hit
+        rows = rows[mask]
+    if sort_by is not None:
+        rows = rows.sort_values(sort_by, ascending=ascending, na_position="last", kind="stable")
+    return rows
+
+
+def page_window(rows, page=1, page_size=PAGE_SIZES[0]):
+    n_pages = max(1, -(-len(rows) // page_size))
+    page = min(max(page, 1), n_pages)
+    start = (page - 1) * page_size
+    return rows.iloc[start:start + page_size], n_pages
+
+
+def page_query(table, query="", sort_by=None, ascending=False, page=1, page_size=PAGE_SIZES[0], search_columns=None):
+    rows = filter_sort(table, query, sort_by, ascending, search_columns)
+    window, n_pages = page_window(rows, page, page_size)
+    return window, n_pages, len(rows)
+
+
+def paginated_table(table, key, sort_by=None, ascending=False, formats=None, search_columns=None,
+                    placeholder="Search"):
+    # Sort, search and page on the server; only the visible window is sent to
+    # the browser, however large the table behind it.
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        query = st.text_input("Search", key=f"{key}_query", placeholder=placeholder)
+    with col2:
+        columns = list(table.columns)
+        sort_by = st.selectbox("Sort by", columns, index=columns.index(sort_by) if sort_by in columns else 0,
+                               key=f"{key}_sort")
+    with col3:
+        ascending = st.toggle("Ascending", value=ascending, key=f"{key}_ascending")
+    with col4:
+        page_size = st.selectbox("Rows", PAGE_SIZES, key=f"{key}_size")
+
+    rows = filter_sort(table, query, sort_by, ascending, search_columns)
+    n_pages = max(1, -(-len(rows) // page_size))
+    # a narrower search can leave the remembered page past the end
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = 1
+    window, _ = page_window(rows, st.session_state.get(page_key, 1), page_size)
+
+    display = window.style.format(formats, na_rep="–") if formats else window
+    st.dataframe(display, hide_index=True)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+    with col2:
+        start = (page - 1) * page_size
+        st.caption(f"Rows {min(start + 1, len(rows)):,}–{start + len(window):,} of {len(rows):,}"
+                   + (f" matching “{query}” ({len(table):,} in total)" if query.strip() else ""))
+    return window
+
+
+class SearchIndex:
+    # Type-ahead over a list of labels (routes, cities), kept in the order they
+    # were given, e.g. busiest first. Matching runs over a NumPy array of
+    # upper-cased labels, so each keystroke is a few vectorised passes.
+
+    def __init__(self, labels):
+        self.labels = np.asarray(labels, dtype=object)
+        self._keys = np.char.upper(self.labels.astype(str))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query, limit=SUGGESTIONS):
+        # every token must appear; labels starting with the first token come first
+        tokens = query.upper().split()
+        if not tokens:
+            return self.labels[:limit].tolist()
+        hit = np.ones(len(self.labels), dtype=bool)
+        for token in tokens:
+            hit &= np.char.find(self._keys, token) >= 0
+        found = np.flatnonzero(hit)
+        prefix = np.char.startswith(self._keys[found], tokens[0])
+        found = found[np.argsort(~prefix, kind="stable")]
+        return self.labels[found[:limit]].tolist()
+
+
+def search_select(index, label, key, placeholder="Type to search", limit=SUGGESTIONS):
+    # a search box narrowing a selectbox that never holds more than `limit` options
+    query = st.text_input(f"Search {label.rstrip(':').lower()}", key=f"{key}_query", placeholder=placeholder)
+    options = index.search(query, limit)
+    if not options:
+        st.caption(f"Nothing matches “{query}”; showing the top {limit} instead.")
+        options = index.search("", limit)
+    return st.selectbox(label, options, key=f"{key}_select")
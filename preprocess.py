@@ -0,0 +1,376 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from rollup import normalize_year
+
+
+CHUNK_ROWS = 500_000
+# rows per route bucket when per-route growth needs a route's whole history
+BUCKET_ROWS = 2_000_000
+Z_OUTLIER = 3.0
+
+# Out-of-core versions of the preprocessing notebooks: the same cleaning,
+# imputation and derived columns, in two streaming passes over the input.
+PIPELINES = {
+    # india_domestic_city_preprocessing.ipynb -> domestic_city_processed.csv
+    "domestic": {"period": "month", "traffic_type": "domestic", "scaled": False, "growth": False},
+    # india_international.ipynb -> international_city_cleaned.csv
+    "international": {"period": "quarter", "traffic_type": "international", "scaled": True, "growth": True},
+}
+
+
+class RunningStats:
+    # Welford/Chan accumulator for count, mean and variance. Chunks are folded
+    # in with one vectorised pass each, and two accumulators merge exactly, so
+    # partial results from separate chunks or workers combine in any order.
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        x = np.asarray(values, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        if len(x):
+            self.merge(RunningStats(len(x), float(x.mean()), float(((x - x.mean()) ** 2).sum())))
+        return self
+
+    def merge(self, other):
+        n = self.count + other.count
+        if n == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+        return self
+
+    def std(self, ddof=0):
+        return math.sqrt(self.m2 / (self.count - ddof)) if self.count > ddof else float("nan")
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "std": self.std()}
+
+
+class QuantileSketch:
+    # Mergeable quantile sketch. While a column has few distinct values (years,
+    # months, zero-heavy measures) it keeps exact counts per value; past
+    # `max_exact` distinct values it switches to logarithmic bins of width
+    # log(gamma), so any reported quantile is within `relative_accuracy` of a
+    # true one (DDSketch). Memory is a few hundred bins per column whatever the
+    # row count, and sketches from different chunks merge by adding counts.
+
+    def __init__(self, relative_accuracy=0.01, max_exact=4096):
+        self.relative_accuracy = relative_accuracy
+        self.max_exact = max_exact
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.exact = {}
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    @staticmethod
+    def _add(store, keys, counts):
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            store[k] = store.get(k, 0) + c
+
+    def _add_binned(self, x):
+        self.zeros += int((x == 0).sum())
+        for store, values in ((self.positive, x[x > 0]), (self.negative, -x[x < 0])):
+            if len(values):
+                keys = np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+                self._add(store, *np.unique(keys, return_counts=True))
+
+    def _to_binned(self):
+        values = np.fromiter(self.exact.keys(), dtype=np.float64, count=len(self.exact))
+        counts = np.fromiter(self.exact.values(), dtype=np.int64, count=len(self.exact))
+        self.exact = None
+        self._add_binned(np.repeat(values, counts))
+
+    def update(self, values):
+        x = np.asarray(values, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        self.count += len(x)
+        if self.exact is not None:
+            self._add(self.exact, *np.unique(x, return_counts=True))
+            if len(self.exact) > self.max_exact:
+                self._to_binned()
+        else:
+            self._add_binned(x)
+        return self
+
+    def merge(self, other):
+        if self.exact is not None and other.exact is not None:
+            self._add(self.exact, np.asarray(list(other.exact)), np.asarray(list(other.exact.values())))
+            self.count += other.count
+            if len(self.exact) > self.max_exact:
+                self._to_binned()
+            return self
+        if self.exact is not None:
+            self._to_binned()
+        if other.exact is not None:
+            values = np.fromiter(other.exact.keys(), dtype=np.float64, count=len(other.exact))
+            self._add_binned(np.repeat(values, list(other.exact.values())))
+        else:
+            for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+                for k, c in theirs.items():
+                    mine[k] = mine.get(k, 0) + c
+            self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, key):
+        # midpoint (in relative terms) of bin (gamma^(k-1), gamma^k]
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        # lower quantile (the value at rank floor(q * (n - 1)))
+        if self.count == 0:
+            return float("nan")
+        rank = math.floor(q * (self.count - 1))
+        if self.exact is not None:
+            seen = 0
+            for value in sorted(self.exact):
+                seen += self.exact[value]
+                if seen > rank:
+                    return value
+        seen = 0
+        for k in sorted(self.negative, reverse=True):
+            seen += self.negative[k]
+            if seen > rank:
+                return -self._value(k)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for k in sorted(self.positive):
+            seen += self.positive[k]
+            if seen > rank:
+                return self._value(k)
+        return self._value(max(self.positive))
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+def _numeric_columns(chunk):
+    return [c for c in chunk.columns if pd.api.types.is_numeric_dtype(chunk[c])]
+
+
+def _read(path, chunk_rows):
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        chunk.columns = chunk.columns.str.strip().str.lower()
+        yield chunk
+
+
+def profile(path, chunk_rows=CHUNK_ROWS):
+    # pass 1: row count, numeric columns, a sketch and running stats per column
+    numeric, sketches, stats, rows = None, {}, {}, 0
+    for chunk in _read(path, chunk_rows):
+        if numeric is None:
+            numeric = _numeric_columns(chunk)
+            sketches = {c: QuantileSketch() for c in numeric}
+            stats = {c: RunningStats() for c in numeric}
+        for c in numeric:
+            values = pd.to_numeric(chunk[c], errors="coerce")
+            sketches[c].update(values)
+            stats[c].update(values)
+        rows += len(chunk)
+    return {"rows": rows, "numeric": numeric or [], "sketches": sketches, "stats": stats}
+
+
+def imputed_stats(prof, medians):
+    # Mean/std of each column *after* median imputation, as the notebooks
+    # computed them: the missing values form one more group whose mean is the
+    # median and whose variance is zero, merged in exactly.
+    out = {}
+    for c in prof["numeric"]:
+        missing = prof["rows"] - prof["stats"][c].count
+        s = prof["stats"][c]
+        out[c] = RunningStats(s.count, s.mean, s.m2).merge(RunningStats(missing, medians[c], 0.0))
+    return out
+
+
+def clean_chunk(chunk, spec, numeric, medians, stats):
+    df = chunk
+    for c in numeric:
+        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(medians[c])
+
+    period = spec["period"]
+    df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+    df[period] = pd.to_numeric(df[period], errors="coerce").astype("Int64")
+    year = normalize_year(df["year"])
+    if period == "month":
+        df["date"] = pd.to_datetime(year.astype(str) + "-" + df["month"].astype(str) + "-01")
+    else:
+        quarters = pd.PeriodIndex(year.astype(str) + "Q" + df["quarter"].astype(str), freq="Q")
+        df["quarter_period"] = quarters
+        df["date"] = quarters.to_timestamp(how="end")
+        df["year_quarter"] = df["year"].astype(str) + " Q" + df["quarter"].astype(str)
+
+    for col in ["city1", "city2"]:
+        df[col] = df[col].astype(str).str.strip().str.upper()
+
+    if spec["scaled"]:
+        for c in numeric:
+            std = stats[c].std()
+            df[c + "_scaled"] = (df[c] - stats[c].mean) / std if std > 0 else 0.0
+
+    for total, to_col, from_col in [("total_passengers", "paxtocity2", "paxfromcity2"),
+                                    ("total_freight", "freighttocity2", "freightfromcity2"),
+                                    ("total_mail", "mailtocity2", "mailfromcity2")]:
+        if {to_col, from_col} <= set(df.columns):
+            df[total] = df[to_col] + df[from_col]
+    df["traffic_type"] = spec["traffic_type"]
+    return df
+
+
+def outlier_counts(df, numeric, stats, z=Z_OUTLIER):
+    counts = {}
+    for c in numeric:
+        std = stats[c].std()
+        counts[c] = int(((df[c] - stats[c].mean).abs() > z * std).sum()) if std > 0 else 0
+    return counts
+
+
+def write_partitions(df, out_dir, part, partition_by="year", fmt="parquet"):
+    # hive-style out_dir/<partition_by>=<value>/part-NNNNN.<fmt>; the
+    # partition column lives in the directory name, as pyarrow expects
+    for value, group in df.groupby(partition_by, sort=True, observed=True):
+        directory = os.path.join(out_dir, f"{partition_by}={value}")
+        os.makedirs(directory, exist_ok=True)
+        group = group.drop(columns=partition_by)
+        path = os.path.join(directory, f"part-{part:05d}.{fmt}")
+        if fmt == "parquet":
+            if "quarter_period" in group.columns:
+                group = group.assign(quarter_period=group["quarter_period"].astype(str))
+            group.to_parquet(path, index=False)
+        else:
+            group.to_csv(path, index=False)
+
+
+def _add_growth(df):
+    # route-level period-over-period growth, as the international notebook did
+    df = df.sort_values(["city1", "city2", "date"], kind="stable")
+    df["pax_growth_pct"] = df.groupby(["city1", "city2"], sort=False)["total_passengers"].pct_change() * 100
+    return df
+
+
+def _replaceable(out_dir):
+    # only an empty directory or a previous run's output may be replaced
+    if not os.path.exists(out_dir):
+        return True
+    if not os.path.isdir(out_dir):
+        return False
+    return not os.listdir(out_dir) or os.path.exists(os.path.join(out_dir, "_summary.json"))
+
+
+def run(kind, path, out_dir, chunk_rows=CHUNK_ROWS, fmt="parquet", bucket_rows=BUCKET_ROWS):
+    # The output is built in a temporary sibling directory and swapped in once
+    # complete, so readers never see half a run and a failed run leaves the
+    # previous output alone.
+    target = os.path.abspath(out_dir)
+    if not _replaceable(target):
+        raise ValueError(f"{out_dir} exists and is not a previous preprocess output (no _summary.json); "
+                         "refusing to replace it")
+    parent, name = os.path.split(target)
+    build_dir = tempfile.mkdtemp(prefix=f".{name}.build-", dir=parent)
+    try:
+        summary = _run(kind, path, build_dir, chunk_rows, fmt, bucket_rows)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    # a non-empty directory can't be replaced in one rename: move the old one aside first
+    old_dir = None
+    if os.path.exists(target):
+        old_dir = tempfile.mkdtemp(prefix=f".{name}.old-", dir=parent)
+        os.replace(target, old_dir)
+    os.replace(build_dir, target)
+    if old_dir:
+        shutil.rmtree(old_dir)
+    return summary
+
+
+def _run(kind, path, out_dir, chunk_rows, fmt, bucket_rows):
+    # Peak memory is one input chunk (or, with growth, one route bucket) plus
+    # the sketches; the full frame never exists.
+    spec = PIPELINES[kind]
+    prof = profile(path, chunk_rows)
+    numeric = prof["numeric"]
+    medians = {c: prof["sketches"][c].median() for c in numeric}
+    stats = imputed_stats(prof, medians)
+    outliers = dict.fromkeys(numeric, 0)
+
+    # pass 2: clean each chunk and write it out (or spill it to route buckets)
+    n_buckets = max(1, math.ceil(prof["rows"] / bucket_rows)) if spec["growth"] else 0
+    spill_dir = os.path.join(out_dir, "_buckets")
+    for i, chunk in enumerate(_read(path, chunk_rows)):
+        df = clean_chunk(chunk, spec, numeric, medians, stats)
+        for c, n in outlier_counts(df, numeric, stats).items():
+            outliers[c] += n
+        if n_buckets:
+            route_hash = pd.util.hash_pandas_object(df[["city1", "city2"]], index=False).to_numpy()
+            df["_bucket"] = (route_hash % n_buckets).astype(np.int64)
+            write_partitions(df, spill_dir, i, partition_by="_bucket", fmt="parquet")
+        else:
+            write_partitions(df, out_dir, i, fmt=fmt)
+
+    # pass 3 (growth only): every route lives in exactly one bucket, so each
+    # bucket is sorted and differenced on its own
+    if n_buckets:
+        for b in range(n_buckets):
+            bucket_path = os.path.join(spill_dir, f"_bucket={b}")
+            if not os.path.isdir(bucket_path):
+                continue
+            df = pd.concat([pd.read_parquet(os.path.join(bucket_path, f)) for f in sorted(os.listdir(bucket_path))],
+                           ignore_index=True)
+            write_partitions(_add_growth(df), out_dir, b, fmt=fmt)
+        shutil.rmtree(spill_dir)
+
+    summary = {
+        "kind": kind, "source": os.path.abspath(path), "rows": prof["rows"], "format": fmt,
+        "medians": medians,
+        "quantiles": {c: {q: prof["sketches"][c].quantile(q) for q in (0.01, 0.25, 0.75, 0.99)} for c in numeric},
+        "stats": {c: stats[c].to_dict() for c in numeric},
+        "outliers": outliers,
+    }
+    with open(os.path.join(out_dir, "_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def read_partitioned(out_dir, columns=None, years=None):
+    # the partitioned output back as one frame, optionally only some years
+    filters = [("year", "in", [int(y) for y in years])] if years is not None else None
+    df = pd.read_parquet(out_dir, columns=columns, filters=filters)
+    if "year" in df.columns:
+        df["year"] = df["year"].astype(np.int64)
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=list(PIPELINES))
+    parser.add_argument("input")
+    parser.add_argument("out_dir")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    args = parser.parse_args(argv)
+    if not _replaceable(os.path.abspath(args.out_dir)):
+        parser.error(f"{args.out_dir} exists and is not a previous preprocess output (no _summary.json)")
+    summary = run(args.kind, args.input, args.out_dir, args.chunk_rows, args.format)
+    print(f"{summary['rows']:,} {args.kind} rows -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from dtypes import city_dtype, to_city
+
+
+MEASURES = [
+    "paxtocity2", "paxfromcity2",
+    "freighttocity2", "freightfromcity2",
+    "mailtocity2", "mailfromcity2",
+    "total_passengers", "total_freight", "total_mail",
+]
+
+FACT_COLUMNS = ["traffic_type", "grain", "year", "quarter", "month", "city1", "city2"] + MEASURES
+
+GRAINS = ["month", "quarter", "year"]
+
+
+def normalize_year(values):
+    # 20 -> 2020, "2021" -> 2021; no per-row regex
+    year = pd.to_numeric(pd.Series(values), errors="coerce")
+    year = year.where(~year.between(0, 99), year + 2000)
+    return year.where(year.between(1990, 2100)).astype("Int64")
+
+
+def add_totals(df):
+    for total, to_col, from_col in [
+        ("total_passengers", "paxtocity2", "paxfromcity2"),
+        ("total_freight", "freighttocity2", "freightfromcity2"),
+        ("total_mail", "mailtocity2", "mailfromcity2"),
+    ]:
+        if total not in df.columns and {to_col, from_col} <= set(df.columns):
+            df[total] = df[to_col].fillna(0) + df[from_col].fillna(0)
+    return df
+
+
+def _facts(df, traffic_type):
+    df = df.copy()
+    df.columns = df.columns.str.lower().str.strip()
+    df = add_totals(df)
+
+    out = pd.DataFrame(index=df.index)
+    out["traffic_type"] = traffic_type
+    out["year"] = normalize_year(df["year"])
+    if "month" in df.columns:
+        out["grain"] = "month"
+        out["month"] = pd.to_numeric(df["month"], errors="coerce").astype("Int64")
+        out["quarter"] = ((out["month"] - 1) // 3 + 1).astype("Int64")
+    else:
+        out["grain"] = "quarter"
+        out["month"] = pd.Series(pd.NA, index=df.index, dtype="Int64")
+        out["quarter"] = pd.to_numeric(df["quarter"], errors="coerce").astype("Int64")
+    out["city1"] = to_city(df["city1"])
+    out["city2"] = to_city(df["city2"])
+    for m in MEASURES:
+        # measures a source doesn't report (international mail) stay missing, not zero
+        out[m] = pd.to_numeric(df[m], errors="coerce") if m in df.columns else np.nan
+    return out[FACT_COLUMNS].dropna(subset=["year", "quarter"])
+
+
+def domestic_facts(df):
+    return _facts(df, "domestic")
+
+
+def international_facts(df):
+    return _facts(df, "international")
+
+
+def build_fact_table(domestic=None, international=None):
+    parts = []
+    if domestic is not None:
+        parts.append(domestic_facts(domestic))
+    if international is not None:
+        parts.append(international_facts(international))
+    fact = pd.concat(parts, ignore_index=True)
+    fact["traffic_type"] = fact["traffic_type"].astype("category")
+    fact["grain"] = fact["grain"].astype("category")
+    # parts encoded before the city dictionary last grew concatenate as plain strings
+    for col in ["city1", "city2"]:
+        fact[col] = fact[col].astype(city_dtype())
+    return fact
+
+
+def period_keys(fact, grain):
+    # integer keys sort and group fast; labels are only built for the result
+    year = fact["year"].to_numpy(dtype=np.int64)
+    if grain == "year":
+        return year
+    if grain == "quarter":
+        return year * 4 + fact["quarter"].to_numpy(dtype=np.int64) - 1
+    if grain == "month":
+        return year * 12 + fact["month"].to_numpy(dtype=np.int64) - 1
+    raise ValueError(f"Unknown grain: {grain!r} (expected one of {GRAINS})")
+
+
+def period_label(keys, grain):
+    keys = np.asarray(keys, dtype=np.int64)
+    if grain == "year":
+        return pd.Series(keys).astype(str).to_numpy()
+    if grain == "quarter":
+        return (pd.Series(keys // 4).astype(str) + "Q" + pd.Series(keys % 4 + 1).astype(str)).to_numpy()
+    return (pd.Series(keys // 12).astype(str) + "-" + pd.Series(keys % 12 + 1).astype(str).str.zfill(2)).to_numpy()
+
+
+def period_start(keys, grain):
+    keys = np.asarray(keys, dtype=np.int64)
+    if grain == "year":
+        months = keys * 12
+    elif grain == "quarter":
+        months = keys * 3
+    else:
+        months = keys
+    # months since year 0 -> datetime64 via the 1970 epoch
+    return (months - 1970 * 12).astype("datetime64[M]").astype("datetime64[ns]")
+
+
+def rollup(fact, grain="quarter", measures=None, by=None, traffic_types=None):
+    measures = list(measures or ["total_passengers", "total_freight", "total_mail"])
+    by = list(by or [])
+    if traffic_types is not None:
+        fact = fact[fact["traffic_type"].isin(traffic_types)]
+    if grain == "month":
+        # quarterly sources can't be split into months
+        fact = fact[fact["grain"] == "month"]
+
+    keys = pd.Series(period_keys(fact, grain), index=fact.index, name="period_key")
+    grouped = (
+        fact[by + measures]
+        .assign(period_key=keys)
+        .groupby(["period_key"] + by, observed=True, sort=True)[measures]
+        .sum(min_count=1)
+        .reset_index()
+    )
+    grouped.insert(1, "period", period_label(grouped["period_key"], grain))
+    grouped.insert(2, "period_start", period_start(grouped["period_key"], grain))
+    return grouped
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from geo import normalize_city
+from instrumentation import timed
+
+
+# zoom -> share of edges kept (by traffic rank); the most zoomed-in level keeps every route
+LOD_KEEP_SHARE = {1: 0.05, 2: 0.15, 3: 0.35, 4: 0.65, 5: 1.0}
+
+# line-width classes: a handful of traces instead of one trace per arc
+WIDTH_CLASSES = [(0.0, 0.6), (0.5, 1.2), (0.8, 2.0), (0.95, 3.2)]
+
+INDIA_CENTER = {"lat": 22.0, "lon": 79.0}
+
+
+@timed("route_map.aggregate_edges")
+def aggregate_edges(df, coords, weight="total_passengers"):
+    # unordered city pairs, so A->B and B->A share one edge
+    a = df["city1"].astype(str)
+    b = df["city2"].astype(str)
+    swap = a > b
+    edges = pd.DataFrame({
+        "src": a.where(~swap, b).to_numpy(),
+        "dst": b.where(~swap, a).to_numpy(),
+        "traffic": df[weight].to_numpy(),
+    })
+    edges = edges.groupby(["src", "dst"], sort=False, observed=True)["traffic"].sum().reset_index()
+
+    cities, uniques = pd.factorize(pd.concat([edges["src"], edges["dst"]], ignore_index=True))
+    pos = coords.index.get_indexer(normalize_city(uniques))
+    lat = np.where(pos >= 0, coords["lat"].to_numpy()[pos], np.nan)
+    lon = np.where(pos >= 0, coords["lon"].to_numpy()[pos], np.nan)
+    n = len(edges)
+    edges["lat_src"], edges["lon_src"] = lat[cities[:n]], lon[cities[:n]]
+    edges["lat_dst"], edges["lon_dst"] = lat[cities[n:]], lon[cities[n:]]
+
+    edges = edges.dropna(subset=["lat_src", "lon_src", "lat_dst", "lon_dst"])
+    edges = edges[edges["traffic"] > 0].sort_values("traffic", ascending=False, ignore_index=True)
+    edges["traffic_rank"] = np.arange(len(edges)) / max(len(edges) - 1, 1)
+    return edges
+
+
+def node_table(edges):
+    nodes = pd.concat([
+        edges[["src", "lat_src", "lon_src", "traffic"]].set_axis(["city", "lat", "lon", "traffic"], axis=1),
+        edges[["dst", "lat_dst", "lon_dst", "traffic"]].set_axis(["city", "lat", "lon", "traffic"], axis=1),
+    ], ignore_index=True)
+    return (
+        nodes.groupby("city")
+        .agg(lat=("lat", "first"), lon=("lon", "first"), traffic=("traffic", "sum"))
+        .reset_index()
+        .sort_values("traffic", ascending=False, ignore_index=True)
+    )
+
+
+def level_of_detail(edges, zoom, center=None, all_routes=False):
+    zoom = int(np.clip(zoom, min(LOD_KEEP_SHARE), max(LOD_KEEP_SHARE)))
+    keep = edges if all_routes else edges[edges["traffic_rank"] <= LOD_KEEP_SHARE[zoom]]
+    if center is not None and zoom > 1:
+        # viewport cull: keep edges with at least one endpoint on screen
+        half = 40.0 / 2 ** (zoom - 1)
+        lat0, lon0 = center["lat"], center["lon"]
+        in_src = (keep["lat_src"].sub(lat0).abs() <= half) & (keep["lon_src"].sub(lon0).abs() <= half)
+        in_dst = (keep["lat_dst"].sub(lat0).abs() <= half) & (keep["lon_dst"].sub(lon0).abs() <= half)
+        keep = keep[in_src | in_dst]
+    return keep
+
+
+def edge_paths(edges, bundle=False, cell_deg=2.0, strength=0.8, segments=12):
+    # Returns flat float32 lat/lon arrays with a NaN after each edge.
+    # Straight edges need 2 points; bundled ones are quadratic Bezier curves
+    # whose control point is pulled towards the traffic-weighted midpoint of
+    # all edges joining the same pair of grid cells.
+    lat0 = edges["lat_src"].to_numpy(dtype=np.float64)
+    lon0 = edges["lon_src"].to_numpy(dtype=np.float64)
+    lat1 = edges["lat_dst"].to_numpy(dtype=np.float64)
+    lon1 = edges["lon_dst"].to_numpy(dtype=np.float64)
+    n = len(edges)
+
+    if not bundle or n == 0:
+        lat = np.column_stack([lat0, lat1, np.full(n, np.nan)])
+        lon = np.column_stack([lon0, lon1, np.full(n, np.nan)])
+        return lat.ravel().astype(np.float32), lon.ravel().astype(np.float32)
+
+    mid_lat = (lat0 + lat1) / 2
+    mid_lon = (lon0 + lon1) / 2
+    cells = pd.DataFrame({
+        "a_lat": np.floor(lat0 / cell_deg), "a_lon": np.floor(lon0 / cell_deg),
+        "b_lat": np.floor(lat1 / cell_deg), "b_lon": np.floor(lon1 / cell_deg),
+        "w": edges["traffic"].to_numpy(dtype=np.float64),
+    })
+    cells["wlat"] = mid_lat * cells["w"]
+    cells["wlon"] = mid_lon * cells["w"]
+    group = cells.groupby(["a_lat", "a_lon", "b_lat", "b_lon"])
+    w_sum = group["w"].transform("sum").to_numpy()
+    ctrl_lat = mid_lat + strength * (group["wlat"].transform("sum").to_numpy() / w_sum - mid_lat)
+    ctrl_lon = mid_lon + strength * (group["wlon"].transform("sum").to_numpy() / w_sum - mid_lon)
+
+    t = np.linspace(0.0, 1.0, segments)[None, :]
+    u = 1.0 - t
+    lat = u ** 2 * lat0[:, None] + 2 * u * t * ctrl_lat[:, None] + t ** 2 * lat1[:, None]
+    lon = u ** 2 * lon0[:, None] + 2 * u * t * ctrl_lon[:, None] + t ** 2 * lon1[:, None]
+    lat = np.hstack([lat, np.full((n, 1), np.nan)])
+    lon = np.hstack([lon, np.full((n, 1), np.nan)])
+    return lat.ravel().astype(np.float32), lon.ravel().astype(np.float32)
+
+
+@timed("chart.route_map")
+def route_map_figure(edges, nodes, zoom=1, center=None, bundle=False, all_routes=False,
+                     theme_color="#a78bfa", height=700):
+    shown = level_of_detail(edges, zoom, center, all_routes=all_routes)
+    fig = go.Figure()
+
+    bounds = [lo for lo, _ in WIDTH_CLASSES] + [1.01]
+    for (lo, width), hi in zip(WIDTH_CLASSES, bounds[1:]):
+        # traffic_rank runs 0 (busiest) -> 1, so invert to get a "heaviness" share
+        heavy = 1.0 - shown["traffic_rank"]
+        part = shown[(heavy >= lo) & (heavy < hi)]
+        if part.empty:
+            continue
+        lat, lon = edge_paths(part, bundle=bundle)
+        fig.add_trace(go.Scattermap(
+            lat=lat, lon=lon, mode="lines",
+            line=dict(width=width, color=theme_color),
+            opacity=0.35 + 0.5 * lo,
+            hoverinfo="skip",
+            name=f"Traffic percentile {lo:.0%}-{min(hi, 1.0):.0%}",
+        ))
+
+    shown_nodes = nodes[nodes["city"].isin(pd.concat([shown["src"], shown["dst"]]).unique())]
+    size = 4 + 16 * np.sqrt(shown_nodes["traffic"].to_numpy() / max(nodes["traffic"].max(), 1))
+    fig.add_trace(go.Scattermap(
+        lat=shown_nodes["lat"].to_numpy(dtype=np.float32),
+        lon=shown_nodes["lon"].to_numpy(dtype=np.float32),
+        mode="markers",
+        marker=dict(size=size.astype(np.float32), color="#f87171", opacity=0.8),
+        text=shown_nodes["city"],
+        customdata=shown_nodes["traffic"].to_numpy(),
+        hovertemplate="%{text}<br>%{customdata:,.0f} passengers<extra></extra>",
+        name="Cities",
+    ))
+
+    view = center or INDIA_CENTER
+    fig.update_layout(
+        map=dict(style="carto-darkmatter", center=view, zoom=3 + (zoom - 1) * 0.9),
+        height=height,
+        margin=dict(l=0, r=0, t=30, b=0),
+        showlegend=True,
+        legend=dict(bgcolor="rgba(15,23,42,0.6)"),
+        title=f"{len(shown):,} of {len(edges):,} routes",
+    )
+    return fig
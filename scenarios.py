@@ -0,0 +1,245 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from cache_store import shared_cache
+from forecast import SEASON_LENGTH, route_period_matrix
+from instrumentation import timed
+from schema import DATASETS, PERIOD_NAMES, load_dataset, stage_version
+from seasonality import SEASONS
+
+
+# scenarios per task handed to a worker process
+CHUNK_SIZE = 64
+
+
+class DemandProfile:
+    # One baseline year of route x period demand, busiest route first, and each
+    # route's demonstrated capacity: the most it carried in any single period
+    # of the history. Every scenario is evaluated against these arrays; the
+    # raw frame is never touched again.
+
+    def __init__(self, routes, demand, capacity, year, period_col):
+        self.routes = np.asarray(routes, dtype=object)
+        self.demand = demand
+        self.capacity = capacity
+        self.year = year
+        self.period_col = period_col
+        # network-wide seasonal shape, used to spread a new route's demand
+        self.shape = demand.sum(axis=0) / demand.sum()
+        self._index = pd.Index(self.routes)
+
+    @classmethod
+    def from_frame(cls, df, period_col="month", value="total_passengers", year=None):
+        m = SEASON_LENGTH[period_col]
+        Y, routes, first_key = route_period_matrix(df, period_col, value)
+        years = (first_key + np.arange(Y.shape[1])) // m
+        if year is None:
+            # latest calendar year with traffic in every period
+            flown = Y.sum(axis=0) > 0
+            full = [y for y in np.unique(years) if flown[years == y].sum() == m]
+            if not full:
+                raise ValueError("No complete year of history to build a demand profile from")
+            year = int(full[-1])
+        cols = years == year
+        if cols.sum() != m:
+            raise ValueError(f"{year} does not cover all {m} periods")
+        demand = Y[:, cols]
+        keep = demand.sum(axis=1) > 0
+        order = np.argsort(-demand[keep].sum(axis=1), kind="stable")
+        capacity = Y.max(axis=1)
+        return cls(routes[keep][order], demand[keep][order], capacity[keep][order], year, period_col)
+
+    @property
+    def periods(self):
+        return [PERIOD_NAMES[self.period_col][p] for p in range(1, self.demand.shape[1] + 1)]
+
+
+def season_periods(season, period_col="month"):
+    return [p for p, s in SEASONS[period_col].items() if s == season]
+
+
+def _route_mask(profile, routes):
+    # "all", {"top": n} (the n busiest routes) or a list of route labels
+    if routes is None or routes == "all":
+        return np.ones(len(profile.routes), dtype=bool)
+    mask = np.zeros(len(profile.routes), dtype=bool)
+    if isinstance(routes, dict):
+        mask[:routes["top"]] = True
+    else:
+        idx = profile._index.get_indexer(routes)
+        mask[idx[idx >= 0]] = True
+    return mask
+
+
+def _period_mask(profile, periods):
+    # "all", a season name ("Festive") or a list of period numbers (1-based)
+    m = profile.demand.shape[1]
+    if periods is None or periods == "all":
+        return np.ones(m, dtype=bool)
+    if isinstance(periods, str):
+        periods = season_periods(periods, profile.period_col)
+    mask = np.zeros(m, dtype=bool)
+    mask[np.asarray(periods, dtype=np.int64) - 1] = True
+    return mask
+
+
+def apply_scenario(profile, spec):
+    # Demand and capacity (routes x periods) after the scenario's transforms,
+    # applied in order. Each transform is a whole-array operation; the last row
+    # collects new routes, which are sized to their own demand.
+    demand = np.vstack([profile.demand, np.zeros(profile.demand.shape[1])])
+    capacity = np.vstack([np.broadcast_to(profile.capacity[:, None], profile.demand.shape),
+                          np.zeros(profile.demand.shape[1])])
+    for t in spec.get("transforms", []):
+        kind = t["kind"]
+        if kind == "add":
+            added = t["passengers"] * profile.shape
+            demand[-1] += added
+            capacity[-1] += added
+            continue
+        rows = np.append(_route_mask(profile, t.get("routes")), False)
+        if kind == "remove":
+            demand[rows] = 0.0
+            capacity[rows] = 0.0
+            continue
+        cells = rows[:, None] & _period_mask(profile, t.get("periods"))
+        if kind == "growth":
+            demand = np.where(cells, demand * (1 + t["pct"]), demand)
+        elif kind == "capacity":
+            capacity = np.where(cells, capacity * (1 + t["pct"]), capacity)
+        elif kind == "shift":
+            # move a share of demand out of `periods` and spread it evenly over `to`
+            src = _period_mask(profile, t.get("periods"))
+            dst = _period_mask(profile, t["to"])
+            M = np.eye(len(src))
+            M[src, src] = 1 - t["share"]
+            M[np.ix_(src, dst)] += t["share"] / dst.sum()
+            demand[rows] = demand[rows] @ M
+        else:
+            raise ValueError(f"Unknown transform {kind!r}")
+    return demand, capacity
+
+
+def evaluate(profile, specs):
+    # One summary row per scenario and the traffic it serves per period
+    # (scenarios x periods). Scenarios are stacked so every metric is one
+    # array operation over the whole batch.
+    pairs = [apply_scenario(profile, spec) for spec in specs]
+    demand = np.stack([d for d, _ in pairs])
+    capacity = np.stack([c for _, c in pairs])
+    served = np.minimum(demand, capacity)
+    spilled = demand - served
+    baseline = profile.demand.sum()
+
+    summary = pd.DataFrame({
+        "scenario": [spec["name"] for spec in specs],
+        "demand": demand.sum(axis=(1, 2)),
+        "capacity": capacity.sum(axis=(1, 2)),
+        "served": served.sum(axis=(1, 2)),
+        "spilled": spilled.sum(axis=(1, 2)),
+        "constrained_routes": (spilled.sum(axis=2) > 0).sum(axis=1),
+    })
+    summary["served_change"] = summary["served"] / baseline - 1
+    summary["spill_share"] = summary["spilled"] / summary["demand"].where(summary["demand"] > 0)
+    summary["utilisation"] = summary["served"] / summary["capacity"].where(summary["capacity"] > 0)
+    return summary, served.sum(axis=1)
+
+
+_worker_profile = None
+
+
+def _init_worker(profile):
+    # each worker receives the profile once, not with every chunk
+    global _worker_profile
+    _worker_profile = profile
+
+
+def _evaluate_chunk(start, specs):
+    return start, evaluate(_worker_profile, specs)
+
+
+def run_scenarios(profile, specs, n_jobs=1, chunk_size=CHUNK_SIZE):
+    # Yields (start, summary, served) for each chunk of scenarios as soon as
+    # it is done, so callers can show results while the rest still run.
+    # `start` is the position of the chunk's first scenario in `specs`.
+    chunks = [(i, specs[i:i + chunk_size]) for i in range(0, len(specs), chunk_size)]
+    if n_jobs == 1 or len(chunks) == 1:
+        for start, chunk in chunks:
+            yield (start, *evaluate(profile, chunk))
+        return
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(profile,)) as pool:
+        futures = [pool.submit(_evaluate_chunk, start, chunk) for start, chunk in chunks]
+        for future in as_completed(futures):
+            start, (summary, served) = future.result()
+            yield start, summary, served
+
+
+@timed("scenarios.evaluate_all")
+def evaluate_all(profile, specs, n_jobs=1, chunk_size=CHUNK_SIZE):
+    # the whole batch in `specs` order: summary (one row per scenario) and
+    # served traffic per period
+    parts = sorted(run_scenarios(profile, specs, n_jobs, chunk_size), key=lambda part: part[0])
+    if not parts:
+        return pd.DataFrame(), np.empty((0, profile.demand.shape[1]))
+    summary = pd.concat([p[1] for p in parts], ignore_index=True)
+    return summary, np.concatenate([p[2] for p in parts])
+
+
+def _pct(x):
+    return f"{x:+.0%}"
+
+
+def scenario_grid(growth=(0.0,), capacity=(0.0,), top=(None,), periods=("all",), shift=(0.0,),
+                  shift_from="Festive", shift_to="Monsoon"):
+    # Every combination of: demand growth on all routes, extra capacity on the
+    # `top` busiest routes (None = all) in `periods`, and a share of demand
+    # moved from `shift_from` to `shift_to`. The unchanged baseline comes first.
+    specs = [{"name": "Baseline", "transforms": []}]
+    for g, c, n, p, s in product(growth, capacity, top, periods, shift):
+        transforms, name = [], []
+        if g:
+            transforms.append({"kind": "growth", "pct": g})
+            name.append(f"demand {_pct(g)}")
+        if c:
+            routes = "all" if n is None else {"top": n}
+            transforms.append({"kind": "capacity", "pct": c, "routes": routes, "periods": p})
+            where = "all routes" if n is None else f"top {n}"
+            name.append(f"capacity {_pct(c)} on {where}" + ("" if p == "all" else f" in {p}"))
+        if s:
+            transforms.append({"kind": "shift", "share": s, "periods": shift_from, "to": shift_to})
+            name.append(f"shift {s:.0%} {shift_from} → {shift_to}")
+        if transforms:
+            specs.append({"name": ", ".join(name), "transforms": transforms})
+    # the capacity axes only matter when capacity is added, so some
+    # combinations repeat
+    unique = {spec["name"]: spec for spec in specs}
+    return list(unique.values())
+
+
+def profile_version(choice):
+    return stage_version(choice, "scenarios.py", "forecast.py")
+
+
+@shared_cache("demand_profile", version=profile_version)
+def load_profile(choice):
+    return DemandProfile.from_frame(load_dataset(choice), DATASETS[choice]["grain"])
+
+
+def main(argv=None):
+    choice = (argv if argv is not None else sys.argv[1:]) or ["Domestic"]
+    profile = load_profile(choice[0])
+    specs = scenario_grid(growth=[0.0, 0.05, 0.1, 0.2], capacity=[0.0, 0.1, 0.2, 0.3],
+                          top=[10, 25, 50, None], periods=["all", "Festive", "Summer"], shift=[0.0, 0.1])
+    summary, _ = evaluate_all(profile, specs, n_jobs=os.cpu_count() or 1)
+    print(f"{choice[0]}: {len(profile.routes):,} routes, baseline year {profile.year}, {len(specs)} scenarios")
+    print(summary.sort_values("served", ascending=False).head(15).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+
+from cache_store import shared_cache
+from dtypes import enforce_types, route_labels
+from manifest import fingerprint
+from rollup import add_totals, normalize_year
+
+
+DATASETS = {
+    "Domestic": {
+        "paths": ["domestic_city_processed.csv"],
+        "grain": "month",
+        "traffic_type": "domestic",
+    },
+    "International": {
+        "paths": ["city_internatinal.csv"],
+        "grain": "quarter",
+        "traffic_type": "international",
+    },
+}
+
+TOTAL_MEASURES = ["total_passengers", "total_freight", "total_mail"]
+
+PERIOD_NAMES = {
+    "month": {
+        1: "January", 2: "February", 3: "March",
+        4: "April",   5: "May",      6: "June",
+        7: "July",    8: "August",   9: "September",
+        10: "October", 11: "November", 12: "December"
+    },
+    "quarter": {1: "Q1 (Jan-Mar)", 2: "Q2 (Apr-Jun)", 3: "Q3 (Jul-Sep)", 4: "Q4 (Oct-Dec)"},
+}
+
+
+def adapt_schema(df, grain):
+    # Brings any city-pair source to the columns the dashboard expects:
+    # lower-case names, 4-digit years, an integer period column ("month" or
+    # "quarter"), derived totals and a route label, all in compact dtypes.
+    # Measures the source never reports (international mail) are left out
+    # rather than faked as zero.
+    df = df.copy()
+    df.columns = df.columns.str.lower().str.strip()
+
+    df["year"] = normalize_year(df["year"])
+    df[grain] = pd.to_numeric(df[grain], errors="coerce").astype("Int64")
+    df = df.dropna(subset=["year", grain])
+    df["year"] = df["year"].astype(int)
+    df[grain] = df[grain].astype(int)
+
+    df = add_totals(df)
+    df["period_name"] = df[grain].map(PERIOD_NAMES[grain])
+    # typed schema (dtypes.py): city columns on the shared city dictionary,
+    # other text as categoricals, whole numbers as int32
+    df = enforce_types(df.reset_index(drop=True))
+    df["route"] = route_labels(df["city1"], df["city2"])
+    return df
+
+
+def present_measures(df):
+    return [m for m in TOTAL_MEASURES if m in df.columns]
+
+
+def measure_label(measure):
+    return measure.replace("total_", "").capitalize()
+
+
+# code that turns a source file into the frame every stage starts from
+LOAD_CODE = ["schema.py", "rollup.py", "dtypes.py"]
+
+
+def dataset_version(choice):
+    # Fingerprint of the source file's content and the loading code; cache
+    # keys built on it change exactly when the loaded frame would. Hashes are
+    # memoized on the file's stat, so repeat calls only cost an os.stat.
+    for path in DATASETS[choice]["paths"]:
+        if os.path.exists(path):
+            return fingerprint([path], LOAD_CODE)
+    return None
+
+
+def stage_version(choice, *code):
+    # fingerprint of a stage derived from the dataset: its data plus its own code
+    return fingerprint(code=code, parts=[dataset_version(choice)])
+
+
+@shared_cache("dataset", version=dataset_version)
+def load_dataset(choice):
+    # adapted frame for a DATASETS entry, shared across processes through the cache store
+    spec = DATASETS[choice]
+    for path in spec["paths"]:
+        try:
+            return adapt_schema(pd.read_csv(path), spec["grain"])
+        except FileNotFoundError:
+            continue
+    return pd.DataFrame()
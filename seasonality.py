@@ -0,0 +1,138 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from forecast import SEASON_LENGTH, route_period_matrix
+from schema import PERIOD_NAMES
+
+
+SEASONS = {
+    "month": {
+        12: "Winter", 1: "Winter",
+        2: "Spring", 3: "Spring",
+        4: "Summer", 5: "Summer", 6: "Summer",
+        7: "Monsoon", 8: "Monsoon",
+        9: "Festive", 10: "Festive", 11: "Festive",
+    },
+    "quarter": {1: "Winter", 2: "Summer", 3: "Monsoon", 4: "Festive"},
+}
+
+SEASON_ORDER = ["Winter", "Spring", "Summer", "Monsoon", "Festive"]
+
+# seasonality strength cut-offs for the pattern label
+STRONG = 0.6
+WEAK = 0.3
+
+# a route needs this many calendar years, each with at least this share of its
+# periods flown, before its seasonal pattern is scored; with less, the profile
+# is just the observed months and its strength is trivially 1.0
+MIN_YEARS = 2
+MIN_YEAR_COVERAGE = 0.5
+INSUFFICIENT = "Insufficient history"
+
+
+def seasonal_profiles(Y, first_key, m):
+    # Y: routes x periods (NaN = not flown). Pad to whole calendar years and
+    # reshape to routes x years x m, then divide each route-year by its own
+    # mean so growth between years doesn't leak into the seasonal shape.
+    lead = first_key % m
+    T = Y.shape[1]
+    years = -(-(lead + T) // m)
+    padded = np.full((Y.shape[0], years * m), np.nan)
+    padded[:, lead:lead + T] = Y
+    cube = padded.reshape(Y.shape[0], years, m)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        year_mean = np.nanmean(cube, axis=2, keepdims=True)
+        ratio = cube / np.where(year_mean > 0, year_mean, np.nan)
+        # medians across years keep one disrupted year (2020) from flattening the profile
+        profile = np.nanmedian(ratio, axis=1)
+        # share of the within-year variance explained by the typical profile
+        remainder = np.nanmedian(np.nanvar(ratio - profile[:, None, :], axis=2), axis=1)
+        total = np.nanmedian(np.nanvar(ratio, axis=2), axis=1)
+    strength = np.nan_to_num(np.clip(1 - remainder / np.where(total > 0, total, np.nan), 0, 1))
+    covered = (np.count_nonzero(~np.isnan(cube), axis=2) >= MIN_YEAR_COVERAGE * m).sum(axis=1)
+    return profile, np.where(covered >= MIN_YEARS, strength, np.nan)
+
+
+def build_seasonality_table(df, period_col="month"):
+    m = SEASON_LENGTH[period_col]
+    Y, routes, first_key = route_period_matrix(df, period_col, fill_value=np.nan)
+    profile, strength = seasonal_profiles(Y, first_key, m)
+    filled = np.nan_to_num(profile, nan=1.0)
+
+    peak = filled.argmax(axis=1)
+    trough = filled.argmin(axis=1)
+    names = np.array([PERIOD_NAMES[period_col][p] for p in range(1, m + 1)], dtype=object)
+    season_of = np.array([SEASONS[period_col][p] for p in range(1, m + 1)], dtype=object)
+
+    table = pd.DataFrame({
+        "route": routes,
+        "peak_period": peak + 1,
+        "peak_name": names[peak],
+        "peak_season": season_of[peak],
+        "trough_period": trough + 1,
+        "trough_name": names[trough],
+        "trough_season": season_of[trough],
+        "peak_index": filled.max(axis=1),
+        "trough_index": filled.min(axis=1),
+        "amplitude": filled.max(axis=1) - filled.min(axis=1),
+        "strength": strength,
+        "observed_periods": np.count_nonzero(~np.isnan(Y), axis=1),
+    })
+
+    # mean demand index per named season (1.0 = the route's average period)
+    for season in SEASON_ORDER:
+        cols = [p - 1 for p, s in SEASONS[period_col].items() if s == season]
+        if cols:
+            table[f"index_{season.lower()}"] = filled[:, cols].mean(axis=1)
+
+    table["pattern"] = np.select(
+        [table["strength"] >= STRONG, table["strength"] >= WEAK],
+        ["Strong " + table["peak_season"] + " peak", "Mild " + table["peak_season"] + " peak"],
+        default="Flat",
+    )
+    table.loc[table["strength"].isna(), "pattern"] = INSUFFICIENT
+    profile_cols = pd.DataFrame(profile, columns=[f"p{p:02d}" for p in range(1, m + 1)])
+    return pd.concat([table, profile_cols], axis=1).set_index("route")
+
+
+def season_index(table, route):
+    row = table.loc[route]
+    return pd.DataFrame(
+        [(s, row[f"index_{s.lower()}"]) for s in SEASON_ORDER if f"index_{s.lower()}" in row.index],
+        columns=["season", "demand_index"],
+    ).sort_values("demand_index", ascending=False, ignore_index=True)
+
+
+def route_profile(table, route, period_col="month"):
+    m = SEASON_LENGTH[period_col]
+    row = table.loc[route]
+    return pd.DataFrame({
+        period_col: np.arange(1, m + 1),
+        "period_name": [PERIOD_NAMES[period_col][p] for p in range(1, m + 1)],
+        "demand_index": [row[f"p{p:02d}"] for p in range(1, m + 1)],
+    })
+
+
+def describe(row):
+    if row["pattern"] == INSUFFICIENT:
+        return (f"Too little history to judge seasonality: {row['observed_periods']} periods flown, "
+                f"fewer than {MIN_YEARS} years with at least {MIN_YEAR_COVERAGE:.0%} of periods observed.")
+    if row["pattern"] == "Flat":
+        return (f"No consistent seasonal pattern (strength {row['strength']:.2f}); "
+                f"the busiest and quietest periods differ by only {row['amplitude']:.0%} of average demand.")
+    return (f"{row['pattern']} (strength {row['strength']:.2f}): demand peaks in {row['peak_name']} "
+            f"at {row['peak_index'] - 1:+.0%} vs the route average and bottoms out in "
+            f"{row['trough_name']} at {row['trough_index'] - 1:+.0%}.")
+
+
+def filter_routes(table, season, direction="dip", min_strength=STRONG, min_change=0.1):
+    # e.g. filter_routes(table, "Monsoon") -> strongly monsoon-dipping routes;
+    # routes with too little history (NaN strength) never match
+    idx = table[f"index_{season.lower()}"]
+    hit = idx <= 1 - min_change if direction == "dip" else idx >= 1 + min_change
+    out = table[hit & (table["strength"] >= min_strength)]
+    return out.sort_values(f"index_{season.lower()}", ascending=(direction == "dip"))
@@ -0,0 +1,359 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from geo import haversine_km, normalize_city
+
+
+CITY_COLUMNS = ["Year", "Month", "City1", "City2", "PaxToCity2", "PaxFromCity2",
+                "FreightToCity2", "FreightFromCity2", "MailToCity2", "MailFromCity2"]
+INTERNATIONAL_COLUMNS = ["Year", "Quarter", "City1", "City2", "PaxToCity2", "PaxFromCity2",
+                         "FreightToCity2", "FreightFromCity2"]
+DELAY_COLUMNS = [
+    "Used Date", "From", "To", "Airline", "Scheduled Departure", "SDEP", "Departure", "DEP",
+    "Scheduled Arrival", "SARR", "Arrival", "ARR", "Departure Delay", "Arrival Delay", "Status",
+    "Distance", "Passenger Load Factor", "Airline Rating", "Airport Rating", "Market Share", "OTP Index",
+    "weather__hourly__windspeedKmph", "weather__hourly__weatherDesc__value", "weather__hourly__precipMM",
+    "weather__hourly__humidity", "weather__hourly__visibility", "weather__hourly__pressure",
+    "weather__hourly__cloudcover", "Category",
+]
+
+CHUNK_ROWS = 1_000_000
+
+# passenger volume by calendar month relative to the annual mean (city.csv, 2020-21 excluded)
+MONTH_PROFILE = np.array([0.98, 0.94, 1.03, 0.97, 1.0, 0.98, 0.97, 0.98, 0.97, 1.03, 1.05, 1.12])
+ANNUAL_GROWTH = 0.07
+# demand multiplier during the 2020-21 travel restrictions, by month
+COVID = {
+    2020: [1.0, 1.0, 0.8, 0.01, 0.05, 0.2, 0.3, 0.35, 0.4, 0.5, 0.6, 0.65],
+    2021: [0.7, 0.7, 0.6, 0.45, 0.2, 0.35, 0.55, 0.65, 0.7, 0.75, 0.8, 0.8],
+}
+
+# One region is a city network about the size of the shipped sample: that many
+# routes drawn between the airports_india.csv cities. Larger datasets stack
+# regions whose cities carry a numeric suffix ("DELHI 2"), so route and city
+# counts grow with the row count the way they would in a bigger market.
+SPECS = {
+    "city": {
+        "columns": CITY_COLUMNS, "period": "Month", "per_year": 12,
+        "start": (2015, 1), "end": (2025, 4), "routes": 1800, "two_digit_year": False,
+        # log-normal mean monthly passengers per route
+        "volume": (7.2, 1.55),
+        "freight_ratio": (-7.9, 0.8), "freight_zero": 0.33,
+        "mail_ratio": (-9.5, 1.0), "mail_zero": 0.55, "missing": 0.21,
+    },
+    "international": {
+        "columns": INTERNATIONAL_COLUMNS, "period": "Quarter", "per_year": 4,
+        "start": (2015, 1), "end": (2025, 2), "routes": 1130, "two_digit_year": True,
+        "volume": (8.3, 1.7),
+        "freight_ratio": (-6.7, 1.0), "freight_zero": 0.1, "missing": 0.0,
+    },
+}
+
+# name -> (airline rating, market share %, OTP index)
+AIRLINES = {
+    "Indigo": (0.7, 46.5, 82.0), "Air India": (0.5, 12.7, 62.0), "SpiceJet": (0.4, 14.8, 74.0),
+    "Go Air": (0.3, 10.7, 89.0), "Vistara": (0.8, 5.0, 82.0), "Air Asia": (0.5, 6.0, 85.0),
+}
+# description -> (probability, mean precipitation mm, mean cloud cover %, delay multiplier)
+WEATHER = {
+    "Partly cloudy": (0.60, 0.0, 35, 1.0), "Clear": (0.10, 0.0, 5, 0.9), "Sunny": (0.07, 0.0, 3, 0.9),
+    "Patchy rain possible": (0.09, 0.6, 60, 1.2), "Cloudy": (0.05, 0.0, 70, 1.0),
+    "Light rain shower": (0.034, 1.5, 65, 1.4), "Moderate or heavy rain shower": (0.022, 4.0, 80, 1.8),
+    "Overcast": (0.008, 0.0, 95, 1.1), "Torrential rain shower": (0.007, 12.0, 90, 2.5),
+    "Thundery outbreaks possible": (0.005, 1.0, 75, 1.6), "Mist": (0.004, 0.0, 40, 1.5),
+    "Moderate or heavy rain with thunder": (0.006, 6.0, 90, 2.2),
+}
+# Category is the departure-delay bucket: (probability, low, high) minutes
+DELAY_BUCKETS = [(0.51, -20, 0), (0.21, 1, 15), (0.096, 16, 30), (0.096, 31, 60), (0.088, 61, 400)]
+CANCEL_RATE = 0.007
+CANCELLED_DELAY = 1440
+
+
+def load_cities(airports_path="airports_india.csv"):
+    ap = pd.read_csv(airports_path, na_values=["\\N"]).dropna(subset=["City", "Latitude", "Longitude"])
+    cities = pd.DataFrame({
+        "city": normalize_city(ap["City"]).to_numpy(),
+        "iata": ap["IATA"].to_numpy(),
+        "lat": ap["Latitude"].to_numpy(dtype=np.float64),
+        "lon": ap["Longitude"].to_numpy(dtype=np.float64),
+    })
+    return cities.dropna(subset=["city"]).drop_duplicates("city").reset_index(drop=True)
+
+
+def load_foreign_cities(path="city_internatinal.csv"):
+    if os.path.exists(path):
+        names = pd.read_csv(path, usecols=["City1"])["City1"].astype(str).str.strip().str.upper()
+        return np.asarray(sorted(names.unique()), dtype=object)
+    return np.asarray([f"FOREIGN {i}" for i in range(1, 201)], dtype=object)
+
+
+def _period_keys(start, end, per_year):
+    return np.arange(start[0] * per_year + start[1] - 1, end[0] * per_year + end[1])
+
+
+def _demand(keys, per_year):
+    # calendar seasonality x compound growth x the 2020-21 shock, per period
+    year, p = np.divmod(keys, per_year)
+    months_per_period = 12 // per_year
+    season = MONTH_PROFILE.reshape(per_year, months_per_period).mean(axis=1)
+    growth = (1 + ANNUAL_GROWTH) ** ((keys - keys[0]) / per_year)
+    shock = np.ones(len(keys))
+    for y, factors in COVID.items():
+        by_period = np.asarray(factors).reshape(per_year, months_per_period).mean(axis=1)
+        shock[year == y] = by_period[p[year == y]]
+    return season[p], growth, shock
+
+
+def _city_weights(n, rng):
+    # heavy-tailed hub sizes: a few cities carry most of the traffic
+    return rng.pareto(1.1, n) + 0.05
+
+
+def _sample_routes(origins, destinations, n_routes, rng, same_set):
+    wo = _city_weights(len(origins), rng)
+    wd = wo if same_set else _city_weights(len(destinations), rng)
+    gravity = np.outer(wo, wd)
+    if same_set:
+        np.fill_diagonal(gravity, 0)
+    flat = gravity.ravel() / gravity.sum()
+    n_routes = min(n_routes, int(np.count_nonzero(flat)))
+    picks = rng.choice(len(flat), size=n_routes, replace=False, p=flat)
+    o, d = np.divmod(picks, len(destinations))
+    return o, d, np.log(flat[picks])
+
+
+def _region(spec, origins, destinations, keys, season, growth, shock, rng, same_set):
+    # all rows of one region as a dict of column arrays, in (route, period) order
+    o, d, log_gravity = _sample_routes(origins, destinations, spec["routes"], rng, same_set)
+    n, n_periods = len(o), len(keys)
+
+    # bigger gravity -> bigger route, with enough noise that hubs still have small routes
+    mu, sigma = spec["volume"]
+    volume = np.sort(rng.lognormal(mu, sigma, n))[::-1]
+    rank = np.argsort(np.argsort(-(log_gravity + rng.normal(0, 1.5, n))))
+    volume = volume[rank]
+    quantile = 1 - rank / max(n - 1, 1)
+
+    # routes open over time, small routes fly only in some periods, and fewer
+    # routes operate at all during the shock
+    opened = np.where(rng.random(n) < 0.35, 0, rng.integers(0, n_periods, n))
+    p_active = (0.08 + 0.92 * quantile ** 2)[:, None] * np.sqrt(shock)
+    active = (np.arange(n_periods) >= opened[:, None]) & (rng.random((n, n_periods)) < p_active)
+    r, t = np.nonzero(active)
+
+    # per-route seasonal strength and growth on top of the market-wide demand
+    amplitude = rng.lognormal(0, 0.6, n)
+    route_growth = rng.normal(0, 0.04, n)
+    seasonal = 1 + amplitude[r] * (season[t] - 1)
+    years = (keys[t] - keys[0]) / spec["per_year"]
+    pax = volume[r] * np.clip(seasonal, 0.05, None) * growth[t] * shock[t] * np.exp(route_growth[r] * years)
+    pax = np.round(pax * rng.lognormal(0, 0.2, len(r)))
+
+    # split by direction; a few rows only carry traffic one way
+    share = rng.beta(20, 20, len(r))
+    one_way = rng.random(len(r)) < 0.04
+    share[one_way] = rng.integers(0, 2, one_way.sum())
+    pax_to = np.round(pax * share)
+    pax_from = pax - pax_to
+
+    year, period = np.divmod(keys[t], spec["per_year"])
+    out = {
+        "Year": year % 100 if spec["two_digit_year"] else year,
+        spec["period"]: period + 1,
+        "City1": origins[o[r]],
+        "City2": destinations[d[r]],
+        "PaxToCity2": pax_to,
+        "PaxFromCity2": pax_from,
+    }
+    missing = rng.random(len(r)) < spec["missing"]
+    for measure in ["freight", "mail"]:
+        if f"{measure}_ratio" not in spec:
+            continue
+        mu, sigma = spec[f"{measure}_ratio"]
+        ratio = rng.lognormal(mu, sigma, n) * (rng.random(n) >= spec[f"{measure}_zero"])
+        noise = rng.lognormal(0, 0.3, (2, len(r)))
+        for i, direction in enumerate(["To", "From"]):
+            base = pax_to if direction == "To" else pax_from
+            values = np.round(base * ratio[r] * noise[i], 2)
+            values[missing] = np.nan
+            out[f"{measure.capitalize()}{direction}City2"] = values
+    return out
+
+
+def city_pairs(n_rows, kind="city", seed=0, chunk_rows=CHUNK_ROWS,
+               airports_path="airports_india.csv", foreign_path="city_internatinal.csv"):
+    # Yields DataFrames of at most chunk_rows rows in the schema of city.csv
+    # (kind="city") or city_internatinal.csv (kind="international") until
+    # n_rows have been produced. Only one region is in memory at a time.
+    spec = SPECS[kind]
+    rng = np.random.default_rng(seed)
+    keys = _period_keys(spec["start"], spec["end"], spec["per_year"])
+    season, growth, shock = _demand(keys, spec["per_year"])
+    indian = np.asarray(load_cities(airports_path)["city"], dtype=object)
+    foreign = load_foreign_cities(foreign_path) if kind == "international" else None
+
+    produced, region, pending = 0, 0, []
+    pending_rows = 0
+    while produced + pending_rows < n_rows:
+        suffix = f" {region}" if region else ""
+        if kind == "international":
+            # international rows are foreign city -> Indian city
+            origins, destinations, same_set = foreign + suffix, indian + suffix, False
+        else:
+            origins = destinations = indian + suffix
+            same_set = True
+        frame = pd.DataFrame(_region(spec, origins, destinations, keys, season, growth, shock, rng, same_set))
+        pending.append(frame)
+        pending_rows += len(frame)
+        region += 1
+        while pending_rows >= chunk_rows or (produced + pending_rows >= n_rows and pending_rows):
+            block = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            take = min(chunk_rows, n_rows - produced)
+            chunk, rest = block.iloc[:take], block.iloc[take:]
+            produced += len(chunk)
+            yield chunk.reset_index(drop=True)[spec["columns"]]
+            pending = [rest] if len(rest) and produced < n_rows else []
+            pending_rows = len(rest) if pending else 0
+
+
+def _clock(minutes, cancelled):
+    # minutes after midnight -> ("HH:MM", HHMM); cancelled flights are -1 in both
+    wrapped = np.asarray(minutes, dtype=np.int64) % 1440
+    hhmm = (wrapped // 60) * 100 + wrapped % 60
+    labels = np.asarray([f"{m // 60:02d}:{m % 60:02d}" for m in range(1440)], dtype=object)[wrapped]
+    hhmm[cancelled] = -1
+    labels[cancelled] = "-1"
+    return labels, hhmm
+
+
+def flight_delays(n_rows, seed=0, chunk_rows=CHUNK_ROWS, airports_path="airports_india.csv",
+                  start="2019-01-01", end="2020-01-31"):
+    # Yields DataFrames in the schema of flight_delay.csv: one scheduled flight
+    # per row between IATA airports, weather at departure, and a delay drawn
+    # from the observed category mix, shifted by how bad the weather is.
+    rng = np.random.default_rng(seed)
+    airports = load_cities(airports_path).dropna(subset=["iata"]).reset_index(drop=True)
+    weights = _city_weights(len(airports), rng)
+    weights = weights / weights.sum()
+    dates = pd.date_range(start, end, freq="D").strftime("%d-%m-%Y").to_numpy(dtype=object)
+
+    names = np.asarray(list(AIRLINES), dtype=object)
+    airline_table = np.asarray(list(AIRLINES.values()))
+    share = airline_table[:, 1] / airline_table[:, 1].sum()
+    weather_names = np.asarray(list(WEATHER), dtype=object)
+    weather_table = np.asarray([v[1:] for v in WEATHER.values()])
+    weather_p = np.asarray([v[0] for v in WEATHER.values()])
+    weather_p = weather_p / weather_p.sum()
+    bucket_p = np.asarray([b[0] for b in DELAY_BUCKETS])
+    bucket_p = bucket_p / bucket_p.sum()
+    bucket_lo = np.asarray([b[1] for b in DELAY_BUCKETS])
+    bucket_hi = np.asarray([b[2] for b in DELAY_BUCKETS])
+    airport_rating = np.round(rng.uniform(0.86, 0.9, len(airports)), 2)
+
+    produced = 0
+    while produced < n_rows:
+        n = min(chunk_rows, n_rows - produced)
+        src = rng.choice(len(airports), n, p=weights)
+        dst = rng.choice(len(airports), n, p=weights)
+        same = dst == src
+        dst[same] = (dst[same] + rng.integers(1, len(airports), same.sum())) % len(airports)
+        distance = np.round(haversine_km(airports["lat"].to_numpy()[src], airports["lon"].to_numpy()[src],
+                                         airports["lat"].to_numpy()[dst], airports["lon"].to_numpy()[dst]))
+        airline = rng.choice(len(names), n, p=share)
+        weather = rng.choice(len(weather_names), n, p=weather_p)
+        precip_mean, cloud_mean, delay_factor = weather_table[weather].T
+
+        sdep = rng.integers(0, 288, n) * 5
+        block = np.round(distance / 750 * 60 + 35).astype(np.int64)
+        sarr = sdep + block
+
+        bucket = rng.choice(len(DELAY_BUCKETS), n, p=bucket_p)
+        # bad weather pushes flights into later buckets
+        bump = rng.random(n) < (delay_factor - 1) / 2
+        bucket = np.minimum(bucket + bump, len(DELAY_BUCKETS) - 1)
+        dep_delay = rng.integers(bucket_lo[bucket], bucket_hi[bucket] + 1)
+        long_tail = bucket == len(DELAY_BUCKETS) - 1
+        dep_delay[long_tail] = np.minimum(61 + rng.exponential(110, long_tail.sum()), CANCELLED_DELAY - 1).astype(np.int64)
+        arr_delay = np.maximum(dep_delay + np.round(rng.normal(0, 12, n)).astype(np.int64), -61)
+
+        cancelled = rng.random(n) < CANCEL_RATE
+        dep_delay[cancelled] = CANCELLED_DELAY
+        arr_delay[cancelled] = CANCELLED_DELAY
+        bucket[cancelled] = len(DELAY_BUCKETS) - 1
+        on_time = np.zeros(n, dtype=bool)
+
+        sdep_label, sdep_hhmm = _clock(sdep, on_time)
+        sarr_label, sarr_hhmm = _clock(sarr, on_time)
+        dep_label, dep_hhmm = _clock(sdep + dep_delay, cancelled)
+        arr_label, arr_hhmm = _clock(sarr + arr_delay, cancelled)
+        rain = precip_mean > 0
+        precip = np.where(rain, np.round(rng.exponential(np.maximum(precip_mean, 1e-9))), 0).astype(np.int64)
+
+        yield pd.DataFrame({
+            "Used Date": dates[rng.integers(0, len(dates), n)],
+            "From": airports["iata"].to_numpy(dtype=object)[src],
+            "To": airports["iata"].to_numpy(dtype=object)[dst],
+            "Airline": names[airline],
+            "Scheduled Departure": sdep_label, "SDEP": sdep_hhmm,
+            "Departure": dep_label, "DEP": dep_hhmm,
+            "Scheduled Arrival": sarr_label, "SARR": sarr_hhmm,
+            "Arrival": arr_label, "ARR": arr_hhmm,
+            "Departure Delay": dep_delay,
+            "Arrival Delay": arr_delay,
+            "Status": (~cancelled).astype(np.int64),
+            "Distance": distance.astype(np.int64),
+            "Passenger Load Factor": np.round(np.clip(rng.normal(86.3, 3.8, n), 76, 94), 1),
+            "Airline Rating": airline_table[airline, 0],
+            "Airport Rating": airport_rating[src],
+            "Market Share": np.round(airline_table[airline, 1] * rng.lognormal(0, 0.05, n), 1),
+            "OTP Index": np.round(np.clip(airline_table[airline, 2] + rng.normal(0, 5, n), 50, 100), 1),
+            "weather__hourly__windspeedKmph": np.maximum(np.round(rng.gamma(5, 2.5, n)), 1).astype(np.int64),
+            "weather__hourly__weatherDesc__value": weather_names[weather],
+            "weather__hourly__precipMM": precip,
+            "weather__hourly__humidity": np.clip(np.round(rng.normal(63 + 20 * rain, 20)), 5, 96).astype(np.int64),
+            "weather__hourly__visibility": np.where(rng.random(n) < 0.85 - 0.3 * rain, 10, rng.integers(2, 21, n)),
+            "weather__hourly__pressure": np.round(rng.normal(1012.6, 4.4, n)).astype(np.int64),
+            "weather__hourly__cloudcover": np.clip(np.round(rng.normal(cloud_mean, 15)), 0, 100).astype(np.int64),
+            "Category": bucket,
+        })[DELAY_COLUMNS]
+        produced += n
+
+
+def generate(kind, n_rows, **kwargs):
+    chunks = flight_delays(n_rows, **kwargs) if kind == "delay" else city_pairs(n_rows, kind, **kwargs)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_csv(path, kind, n_rows, transform=None, **kwargs):
+    # Streams chunks to one CSV; memory stays at one chunk whatever n_rows is.
+    # `transform` (chunk -> chunk) lets callers write a derived schema.
+    chunks = flight_delays(n_rows, **kwargs) if kind == "delay" else city_pairs(n_rows, kind, **kwargs)
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            if transform is not None:
+                chunk = transform(chunk)
+            # city-pair measures are written to two decimals like the shipped files
+            chunk.to_csv(f, index=False, header=i == 0, float_format=None if kind == "delay" else "%.2f")
+            written += len(chunk)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=["city", "international", "delay"])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    written = write_csv(args.path, args.kind, args.rows, seed=args.seed, chunk_rows=args.chunk_rows)
+    print(f"wrote {written:,} {args.kind} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())